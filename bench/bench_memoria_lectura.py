@@ -0,0 +1,56 @@
+"""Compara el pico de memoria (RSS) de leer_lineas vs iter_lineas al crecer el archivo.
+
+Uso (desde la raíz del proyecto):
+    python bench/bench_memoria_lectura.py [--tamanos 100000 1000000 5000000]
+
+Cada medición corre en un subproceso nuevo para que el pico de RSS sea independiente.
+Con iter_lineas el pico debe mantenerse prácticamente constante; con leer_lineas crece
+linealmente con el número de líneas.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+def generar_prestamos(ruta: str, n: int) -> None:
+    """Escribe n préstamos sintéticos en formato de 4 campos."""
+    with open(ruta, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(f"U{i % 5000:05d}|L{i % 800:04d}|2025-{1 + i % 12:02d}-{1 + i % 28:02d}|\n")
+
+def medir(ruta: str, modo: str) -> int:
+    """Recorre el archivo con el lector indicado en un subproceso y devuelve su pico de RSS (KiB)."""
+    codigo = (
+        "import sys, resource\n"
+        f"sys.path.insert(0, {SRC_DIR!r})\n"
+        "from lector import leer_lineas, iter_lineas\n"
+        f"lineas = {'leer_lineas' if modo == 'lista' else 'iter_lineas'}({ruta!r})\n"
+        "total = 0\n"
+        "for num, linea in lineas:\n"
+        "    total += len(linea)\n"
+        "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+    )
+    salida = subprocess.run([sys.executable, "-c", codigo], check=True, capture_output=True, text=True)
+    return int(salida.stdout.strip())
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[100_000, 1_000_000, 3_000_000])
+    args = parser.parse_args()
+
+    print(f"{'Líneas':>12} {'MiB archivo':>12} {'RSS lista (MiB)':>16} {'RSS generador (MiB)':>20}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.tamanos:
+            ruta = os.path.join(tmp, f"prestamos_{n}.lfa")
+            generar_prestamos(ruta, n)
+            mib = os.path.getsize(ruta) / 2**20
+            rss_lista = medir(ruta, "lista") / 1024
+            rss_gen = medir(ruta, "generador") / 1024
+            print(f"{n:>12} {mib:>12.1f} {rss_lista:>16.1f} {rss_gen:>20.1f}")
+            os.remove(ruta)
+
+if __name__ == "__main__":
+    main()
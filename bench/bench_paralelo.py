@@ -0,0 +1,98 @@
+"""Benchmark de la carga paralela de préstamos: tiempo según la cantidad de workers.
+
+Uso (desde la raíz del proyecto):
+    python bench/bench_paralelo.py --prestamos 300000
+    python bench/bench_paralelo.py --datos /tmp/bib_1m --workers 1 2 4 8
+
+Para cada cantidad de workers carga los préstamos en un Almacen nuevo y muestra el tiempo y la
+aceleración respecto de workers=1. Además mide, en este mismo proceso, cuánto de la carga en serie
+es trabajo que se reparte (leer, validar, parsear fechas y verificar ids: _procesar_bloque sobre
+todo el archivo) y cuánto cuesta recibir sus resultados (unpickle y rearmar cada línea). Lo demás (índice de
+intervalos, contadores, crear cada préstamo) queda en el proceso principal, y de ahí sale la
+aceleración máxima posible con núcleos suficientes. Con menos núcleos que workers la aceleración
+medida no puede superar 1: el script lo advierte.
+"""
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+from datetime import date
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import carga  # noqa: E402
+from generar_datos import generar  # noqa: E402
+from main import Almacen  # noqa: E402
+
+def _nucleos() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS / Windows
+        return os.cpu_count() or 1
+
+def _catalogos(datos: str) -> Almacen:
+    store = Almacen()
+    store.cargar_usuarios(os.path.join(datos, "usuarios.lfa"))
+    store.cargar_libros(os.path.join(datos, "libros.lfa"))
+    return store
+
+def medir(datos: str, workers: int) -> Dict:
+    store = _catalogos(datos)
+    inicio = time.perf_counter()
+    store.cargar_prestamos(os.path.join(datos, "prestamos.lfa"), workers=workers)
+    return {"workers": workers, "segundos": time.perf_counter() - inicio, "prestamos": len(store.prestamos)}
+
+def medir_reparto(datos: str) -> Dict:
+    """Tiempo del trabajo que hacen los workers (todo el archivo en un bloque) y de recibir su resultado."""
+    store = _catalogos(datos)
+    ruta = os.path.join(datos, "prestamos.lfa")
+    carga._iniciar_worker((frozenset(store.usuarios), frozenset(store.libros)))
+    inicio = time.perf_counter()
+    resultado = carga._procesar_bloque(ruta, 0, os.path.getsize(ruta))
+    repartible = time.perf_counter() - inicio
+    crudo = pickle.dumps(resultado, pickle.HIGHEST_PROTOCOL)
+    inicio = time.perf_counter()
+    for _ in carga._resultados_de_bloque(pickle.loads(crudo)[1], 0):
+        pass
+    return {"repartible": repartible, "recibir": time.perf_counter() - inicio, "mib": len(crudo) / 2**20}
+
+def ejecutar(datos: str, lista_workers: List[int]) -> None:
+    nucleos = _nucleos()
+    print(f"núcleos disponibles: {nucleos}")
+    filas = [medir(datos, w) for w in sorted(set(lista_workers) | {1})]
+    serie = filas[0]["segundos"]
+    print(f"{'Workers':>7} {'Segundos':>10} {'Aceleración':>12}")
+    for f in filas:
+        print(f"{f['workers']:>7} {f['segundos']:>10.3f} {serie / f['segundos']:>11.2f}x")
+    print(f"préstamos cargados: {filas[0]['prestamos']}")
+
+    r = medir_reparto(datos)
+    principal = max(serie - r["repartible"], 0.0) + r["recibir"]
+    print(f"trabajo repartible: {r['repartible']:.3f} s de {serie:.3f} s ({r['repartible'] / serie:.0%}); "
+          f"recibir resultados: {r['recibir']:.3f} s ({r['mib']:.1f} MiB)")
+    print(f"proceso principal: ~{principal:.3f} s -> aceleración máxima ~{serie / principal:.2f}x")
+    if max(lista_workers) > nucleos:
+        print(f"aviso: con {nucleos} núcleo(s), los workers compiten por la misma CPU")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--datos", default=None, help="carpeta con usuarios/libros/prestamos.lfa ya generados")
+    parser.add_argument("--prestamos", type=int, default=300_000, help="si no hay --datos, tamaño a generar")
+    parser.add_argument("--tasa-errores", type=float, default=0.001)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    if args.datos:
+        ejecutar(args.datos, args.workers)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        generar(tmp, args.prestamos, max(10, args.prestamos // 20), max(10, args.prestamos // 50),
+                "mixto", args.tasa_errores, 1135724, date(2015, 1, 1), 3650)
+        ejecutar(tmp, args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Benchmark del pipeline completo: carga, reportes en consola y exportación HTML.
+
+Uso (desde la raíz del proyecto):
+    python bench/bench_pipeline.py --prestamos 100000
+    python bench/bench_pipeline.py --datos /tmp/bib_1m --columnar --memoria
+    python bench/bench_pipeline.py --prestamos 100000 --comparar bench/resultados/<anterior>.json
+
+Mide cada Almacen.cargar_*, cada mostrar_* (con la salida descartada) y exportar_reportes_html:
+tiempo, filas/s y, con --memoria, el pico de memoria de Python asignado en cada fase (tracemalloc,
+más lento). Al final informa el pico de RSS del proceso. Los resultados se guardan en
+bench/resultados/ como JSON (con el commit actual) para comparar regresiones entre commits.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(RAIZ, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generar_datos import generar  # noqa: E402
+from main import Almacen  # noqa: E402
+
+RESULTADOS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados")
+
+def _commit_actual() -> str:
+    try:
+        salida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                                capture_output=True, text=True, check=True)
+        return salida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+def _rss_pico_mib() -> float:
+    # ru_maxrss está en KiB en Linux y en bytes en macOS
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (2**20 if sys.platform == "darwin" else 2**10)
+
+class Medidor:
+    """Ejecuta fases midiendo tiempo (y opcionalmente memoria) y guarda una fila por fase."""
+
+    def __init__(self, memoria: bool) -> None:
+        self.memoria = memoria
+        self.fases: List[Dict] = []
+
+    def fase(self, nombre: str, funcion, filas: Optional[int] = None, silenciar: bool = False) -> None:
+        if self.memoria:
+            tracemalloc.start()
+        destino = open(os.devnull, "w") if silenciar else None
+        inicio = time.perf_counter()
+        try:
+            if destino:
+                with contextlib.redirect_stdout(destino):
+                    funcion()
+            else:
+                funcion()
+        finally:
+            duracion = time.perf_counter() - inicio
+            if destino:
+                destino.close()
+        pico = None
+        if self.memoria:
+            pico = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+        self.fases.append({
+            "fase": nombre,
+            "segundos": round(duracion, 4),
+            "filas": filas,
+            "filas_por_seg": round(filas / duracion) if filas and duracion > 0 else None,
+            "pico_mib": round(pico, 1) if pico is not None else None,
+        })
+
+def ejecutar(args: argparse.Namespace, datos: str) -> Dict:
+    rutas = {n: os.path.join(datos, f"{n}.lfa") for n in ("usuarios", "libros", "prestamos")}
+    store = Almacen(columnar=args.columnar, usar_mmap=args.mmap)
+    m = Medidor(args.memoria)
+
+    m.fase("cargar_usuarios", lambda: store.cargar_usuarios(rutas["usuarios"]))
+    m.fases[-1]["filas"] = len(store.usuarios)
+    m.fase("cargar_libros", lambda: store.cargar_libros(rutas["libros"]))
+    m.fases[-1]["filas"] = len(store.libros)
+    m.fase("cargar_prestamos", lambda: store.cargar_prestamos(rutas["prestamos"], workers=args.workers))
+    n = len(store.prestamos)
+    m.fases[-1]["filas"] = n
+    for fase in m.fases:
+        if fase["filas"] and fase["segundos"] > 0:
+            fase["filas_por_seg"] = round(fase["filas"] / fase["segundos"])
+
+    m.fase("mostrar_historial", store.mostrar_historial, n, silenciar=True)
+    m.fase("mostrar_usuarios_unicos", store.mostrar_usuarios_unicos, len(store.usuarios), silenciar=True)
+    m.fase("mostrar_libros_prestados", store.mostrar_libros_prestados, n, silenciar=True)
+    m.fase("mostrar_estadisticas", store.mostrar_estadisticas, n, silenciar=True)
+    m.fase("mostrar_prestamos_vencidos", store.mostrar_prestamos_vencidos, n, silenciar=True)
+    with tempfile.TemporaryDirectory() as salida:
+        m.fase("exportar_reportes_html",
+               lambda: store.exportar_reportes_html(filas_por_pagina=args.filas_por_pagina,
+                                                    concurrente=args.concurrente, carpeta=salida),
+               n, silenciar=True)
+
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_actual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "config": {
+            "prestamos": n, "errores": store.errores.total, "columnar": args.columnar, "mmap": args.mmap,
+            "workers": args.workers, "concurrente": args.concurrente, "filas_por_pagina": args.filas_por_pagina,
+        },
+        "fases": m.fases,
+        "rss_pico_mib": round(_rss_pico_mib(), 1),
+    }
+
+def imprimir(resultado: Dict, anterior: Optional[Dict]) -> None:
+    previas = {f["fase"]: f for f in anterior["fases"]} if anterior else {}
+    print(f"commit {resultado['commit']}  préstamos {resultado['config']['prestamos']}  "
+          f"errores {resultado['config']['errores']}")
+    print(f"{'Fase':<28} {'Segundos':>10} {'Filas/s':>14} {'Pico MiB':>10}" + (f" {'vs anterior':>12}" if anterior else ""))
+    for f in resultado["fases"]:
+        linea = f"{f['fase']:<28} {f['segundos']:>10.3f} {f['filas_por_seg'] or '':>14} {f['pico_mib'] or '':>10}"
+        previa = previas.get(f["fase"])
+        if previa and previa["segundos"] > 0:
+            linea += f" {(f['segundos'] / previa['segundos'] - 1) * 100:>+11.1f}%"
+        print(linea)
+    print(f"Pico de RSS del proceso: {resultado['rss_pico_mib']} MiB")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--datos", default=None, help="carpeta con usuarios/libros/prestamos.lfa ya generados")
+    parser.add_argument("--prestamos", type=int, default=100_000, help="si no hay --datos, tamaño a generar")
+    parser.add_argument("--formato", choices=("4", "6", "mixto"), default="mixto")
+    parser.add_argument("--tasa-errores", type=float, default=0.001)
+    parser.add_argument("--columnar", action="store_true")
+    parser.add_argument("--mmap", action="store_true")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--concurrente", action="store_true")
+    parser.add_argument("--filas-por-pagina", type=int, default=None)
+    parser.add_argument("--memoria", action="store_true", help="medir pico de memoria por fase (tracemalloc)")
+    parser.add_argument("--comparar", default=None, help="JSON de una corrida anterior para mostrar diferencias")
+    parser.add_argument("--no-guardar", action="store_true", help="no escribir el JSON de resultados")
+    args = parser.parse_args()
+
+    if args.datos:
+        resultado = ejecutar(args, args.datos)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            generar(tmp, args.prestamos, max(10, args.prestamos // 20), max(10, args.prestamos // 50),
+                    args.formato, args.tasa_errores, 1135724, datetime(2015, 1, 1).date(), 3650)
+            resultado = ejecutar(args, tmp)
+
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anterior = json.load(f)
+    imprimir(resultado, anterior)
+
+    if not args.no_guardar:
+        os.makedirs(RESULTADOS_DIR, exist_ok=True)
+        nombre = f"{resultado['fecha'].replace(':', '')}_{resultado['commit']}.json"
+        ruta = os.path.join(RESULTADOS_DIR, nombre)
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+        print(f"Resultados guardados en {ruta}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Generador de datos sintéticos (usuarios.lfa, libros.lfa, prestamos.lfa) a escala configurable.
+
+Uso (desde la raíz del proyecto):
+    python bench/generar_datos.py --prestamos 1000000 --salida /tmp/bib_1m
+    python bench/generar_datos.py --prestamos 50000000 --formato mixto --tasa-errores 0.001 --salida /data/bib_50m
+
+Los archivos se escriben en streaming (memoria constante aunque sean decenas de millones de líneas).
+Con --tasa-errores se intercalan líneas con los mismos tipos de error que data/errores.lfa:
+carácter no permitido (emoji, '$', '@'), cantidad de campos incorrecta, fecha inválida e ids
+inexistentes en los catálogos. Los préstamos de un mismo libro nunca se solapan, así que los
+avisos de préstamo solapado no aparecen en datos generados.
+"""
+import argparse
+import os
+import random
+from datetime import date, timedelta
+from typing import Callable, List
+
+NOMBRES = ["Ana", "Carlos", "Sofía", "Luis", "María", "José", "Lucía", "Pedro", "Elena", "Jorge", "Ñandú", "Andrés"]
+APELLIDOS = ["López", "Ruiz", "Hernández", "Gómez", "Pérez", "García", "Mazariegos", "Andrade", "Díaz", "Núñez"]
+PALABRAS = ["Introducción", "Algoritmos", "Estructuras", "Datos", "Autómatas", "Lenguajes", "Formales", "Compiladores",
+            "Sistemas", "Operativos", "Redes", "Bases", "Diseño", "Análisis", "Teoría", "Cómputo", "Python", "Grafos"]
+
+# Cada préstamo dura entre 1 y 60 días; siguen sin devolverse los que terminarían después del
+# fin del historial. Cada libro se presta a lo sumo a una persona a la vez.
+INTENTOS_LIBRO = 20
+NO_DEVUELTO = date.max.toordinal()
+LINEAS_POR_ESCRITURA = 10000
+
+def id_usuario(i: int) -> str:
+    return f"U{i:07d}"
+
+def id_libro(i: int) -> str:
+    return f"L{i:06d}"
+
+def _escribir(ruta: str, total: int, linea: Callable[[int], str], cabecera: str) -> None:
+    """Escribe 'total' líneas generadas por linea(i), en bloques para no acumular memoria."""
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(cabecera + "\n")
+        bloque: List[str] = []
+        for i in range(total):
+            bloque.append(linea(i))
+            if len(bloque) >= LINEAS_POR_ESCRITURA:
+                f.write("\n".join(bloque) + "\n")
+                bloque.clear()
+        if bloque:
+            f.write("\n".join(bloque) + "\n")
+
+def generar(salida: str, n_prestamos: int, n_usuarios: int, n_libros: int, formato: str,
+            tasa_errores: float, semilla: int, desde: date, dias: int) -> None:
+    rnd = random.Random(semilla)
+    os.makedirs(salida, exist_ok=True)
+
+    nombres = [f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)}" for _ in range(n_usuarios)]
+    titulos = [" ".join(rnd.sample(PALABRAS, rnd.randint(2, 5))) for _ in range(n_libros)]
+    _escribir(os.path.join(salida, "usuarios.lfa"), n_usuarios,
+              lambda i: f"{id_usuario(i)}|{nombres[i]}", "# Formato: id_usuario|nombre_usuario")
+    _escribir(os.path.join(salida, "libros.lfa"), n_libros,
+              lambda i: f"{id_libro(i)}|{titulos[i]}", "# Formato: id_libro|titulo_libro")
+
+    # Errores de formato: la línea se rechaza y no ocupa ningún libro
+    errores = [
+        lambda u, l, fp: f"{u}|{l}|{fp}|😊",                     # emoji
+        lambda u, l, fp: f"{u}|{l}|{fp}|$",                      # '$'
+        lambda u, l, fp: f"{u}|Luis@Gomez|{l}|{fp}|",            # '@'
+        lambda u, l, fp: f"{u}|{l}|Extra",                       # campos
+        lambda u, l, fp: f"{u}|{l}|2025-13-01|2025-14-35",       # fecha inválida
+    ]
+    fin_historial = desde + timedelta(days=dias)
+    # Ordinal del día desde el que cada libro vuelve a estar disponible (los préstamos nunca se solapan)
+    libre = [0] * n_libros
+    libre_inexistente = 0
+
+    def libro_libre(dia: int) -> int:
+        for _ in range(INTENTOS_LIBRO):
+            l = rnd.randrange(n_libros)
+            if libre[l] <= dia:
+                return l
+        inicio = rnd.randrange(n_libros)
+        for k in range(n_libros):
+            l = (inicio + k) % n_libros
+            if libre[l] <= dia:
+                return l
+        raise ValueError(f"ningún libro está libre el {date.fromordinal(dia)}: usa más --libros o menos --prestamos")
+
+    def prestamo(i: int) -> str:
+        nonlocal libre_inexistente
+        u = rnd.randrange(n_usuarios)
+        # Préstamos en orden cronológico aproximado, como un archivo que solo crece
+        fp = desde + timedelta(days=(i * dias) // max(n_prestamos, 1))
+        dia = fp.toordinal()
+        l = libro_libre(dia)
+        devolucion = fp + timedelta(days=rnd.randint(1, 60))
+        # Los que se devolverían después del fin del historial siguen prestados
+        fd = "" if devolucion > fin_historial else devolucion.isoformat()
+        ocupado_hasta = NO_DEVUELTO if not fd else devolucion.toordinal()
+        if rnd.random() < tasa_errores:
+            tipo = rnd.randrange(len(errores) + 2)
+            if tipo < len(errores):
+                return errores[tipo](id_usuario(u), id_libro(l), fp.isoformat())
+            # Ids inexistentes: el préstamo se guarda igual (con aviso), así que también ocupa su libro
+            if tipo == len(errores) and libre_inexistente <= dia:
+                libre_inexistente = ocupado_hasta
+                return f"{id_usuario(u)}|L999999|{fp.isoformat()}|{fd}"
+            libre[l] = ocupado_hasta
+            return f"U9999999|{id_libro(l)}|{fp.isoformat()}|{fd}"
+        libre[l] = ocupado_hasta
+        extendido = formato == "6" or (formato == "mixto" and rnd.random() < 0.5)
+        if extendido:
+            return f"{id_usuario(u)}|{nombres[u]}|{id_libro(l)}|{titulos[l]}|{fp.isoformat()}|{fd}"
+        return f"{id_usuario(u)}|{id_libro(l)}|{fp.isoformat()}|{fd}"
+
+    _escribir(os.path.join(salida, "prestamos.lfa"), n_prestamos, prestamo,
+              "# Formatos: id_usuario|id_libro|fp|fd  o  id_usuario|nombre|id_libro|titulo|fp|fd")
+
+def construir_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--salida", required=True, help="carpeta donde escribir los .lfa")
+    parser.add_argument("--prestamos", type=int, default=10_000, help="cantidad de préstamos (10k a 50M)")
+    parser.add_argument("--usuarios", type=int, default=None, help="por defecto: prestamos / 20")
+    parser.add_argument("--libros", type=int, default=None, help="por defecto: prestamos / 50")
+    parser.add_argument("--formato", choices=("4", "6", "mixto"), default="4", help="campos por préstamo")
+    parser.add_argument("--tasa-errores", type=float, default=0.0, help="fracción de líneas con error (0 a 1)")
+    parser.add_argument("--semilla", type=int, default=1135724)
+    parser.add_argument("--desde", default="2015-01-01", help="fecha del primer préstamo")
+    parser.add_argument("--dias", type=int, default=3650, help="días de historial cubiertos")
+    return parser
+
+def main() -> None:
+    args = construir_parser().parse_args()
+    n_usuarios = args.usuarios or max(10, args.prestamos // 20)
+    n_libros = args.libros or max(10, args.prestamos // 50)
+    generar(args.salida, args.prestamos, n_usuarios, n_libros, args.formato, args.tasa_errores,
+            args.semilla, date.fromisoformat(args.desde), args.dias)
+    print(f"Datos generados en {args.salida}: {n_usuarios} usuarios, {n_libros} libros, {args.prestamos} préstamos")
+
+if __name__ == "__main__":
+    main()
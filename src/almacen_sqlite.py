@@ -0,0 +1,475 @@
+"""Motor de almacenamiento SQLite para Almacen (opcional; el motor en memoria sigue siendo el por defecto).
+
+Los catálogos y los préstamos viven en una base SQLite (archivo o ":memory:") en lugar de
+dicts y listas de Python, así que el tamaño de los datos no queda limitado por la RAM y una
+base en archivo se reabre sin volver a cargar los .lfa:
+
+    store = AlmacenSQLite("biblioteca.db")
+    store.cargar_prestamos("prestamos.lfa", incremental=True)  # solo líneas nuevas
+    store.mostrar_estadisticas()
+
+La validación y los mensajes de error son los mismos que en Almacen (se reutilizan sus
+cargar_*); los registros válidos se insertan por lotes con executemany dentro de una
+transacción por carga, y los reportes se resuelven con consultas SQL (GROUP BY para
+estadísticas, rango sobre el índice de vencimientos para vencidos, R*Tree de intervalos para
+los libros prestados un día).
+Los errores de validación se guardan solo durante la sesión, como en Almacen.
+"""
+import sqlite3
+from array import array
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Collection, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from errores import LIMITE_ERRORES
+from indices import IndiceIntervalos
+from lector import Progreso
+from libro import Libro
+from main import Almacen
+from estadisticas import TIPOS_RANKING, Estadisticas
+from prestamo import Prestamo
+from usuario import Usuario
+from utils import hoy, parse_fecha
+
+# Filas acumuladas antes de cada executemany
+TAM_LOTE = 10000
+# Fin del intervalo de un préstamo sin devolución (máximo de rtree_i32)
+FIN_ABIERTO = 2**31 - 1
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS usuarios (
+    id_usuario TEXT PRIMARY KEY,
+    nombre     TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS libros (
+    id_libro TEXT PRIMARY KEY,
+    titulo   TEXT NOT NULL
+);
+-- pos: posición de carga (0, 1, 2...), igual que el índice en Almacen.prestamos.
+-- Fechas en ISO (YYYY-MM-DD): se comparan bien como texto. vence = fecha_prestamo + PLAZO_DIAS.
+CREATE TABLE IF NOT EXISTS prestamos (
+    pos              INTEGER PRIMARY KEY,
+    id_usuario       TEXT NOT NULL,
+    id_libro         TEXT NOT NULL,
+    fecha_prestamo   TEXT NOT NULL,
+    fecha_devolucion TEXT,
+    vence            TEXT NOT NULL,
+    nombre_usuario   TEXT NOT NULL,
+    titulo_libro     TEXT NOT NULL
+);
+-- Por usuario y por libro, ordenados por fecha: historial de un id = rango del índice
+CREATE INDEX IF NOT EXISTS ix_prestamos_usuario ON prestamos (id_usuario, fecha_prestamo);
+CREATE INDEX IF NOT EXISTS ix_prestamos_libro ON prestamos (id_libro, fecha_prestamo);
+CREATE INDEX IF NOT EXISTS ix_prestamos_fecha ON prestamos (fecha_prestamo);
+-- Solo préstamos abiertos: los vencidos a cualquier fecha son un rango de este índice
+CREATE INDEX IF NOT EXISTS ix_prestamos_vence ON prestamos (vence) WHERE fecha_devolucion IS NULL;
+-- Intervalo [inicio, fin) de cada préstamo en ordinales de día (fin = FIN_ABIERTO si no se devolvió):
+-- los préstamos en curso un día d son los que cubren d, sin recorrer la tabla (R*Tree).
+-- Un préstamo devuelto el mismo día que se prestó no cubre ningún día y no se guarda.
+CREATE VIRTUAL TABLE IF NOT EXISTS intervalos USING rtree_i32(pos, inicio, fin, +id_libro);
+-- Cargas incrementales: hasta dónde se procesó cada archivo
+CREATE TABLE IF NOT EXISTS progreso (
+    tipo   TEXT NOT NULL,
+    ruta   TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    linea  INTEGER NOT NULL,
+    PRIMARY KEY (tipo, ruta)
+);
+"""
+
+class _Catalogo(Collection):
+    """Vista de solo lectura de una tabla de catálogo con la interfaz de dict que usa Almacen
+    (in, get, [], values, len), en orden de alta como un dict.
+    """
+
+    def __init__(self, con: sqlite3.Connection, tabla: str, columna_id: str, columna_texto: str, clase) -> None:
+        self._con = con
+        self._clase = clase
+        self._sql_uno = f"SELECT {columna_texto} FROM {tabla} WHERE {columna_id} = ?"
+        self._sql_todos = f"SELECT {columna_id}, {columna_texto} FROM {tabla} ORDER BY rowid"
+        self._sql_ids = f"SELECT {columna_id} FROM {tabla} ORDER BY rowid"
+        self._sql_cantidad = f"SELECT COUNT(*) FROM {tabla}"
+        # Con ids_en_memoria(), 'in' responde desde un set en lugar de consultar la base
+        self._ids: Optional[set] = None
+
+    def get(self, id_: str, defecto=None):
+        fila = self._con.execute(self._sql_uno, (id_,)).fetchone()
+        return self._clase(id_, fila[0]) if fila else defecto
+
+    def __getitem__(self, id_: str):
+        obj = self.get(id_)
+        if obj is None:
+            raise KeyError(id_)
+        return obj
+
+    def __contains__(self, id_: object) -> bool:
+        if self._ids is not None:
+            return id_ in self._ids
+        return self._con.execute(self._sql_uno, (id_,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (fila[0] for fila in self._con.execute(self._sql_ids))
+
+    def __len__(self) -> int:
+        return self._con.execute(self._sql_cantidad).fetchone()[0]
+
+    def values(self):
+        return (self._clase(id_, texto) for id_, texto in self._con.execute(self._sql_todos))
+
+    @contextmanager
+    def ids_en_memoria(self) -> Iterator[None]:
+        """Mientras dure el bloque (con el catálogo sin cambios), 'in' usa un set de ids."""
+        self._ids = {fila[0] for fila in self._con.execute(self._sql_ids)}
+        try:
+            yield
+        finally:
+            self._ids = None
+
+class _TablaPrestamos(Sequence):
+    """Vista de solo lectura de la tabla de préstamos como secuencia de Prestamo (por posición)."""
+
+    _COLUMNAS = "id_usuario, id_libro, fecha_prestamo, fecha_devolucion, nombre_usuario, titulo_libro"
+
+    def __init__(self, con: sqlite3.Connection) -> None:
+        self._con = con
+        # Se mantiene al insertar para no contar filas en cada len()
+        self.cantidad = con.execute("SELECT COUNT(*) FROM prestamos").fetchone()[0]
+
+    @staticmethod
+    def a_prestamo(fila: Tuple) -> Prestamo:
+        id_u, id_l, fp, fd, nombre, titulo = fila
+        return Prestamo(id_u, id_l, parse_fecha(fp), parse_fecha(fd) if fd else None, nombre, titulo)
+
+    def __len__(self) -> int:
+        return self.cantidad
+
+    def __getitem__(self, i: Union[int, slice]):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(self.cantidad))]
+        if i < 0:
+            i += self.cantidad
+        fila = self._con.execute(f"SELECT {self._COLUMNAS} FROM prestamos WHERE pos = ?", (i,)).fetchone()
+        if fila is None:
+            raise IndexError("índice de préstamo fuera de rango")
+        return self.a_prestamo(fila)
+
+    def __iter__(self) -> Iterator[Prestamo]:
+        for fila in self._con.execute(f"SELECT {self._COLUMNAS} FROM prestamos ORDER BY pos"):
+            yield self.a_prestamo(fila)
+
+class _IntervalosPorLibro(IndiceIntervalos):
+    """IndiceIntervalos que se llena bajo demanda: la primera vez que se consulta o se agrega
+    un préstamo de un libro, sus préstamos ya guardados se leen con una consulta sobre el
+    índice por libro. Abrir la base no recorre la tabla; solo se leen los libros que toca
+    una carga (para detectar solapamientos) o un reporte de disponibilidad.
+    """
+
+    def __init__(self, con: sqlite3.Connection) -> None:
+        super().__init__()
+        self._con = con
+        self._leidos: set = set()
+
+    def _leer(self, id_libro: str) -> None:
+        if id_libro in self._leidos:
+            return
+        self._leidos.add(id_libro)
+        consulta = self._con.execute(
+            "SELECT pos, fecha_prestamo, fecha_devolucion FROM prestamos WHERE id_libro = ? ORDER BY pos",
+            (id_libro,))
+        agregar = super().agregar
+        for pos, fp, fd in consulta:
+            agregar(id_libro, pos, date.fromisoformat(fp), date.fromisoformat(fd) if fd else None)
+
+    def agregar(self, id_libro: str, posicion: int, inicio: date, fin: Optional[date]) -> Optional[int]:
+        self._leer(id_libro)
+        return super().agregar(id_libro, posicion, inicio, fin)
+
+    def prestado_en(self, id_libro: str, dia: date) -> Optional[int]:
+        self._leer(id_libro)
+        return super().prestado_en(id_libro, dia)
+
+class AlmacenSQLite(Almacen):
+    """Almacen con los datos en SQLite. 'ruta_db' es el archivo de la base (se crea si no existe)
+    o ":memory:". Los demás parámetros son los de Almacen (columnar no aplica).
+    Todos los reportes que en Almacen leen los índices por usuario/libro o los contadores de
+    préstamos (estructuras en memoria que aquí no se llenan) están redefinidos con consultas SQL.
+    """
+
+    def __init__(self, ruta_db: str = ":memory:", usar_mmap: bool = False, metricas: bool = False,
+                 limite_errores: Optional[int] = LIMITE_ERRORES) -> None:
+        super().__init__(usar_mmap=usar_mmap, metricas=metricas, limite_errores=limite_errores)
+        self.ruta_db = ruta_db
+        self._con = sqlite3.connect(ruta_db)
+        if ruta_db != ":memory:":
+            self._con.execute("PRAGMA journal_mode = WAL")
+            self._con.execute("PRAGMA synchronous = NORMAL")
+        self._con.executescript(_ESQUEMA)
+        self._completar_intervalos()
+        self.usuarios = _Catalogo(self._con, "usuarios", "id_usuario", "nombre", Usuario)
+        self.libros = _Catalogo(self._con, "libros", "id_libro", "titulo", Libro)
+        self.prestamos = _TablaPrestamos(self._con)
+        self._leer_progreso()
+        # Filas pendientes de insertar (se vuelcan cada TAM_LOTE y al terminar la carga)
+        self._lote_usuarios: List[Tuple[str, str]] = []
+        self._lote_libros: List[Tuple[str, str]] = []
+        self._lote_prestamos: List[Tuple] = []
+        self._lote_intervalos: List[Tuple[int, int, int, str]] = []
+        # Solapamientos contra los préstamos ya guardados: cada libro se lee de la base al tocarlo
+        self._intervalos = _IntervalosPorLibro(self._con)
+
+    def _completar_intervalos(self) -> None:
+        """Llena la tabla de intervalos en una base creada antes de que existiera."""
+        if (self._con.execute("SELECT 1 FROM intervalos LIMIT 1").fetchone() is not None
+                or self._con.execute("SELECT 1 FROM prestamos LIMIT 1").fetchone() is None):
+            return
+        # Ordinal de día en SQLite: julianday de 0001-01-01 es 1721425.5 (ver columnas_fechas)
+        self._con.execute(
+            "INSERT INTO intervalos "
+            "SELECT pos, CAST(julianday(fecha_prestamo) - 1721424.5 AS INTEGER), "
+            "       COALESCE(CAST(julianday(fecha_devolucion) - 1721424.5 AS INTEGER), ?), id_libro "
+            "FROM prestamos WHERE fecha_devolucion IS NULL OR fecha_devolucion > fecha_prestamo",
+            (FIN_ABIERTO,))
+        self._con.commit()
+
+    def _leer_progreso(self) -> None:
+        """Progreso de las cargas incrementales según lo confirmado en la base."""
+        self._progreso = {
+            (tipo, ruta): Progreso(offset, linea)
+            for tipo, ruta, offset, linea in self._con.execute("SELECT tipo, ruta, offset, linea FROM progreso")
+        }
+
+    def cerrar(self) -> None:
+        self._con.close()
+
+    def __getstate__(self) -> Dict:
+        raise TypeError("AlmacenSQLite no se serializa: los datos ya persisten en la base " + repr(self.ruta_db))
+
+    # ---------- Carga (misma validación que Almacen; inserción por lotes) ----------
+    @contextmanager
+    def _transaccion(self) -> Iterator[None]:
+        """Una transacción por carga: si algo falla no queda nada a medias en la base, y el
+        progreso en memoria vuelve a lo confirmado (la próxima carga relee lo descartado)."""
+        try:
+            yield
+            self._volcar()
+            self._con.executemany(
+                "INSERT OR REPLACE INTO progreso (tipo, ruta, offset, linea) VALUES (?, ?, ?, ?)",
+                [(tipo, ruta, p.offset, p.linea) for (tipo, ruta), p in self._progreso.items()],
+            )
+            self._con.commit()
+        except BaseException:
+            self._con.rollback()
+            self._lote_usuarios.clear()
+            self._lote_libros.clear()
+            self._lote_prestamos.clear()
+            self._lote_intervalos.clear()
+            self.prestamos.cantidad = self._con.execute("SELECT COUNT(*) FROM prestamos").fetchone()[0]
+            self._leer_progreso()
+            self._intervalos = _IntervalosPorLibro(self._con)
+            raise
+
+    def _volcar(self) -> None:
+        if self._lote_usuarios:
+            self._con.executemany(
+                "INSERT INTO usuarios (id_usuario, nombre) VALUES (?, ?) "
+                "ON CONFLICT (id_usuario) DO UPDATE SET nombre = excluded.nombre", self._lote_usuarios)
+            self._lote_usuarios.clear()
+        if self._lote_libros:
+            self._con.executemany(
+                "INSERT INTO libros (id_libro, titulo) VALUES (?, ?) "
+                "ON CONFLICT (id_libro) DO UPDATE SET titulo = excluded.titulo", self._lote_libros)
+            self._lote_libros.clear()
+        if self._lote_prestamos:
+            self._con.executemany("INSERT INTO prestamos VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self._lote_prestamos)
+            self._lote_prestamos.clear()
+        if self._lote_intervalos:
+            self._con.executemany("INSERT INTO intervalos VALUES (?, ?, ?, ?)", self._lote_intervalos)
+            self._lote_intervalos.clear()
+
+    def cargar_usuarios(self, ruta: str, incremental: bool = False) -> None:
+        with self._transaccion():
+            super().cargar_usuarios(ruta, incremental)
+
+    def cargar_libros(self, ruta: str, incremental: bool = False) -> None:
+        with self._transaccion():
+            super().cargar_libros(ruta, incremental)
+
+    def cargar_prestamos(self, ruta: str, workers: int = 1, incremental: bool = False) -> None:
+        # La verificación de ids contra los catálogos se hace en memoria (una consulta por préstamo sería lenta)
+        with self.usuarios.ids_en_memoria(), self.libros.ids_en_memoria(), self._transaccion():
+            super().cargar_prestamos(ruta, workers, incremental)
+
+    def _guardar_usuario(self, u: Usuario) -> None:
+        self._lote_usuarios.append((u.id_usuario, u.nombre))
+        if len(self._lote_usuarios) >= TAM_LOTE:
+            self._volcar()
+
+    def _guardar_libro(self, l: Libro) -> None:
+        self._lote_libros.append((l.id_libro, l.titulo))
+        if len(self._lote_libros) >= TAM_LOTE:
+            self._volcar()
+
+    def _guardar_prestamo(self, id_u: str, id_l: str, fp, fd, nombre_usuario: str, titulo_libro: str) -> None:
+        vence = fp + timedelta(days=Prestamo.PLAZO_DIAS)
+        self._lote_prestamos.append((
+            self.prestamos.cantidad, id_u, id_l, fp.isoformat(), fd.isoformat() if fd else None,
+            vence.isoformat(), nombre_usuario, titulo_libro,
+        ))
+        if fd is None or fd > fp:
+            self._lote_intervalos.append(
+                (self.prestamos.cantidad, fp.toordinal(), fd.toordinal() if fd else FIN_ABIERTO, id_l))
+        self.prestamos.cantidad += 1
+        if len(self._lote_prestamos) >= TAM_LOTE:
+            self._volcar()
+
+    # ---------- Reportes (consultas SQL) ----------
+    def _preparar_reportes(self, h: Optional[date] = None) -> None:
+        pass  # los reportes son consultas: no hay nada que calcular antes
+
+    def columnas_fechas(self) -> Tuple[array, array]:
+        """Las fechas se convierten a ordinales de día en SQLite (julianday de 0001-01-01 es 1721425.5)."""
+        fp, fd = array("i"), array("i")
+        consulta = self._con.execute(
+            "SELECT CAST(julianday(fecha_prestamo) - 1721424.5 AS INTEGER), "
+            "       COALESCE(CAST(julianday(fecha_devolucion) - 1721424.5 AS INTEGER), 0) "
+            "FROM prestamos ORDER BY pos")
+        for p, d in consulta:
+            fp.append(p)
+            fd.append(d)
+        return fp, fd
+
+    # Filas del historial con la misma resolución de nombres que Prestamo.to_row
+    _SQL_HISTORIAL = (
+        "SELECT p.id_usuario, COALESCE(NULLIF(p.nombre_usuario, ''), NULLIF(u.nombre, ''), p.id_usuario), "
+        "       p.id_libro, COALESCE(NULLIF(p.titulo_libro, ''), NULLIF(l.titulo, ''), p.id_libro), "
+        "       p.fecha_prestamo, COALESCE(p.fecha_devolucion, '') "
+        "FROM prestamos p "
+        "LEFT JOIN usuarios u ON u.id_usuario = p.id_usuario "
+        "LEFT JOIN libros l ON l.id_libro = p.id_libro "
+    )
+
+    def filas_historial(self) -> Iterator[List[str]]:
+        consulta = self._con.execute(self._SQL_HISTORIAL + "ORDER BY p.pos")
+        return (list(fila) for fila in consulta)
+
+    def pagina_historial(self, inicio: int, cantidad: int) -> List[List[str]]:
+        # pos es 0, 1, 2...: la página es un rango de la clave primaria (sin OFFSET)
+        consulta = self._con.execute(self._SQL_HISTORIAL + "WHERE p.pos >= ? AND p.pos < ? ORDER BY p.pos",
+                                     (inicio, inicio + cantidad))
+        return [list(fila) for fila in consulta]
+
+    @staticmethod
+    def _filtro_entidad(tipo: str, solo_abiertos: bool) -> str:
+        if tipo not in ("usuario", "libro"):
+            raise ValueError(f"tipo inválido: {tipo!r} (use 'usuario' o 'libro')")
+        filtro = f"WHERE p.id_{tipo} = ? "
+        if solo_abiertos:
+            filtro += "AND p.fecha_devolucion IS NULL "
+        return filtro + "ORDER BY p.fecha_prestamo, p.pos"
+
+    def _posiciones_de(self, tipo: str, id_: str, solo_abiertos: bool = False) -> List[int]:
+        consulta = self._con.execute("SELECT p.pos FROM prestamos p " + self._filtro_entidad(tipo, solo_abiertos), (id_,))
+        return [fila[0] for fila in consulta]
+
+    def filas_prestamos_de(self, tipo: str, id_: str, solo_abiertos: bool = False) -> List[List[str]]:
+        consulta = self._con.execute(self._SQL_HISTORIAL + self._filtro_entidad(tipo, solo_abiertos), (id_,))
+        return [list(fila) for fila in consulta]
+
+    def filas_libros_prestados(self) -> Iterator[List[str]]:
+        # Cada libro una vez, en orden de su primer préstamo (con el título embebido en ese préstamo)
+        consulta = self._con.execute(
+            "SELECT p.id_libro, COALESCE(l.titulo, p.titulo_libro) "
+            "FROM (SELECT MIN(pos) AS primera FROM prestamos GROUP BY id_libro) f "
+            "JOIN prestamos p ON p.pos = f.primera "
+            "LEFT JOIN libros l ON l.id_libro = p.id_libro "
+            "ORDER BY f.primera")
+        return (list(fila) for fila in consulta)
+
+    def prestamos_vencidos(self, h: Optional[date] = None) -> List[Prestamo]:
+        consulta = self._con.execute(
+            f"SELECT {_TablaPrestamos._COLUMNAS} FROM prestamos "
+            "WHERE fecha_devolucion IS NULL AND vence < ? ORDER BY pos", ((h or hoy()).isoformat(),))
+        return [_TablaPrestamos.a_prestamo(fila) for fila in consulta]
+
+    def filas_vencidos(self, h: Optional[date] = None) -> Iterator[List[str]]:
+        consulta = self._con.execute(
+            "SELECT p.id_usuario, COALESCE(u.nombre, p.nombre_usuario), "
+            "       p.id_libro, COALESCE(l.titulo, p.titulo_libro), p.fecha_prestamo "
+            "FROM prestamos p "
+            "LEFT JOIN usuarios u ON u.id_usuario = p.id_usuario "
+            "LEFT JOIN libros l ON l.id_libro = p.id_libro "
+            "WHERE p.fecha_devolucion IS NULL AND p.vence < ? "
+            "ORDER BY p.pos", ((h or hoy()).isoformat(),))
+        return (list(fila) for fila in consulta)
+
+    def _libros_prestados_en(self, d: date) -> List[str]:
+        """Libros que algún préstamo tiene en su poder el día d, en orden de su primer préstamo.
+        Los intervalos que cubren d salen del R*Tree; el primer préstamo de cada uno de esos
+        libros, del índice por libro (no se recorren los préstamos de los demás libros)."""
+        consulta = self._con.execute(
+            "SELECT id_libro FROM (SELECT DISTINCT id_libro FROM intervalos WHERE inicio <= ?1 AND fin > ?1) e "
+            "ORDER BY (SELECT MIN(pos) FROM prestamos p WHERE p.id_libro = e.id_libro)", (d.toordinal(),))
+        return [fila[0] for fila in consulta]
+
+    def prestamos_activos_en(self, d: Optional[date] = None) -> List[Prestamo]:
+        # Solo los libros prestados ese día pasan por el índice de intervalos (para elegir el mismo préstamo que Almacen)
+        d = d or hoy()
+        return [self.prestamos[self._intervalos.prestado_en(id_l, d)] for id_l in self._libros_prestados_en(d)]
+
+    def libros_disponibles(self, d: Optional[date] = None) -> List[Libro]:
+        prestados = set(self._libros_prestados_en(d or hoy()))
+        return [l for l in self.libros.values() if l.id_libro not in prestados]
+
+    def _frecuencias(self, columna: str) -> Dict[str, int]:
+        """id -> cantidad de préstamos, en orden de primera aparición (como los contadores en memoria)."""
+        return dict(self._con.execute(
+            f"SELECT {columna}, COUNT(*) FROM prestamos GROUP BY {columna} ORDER BY MIN(pos)"))
+
+    def estadisticas(self, h: Optional[date] = None) -> Estadisticas:
+        h = h or hoy()
+        llave = (self.version, h)
+        if self._estadisticas is None or self._estadisticas_llave != llave:
+            vencidos = self._con.execute(
+                "SELECT COUNT(*) FROM prestamos WHERE fecha_devolucion IS NULL AND vence < ?",
+                (h.isoformat(),)).fetchone()[0]
+            self._estadisticas = Estadisticas(
+                total=len(self.prestamos),
+                frec_libros=self._frecuencias("id_libro"),
+                frec_usuarios=self._frecuencias("id_usuario"),
+                vencidos=vencidos,
+                hoy=h,
+            )
+            self._estadisticas_llave = llave
+        return self._estadisticas
+
+    def ranking(self, tipo: str, n: int = 10, desde: Optional[date] = None, hasta: Optional[date] = None) -> List[Tuple]:
+        """Mismo resultado que Almacen.ranking, con GROUP BY + ORDER BY ... LIMIT (top-N de SQLite)."""
+        if tipo not in TIPOS_RANKING:
+            raise ValueError(f"tipo de ranking inválido: {tipo!r} (use {', '.join(TIPOS_RANKING)})")
+        columnas = {"libros": "id_libro", "usuarios": "id_usuario", "pares": "id_usuario, id_libro"}[tipo]
+        condiciones, parametros = [], []
+        if desde is not None:
+            condiciones.append("fecha_prestamo >= ?")
+            parametros.append(desde.isoformat())
+        if hasta is not None:
+            condiciones.append("fecha_prestamo <= ?")
+            parametros.append(hasta.isoformat())
+        where = f"WHERE {' AND '.join(condiciones)} " if condiciones else ""
+        consulta = self._con.execute(
+            f"SELECT {columnas}, COUNT(*) FROM prestamos {where}"
+            f"GROUP BY {columnas} ORDER BY COUNT(*) DESC, MIN(pos) LIMIT ?", (*parametros, max(n, 0)))
+        if tipo == "pares":
+            return [((id_u, id_l), veces) for id_u, id_l, veces in consulta]
+        return [tuple(fila) for fila in consulta]
+
+    def exportar_reportes(
+        self,
+        formato: str = "html",
+        comprimir: bool = False,
+        filas_por_pagina: Optional[int] = None,
+        concurrente: bool = False,
+        h: Optional[date] = None,
+        carpeta: Optional[str] = None,
+    ) -> None:
+        """Igual que en Almacen, pero siempre en serie: todas las consultas usan una sola conexión."""
+        super().exportar_reportes(formato, comprimir, filas_por_pagina, False, h, carpeta)
@@ -0,0 +1,180 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import List, Optional, Sequence, Tuple
+
+from prestamo import Prestamo
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usan los cálculos en Python puro
+    np = None
+
+# Tramos de retraso en la devolución (días después del plazo): <=0, 1-7, 8-30, 31-90, 91-365, >365
+LIMITES_RETRASO = (0, 7, 30, 90, 365)
+TRAMOS_RETRASO = ("A tiempo", "1 a 7 días", "8 a 30 días", "31 a 90 días", "91 a 365 días", "Más de 365 días")
+
+# Ordinal de 1970-01-01: los datetime64[D] de NumPy cuentan días desde esa fecha
+_ORDINAL_EPOCA = date(1970, 1, 1).toordinal()
+
+def _mes(ordinal: int) -> int:
+    """Mes de un ordinal de día como índice absoluto: año * 12 + (mes - 1)."""
+    d = date.fromordinal(ordinal)
+    return d.year * 12 + d.month - 1
+
+def _fin_de_mes(indice_mes: int) -> int:
+    """Ordinal del último día del mes (índice absoluto año * 12 + mes - 1)."""
+    anio, mes = divmod(indice_mes + 1, 12)
+    return date(anio, mes + 1, 1).toordinal() - 1
+
+class Analitica:
+    """Series de tiempo de los préstamos a la fecha 'hoy'.
+    - por_dia / por_semana: [(fecha, préstamos)] sin huecos; las semanas empiezan en lunes.
+    - por_mes: [("AAAA-MM", préstamos)] sin huecos.
+    - duracion_promedio: días promedio entre préstamo y devolución (solo devueltos; None si no hay).
+    - retrasos: [(tramo, devoluciones)] según los días de atraso respecto del plazo (TRAMOS_RETRASO).
+    - vencidos_por_mes: [("AAAA-MM", préstamos vencidos al cierre del mes)], hasta el mes de 'hoy'
+      (el último punto es 'hoy'). Un préstamo cuenta como vencido desde el día siguiente a su
+      fecha límite hasta el día en que se devolvió.
+    """
+
+    def __init__(self, hoy: date) -> None:
+        self.hoy = hoy
+        self.total = 0
+        self.devueltos = 0
+        self.duracion_promedio: Optional[float] = None
+        self.por_dia: List[Tuple[date, int]] = []
+        self.por_semana: List[Tuple[date, int]] = []
+        self.por_mes: List[Tuple[str, int]] = []
+        self.retrasos: List[Tuple[str, int]] = []
+        self.vencidos_por_mes: List[Tuple[str, int]] = []
+
+    @property
+    def abiertos(self) -> int:
+        return self.total - self.devueltos
+
+    def resumen_mensual(self) -> List[Tuple[str, int, Optional[int]]]:
+        """[(mes, préstamos, vencidos al cierre)] para todos los meses de ambas series
+        (las dos empiezan en el mes del primer préstamo); vencidos es None después de 'hoy'.
+        """
+        prestamos = dict(self.por_mes)
+        vencidos = dict(self.vencidos_por_mes)
+        meses = max(self.por_mes, self.vencidos_por_mes, key=len)
+        return [(mes, prestamos.get(mes, 0), vencidos.get(mes)) for mes, _ in meses]
+
+def calcular(fechas_prestamo: Sequence[int], fechas_devolucion: Sequence[int], hoy: date) -> Analitica:
+    """Calcula las series a partir de las fechas como ordinales de día (date.toordinal), una
+    posición por préstamo; 0 en fechas_devolucion = sin devolver (como PrestamosColumnar).
+    Con NumPy las columnas se convierten a arreglos una sola vez y todo se resuelve con
+    operaciones vectorizadas (bincount, sort, searchsorted); sin NumPy, con bucles en Python.
+    """
+    a = Analitica(hoy)
+    a.total = len(fechas_prestamo)
+    if a.total == 0:
+        return a
+    calcular_series = _series_numpy if np is not None else _series_python
+    dias, semanas, meses, retrasos, vencidos = calcular_series(fechas_prestamo, fechas_devolucion, hoy.toordinal(), a)
+    a.por_dia = [(date.fromordinal(o), n) for o, n in dias]
+    a.por_semana = [(date.fromordinal(o), n) for o, n in semanas]
+    a.por_mes = [(_etiqueta_mes(m), n) for m, n in meses]
+    a.retrasos = list(zip(TRAMOS_RETRASO, retrasos))
+    a.vencidos_por_mes = [(_etiqueta_mes(m), n) for m, n in vencidos]
+    return a
+
+def _etiqueta_mes(indice_mes: int) -> str:
+    anio, mes = divmod(indice_mes, 12)
+    return f"{anio:04d}-{mes + 1:02d}"
+
+def _cortes_vencidos(primero: int, h: int) -> List[Tuple[int, int]]:
+    """[(mes, día de corte)]: último día de cada mes desde el del primer préstamo hasta el de 'h' (que se corta en 'h')."""
+    return [(m, min(_fin_de_mes(m), h)) for m in range(_mes(primero), _mes(h) + 1)]
+
+# ---------- Versión vectorizada (NumPy) ----------
+def _series_numpy(fechas_prestamo, fechas_devolucion, h, a):
+    fp = np.asarray(fechas_prestamo, dtype=np.int64)
+    fd = np.asarray(fechas_devolucion, dtype=np.int64)
+    inicio, fin = int(fp.min()), int(fp.max())
+
+    # Préstamos por día: un bincount sobre el desplazamiento desde el primer día
+    por_dia = np.bincount(fp - inicio, minlength=fin - inicio + 1)
+    ordinales = np.arange(inicio, fin + 1)
+    # Semanas (lunes a domingo; el ordinal 1 fue lunes) y meses de cada día del rango
+    semana = (ordinales - 1) // 7
+    por_semana = np.bincount(semana - semana[0], weights=por_dia).astype(np.int64)
+    mes = (ordinales - _ORDINAL_EPOCA).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64) + 1970 * 12
+    por_mes = np.bincount(mes - mes[0], weights=por_dia).astype(np.int64)
+
+    # Duración y retraso de los devueltos
+    devuelto = fd != 0
+    validos = devuelto & (fd >= fp)
+    a.devueltos = int(devuelto.sum())
+    duraciones = fd[validos] - fp[validos]
+    if duraciones.size:
+        a.duracion_promedio = float(duraciones.mean())
+    retraso = duraciones - Prestamo.PLAZO_DIAS
+    tramos = np.bincount(np.searchsorted(LIMITES_RETRASO, retraso, side="left"), minlength=len(TRAMOS_RETRASO))
+
+    # Vencidos al corte: empiezan el día siguiente al límite y terminan al devolverse;
+    # contar con búsquedas binarias sobre comienzos y finales ordenados
+    comienzo = fp + Prestamo.PLAZO_DIAS + 1
+    final = np.where(devuelto, fd, np.iinfo(np.int64).max)
+    vence = comienzo < final
+    comienzos = np.sort(comienzo[vence])
+    finales = np.sort(final[vence])
+    cortes = _cortes_vencidos(inicio, h)
+    dias_corte = np.array([d for _, d in cortes], dtype=np.int64)
+    vencidos = (np.searchsorted(comienzos, dias_corte, side="right")
+                - np.searchsorted(finales, dias_corte, side="right"))
+
+    semana0 = int(semana[0]) * 7 + 1
+    return (
+        list(zip(ordinales.tolist(), por_dia.tolist())),
+        [(semana0 + 7 * i, n) for i, n in enumerate(por_semana.tolist())],
+        [(int(mes[0]) + i, n) for i, n in enumerate(por_mes.tolist())],
+        tramos.tolist(),
+        [(m, n) for (m, _), n in zip(cortes, vencidos.tolist())],
+    )
+
+# ---------- Versión en Python puro ----------
+def _series_python(fechas_prestamo, fechas_devolucion, h, a):
+    inicio, fin = min(fechas_prestamo), max(fechas_prestamo)
+    por_dia = [0] * (fin - inicio + 1)
+    tramos = [0] * len(TRAMOS_RETRASO)
+    comienzos = array("q")
+    finales = array("q")
+    suma_duraciones = cantidad_duraciones = 0
+    plazo = Prestamo.PLAZO_DIAS
+    sin_fin = 2 ** 62
+    for p, d in zip(fechas_prestamo, fechas_devolucion):
+        por_dia[p - inicio] += 1
+        if d:
+            a.devueltos += 1
+            if d >= p:
+                suma_duraciones += d - p
+                cantidad_duraciones += 1
+                tramos[bisect_left(LIMITES_RETRASO, d - p - plazo)] += 1
+        final = d if d else sin_fin
+        if p + plazo + 1 < final:
+            comienzos.append(p + plazo + 1)
+            finales.append(final)
+    if cantidad_duraciones:
+        a.duracion_promedio = suma_duraciones / cantidad_duraciones
+
+    # Semanas y meses se acumulan sobre la serie diaria (un paso por día, no por préstamo)
+    por_semana: List[Tuple[int, int]] = []
+    por_mes: List[Tuple[int, int]] = []
+    for i, n in enumerate(por_dia):
+        o = inicio + i
+        lunes = o - (o - 1) % 7
+        if not por_semana or por_semana[-1][0] != lunes:
+            por_semana.append((lunes, 0))
+        por_semana[-1] = (lunes, por_semana[-1][1] + n)
+        m = _mes(o)
+        if not por_mes or por_mes[-1][0] != m:
+            por_mes.append((m, 0))
+        por_mes[-1] = (m, por_mes[-1][1] + n)
+
+    comienzos = sorted(comienzos)
+    finales = sorted(finales)
+    vencidos = [(m, bisect_right(comienzos, d) - bisect_right(finales, d)) for m, d in _cortes_vencidos(inicio, h)]
+    return [(inicio + i, n) for i, n in enumerate(por_dia)], por_semana, por_mes, tramos, vencidos
@@ -0,0 +1,242 @@
+import os
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import lru_cache
+from typing import Collection, Dict, Iterator, List, Optional, Tuple
+
+from errores import LIBRO_INEXISTENTE, USUARIO_INEXISTENTE, ErrorValidacion
+from lector import (Progreso, fin_de_lectura, iter_lineas, iter_lineas_mmap, iter_lineas_nuevas,
+                    saltar_fin_pendiente)
+from metricas import Metricas
+from utils import TAM_CACHE_FECHAS, parse_fecha
+from validador import validar_prestamo
+
+# Registro ya interpretado: (id_usuario, id_libro, fecha_prestamo, fecha_devolucion, nombre_usuario, titulo_libro)
+RegistroPrestamo = Tuple[str, str, date, Optional[date], str, str]
+# Resultado por línea: (num_linea, registro o None si inválida, errores estructurados).
+# Si el registro es válido, la lista trae los avisos de ids inexistentes en los catálogos (si se pasaron).
+ResultadoLinea = Tuple[int, Optional[RegistroPrestamo], List[ErrorValidacion]]
+# (ids de usuarios, ids de libros) contra los que se verifican los préstamos
+Catalogos = Tuple[Collection[str], Collection[str]]
+
+# Tamaño mínimo de cada bloque para que el costo de enviar trabajo a otro proceso compense
+TAM_MIN_BLOQUE = 1 << 20  # 1 MiB
+# Tamaño máximo: cada worker lee y decodifica su bloque entero, así que la memoria por worker
+# queda acotada aunque el archivo sea enorme (se arman más bloques)
+TAM_MAX_BLOQUE = 32 << 20  # 32 MiB
+# Bloques por worker: más de uno para repartir mejor la carga si hay zonas con más errores
+BLOQUES_POR_WORKER = 4
+# Bloques en vuelo por worker: se envían de a poco para no tener todos los resultados en memoria
+# si el proceso principal consume más lento de lo que producen los workers
+BLOQUES_EN_VUELO_POR_WORKER = 2
+
+def _es_ignorable(linea: str) -> bool:
+    """Comentarios y líneas vacías no se validan."""
+    return not linea or linea.strip().startswith("#")
+
+def interpretar_prestamo(linea: str, validar=validar_prestamo, fecha=parse_fecha) -> Tuple[Optional[RegistroPrestamo], List[ErrorValidacion]]:
+    """Valida una línea de préstamo y, si es correcta, parsea sus fechas.
+    'validar' y 'fecha' permiten pasar versiones medidas (ver Metricas.envolver).
+    """
+    ok, data, errores = validar(linea)
+    if not ok:
+        return None, errores
+    registro = (
+        data["id_usuario"],
+        data["id_libro"],
+        fecha(data["fecha_prestamo"]),
+        fecha(data["fecha_devolucion"]),
+        data.get("nombre_usuario", ""),
+        data.get("titulo_libro", ""),
+    )
+    return registro, []
+
+def avisos_catalogo(id_u: str, id_l: str, catalogos: Catalogos) -> List[ErrorValidacion]:
+    """Avisos de un préstamo válido cuyos ids no están en los catálogos (se guarda igual)."""
+    usuarios, libros = catalogos
+    avisos: List[ErrorValidacion] = []
+    if id_u not in usuarios:
+        avisos.append((USUARIO_INEXISTENTE, 0, id_u))
+    if id_l not in libros:
+        avisos.append((LIBRO_INEXISTENTE, 0, id_l))
+    return avisos
+
+def iter_prestamos(ruta: str, progreso: Optional[Progreso] = None, usar_mmap: bool = False,
+                   metricas: Optional[Metricas] = None, catalogos: Optional[Catalogos] = None) -> Iterator[ResultadoLinea]:
+    """Recorre el archivo en serie y genera un resultado por cada línea no ignorable.
+    Con 'progreso' solo se leen las líneas completas agregadas desde la última vez.
+    Con 'catalogos' cada registro válido trae sus avisos de ids inexistentes (avisos_catalogo).
+    Con usar_mmap se lee con iter_lineas_mmap (mismos resultados).
+    Con 'metricas' se miden lectura, validación y parseo de fechas (fase 'prestamos'); con
+    usar_mmap, las líneas vacías y comentarios que salta el lector no se cuentan.
+    """
+    if progreso is not None:
+        lineas = iter_lineas_nuevas(ruta, progreso)
+    elif usar_mmap:
+        lineas = iter_lineas_mmap(ruta)
+    else:
+        lineas = iter_lineas(ruta)
+    validar, fecha, avisos = validar_prestamo, parse_fecha, avisos_catalogo
+    if metricas is not None:
+        lineas = metricas.iterar("prestamos", lineas, "lectura", "lineas_leidas")
+        validar = metricas.envolver("prestamos", "validacion", validar_prestamo, "lineas_validadas")
+        fecha = metricas.envolver("prestamos", "parseo_fechas", parse_fecha)
+        avisos = metricas.envolver("prestamos", "verificacion", avisos_catalogo)
+    for num, linea in lineas:
+        if _es_ignorable(linea):
+            if metricas is not None:
+                metricas.sumar("prestamos", "lineas_ignoradas")
+            continue
+        registro, errores = interpretar_prestamo(linea, validar, fecha)
+        if registro is not None and catalogos is not None:
+            errores = avisos(registro[0], registro[1], catalogos)
+        yield num, registro, errores
+
+# ---------- Modo paralelo ----------
+
+def dividir_en_bloques(ruta: str, cantidad: int, desde: int = 0, hasta: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Divide el rango [desde, hasta) del archivo (por defecto, todo) en rangos de bytes
+    [inicio, fin) alineados a fin de línea. Arma al menos 'cantidad' bloques si alcanzan a medir
+    TAM_MIN_BLOQUE, y más si hace falta para que ninguno supere TAM_MAX_BLOQUE (salvo por el
+    resto de la línea donde cae el corte).
+    """
+    tam = os.path.getsize(ruta) if hasta is None else hasta
+    if tam <= desde:
+        return []
+    cantidad = max(1, min(cantidad, (tam - desde) // TAM_MIN_BLOQUE or 1), -(-(tam - desde) // TAM_MAX_BLOQUE))
+    paso = (tam - desde) // cantidad
+    limites = [desde]
+    with open(ruta, "rb") as f:
+        for i in range(1, cantidad):
+            f.seek(max(desde + i * paso, limites[-1]))
+            f.readline()  # avanzar hasta el siguiente '\n' (incluido)
+            pos = f.tell()
+            if pos >= tam:
+                break
+            if pos > limites[-1]:
+                limites.append(pos)
+    limites.append(tam)
+    return [(limites[i], limites[i + 1]) for i in range(len(limites) - 1)]
+
+def _lineas_de_bloque(crudo: bytes) -> List[str]:
+    """Decodifica un bloque y lo separa en líneas igual que el modo texto de open()."""
+    texto = crudo.decode("utf-8")
+    # Modo texto traduce '\r\n' y '\r' a '\n'
+    texto = texto.replace("\r\n", "\n").replace("\r", "\n")
+    lineas = texto.split("\n")
+    if lineas and lineas[-1] == "":
+        lineas.pop()  # el bloque termina en salto de línea
+    return lineas
+
+# Catálogos del worker: se envían una vez por proceso (initializer) y no con cada bloque
+_catalogos_worker: Optional[Catalogos] = None
+
+def _iniciar_worker(catalogos: Optional[Catalogos]) -> None:
+    global _catalogos_worker
+    _catalogos_worker = catalogos
+
+# Resultados de un bloque por columnas: (num_linea, id_usuario, id_libro, ordinal de fecha_prestamo,
+# ordinal de fecha_devolucion o 0, nombre, titulo, {índice: errores}). Una línea rechazada tiene
+# fecha_prestamo 0. Deshacer el pickle de unos pocos arrays y listas de str cuesta mucho menos
+# en el proceso principal que una tupla (con sus fechas) por línea.
+BloqueProcesado = Tuple[array, List[str], List[str], array, array, List[str], List[str], Dict[int, List[ErrorValidacion]]]
+
+def _procesar_bloque(ruta: str, inicio: int, fin: int) -> Tuple[int, BloqueProcesado]:
+    """Trabajo de cada proceso: devuelve (lineas_del_bloque, resultados con numeración local).
+    Además de validar y parsear, verifica los ids contra los catálogos del worker.
+    """
+    with open(ruta, "rb") as f:
+        f.seek(inicio)
+        crudo = f.read(fin - inicio)
+    lineas = _lineas_de_bloque(crudo)
+    nums, prestamos, devoluciones = array("q"), array("l"), array("l")
+    ids_u: List[str] = []
+    ids_l: List[str] = []
+    nombres: List[str] = []
+    titulos: List[str] = []
+    errores_por_indice: Dict[int, List[ErrorValidacion]] = {}
+    num = 0
+    for linea in lineas:
+        num += 1
+        if _es_ignorable(linea):
+            continue
+        registro, errores = interpretar_prestamo(linea)
+        if registro is None:
+            registro = ("", "", None, None, "", "")
+        elif _catalogos_worker is not None:
+            errores = avisos_catalogo(registro[0], registro[1], _catalogos_worker)
+        if errores:
+            errores_por_indice[len(nums)] = errores
+        id_u, id_l, fp, fd, nombre, titulo = registro
+        nums.append(num)
+        ids_u.append(id_u)
+        ids_l.append(id_l)
+        prestamos.append(fp.toordinal() if fp else 0)
+        devoluciones.append(fd.toordinal() if fd else 0)
+        nombres.append(nombre)
+        titulos.append(titulo)
+    return len(lineas), (nums, ids_u, ids_l, prestamos, devoluciones, nombres, titulos, errores_por_indice)
+
+@lru_cache(maxsize=TAM_CACHE_FECHAS)
+def _fecha(ordinal: int) -> Optional[date]:
+    return date.fromordinal(ordinal) if ordinal else None
+
+def _resultados_de_bloque(bloque: BloqueProcesado, base: int) -> Iterator[ResultadoLinea]:
+    """Vuelve a armar los resultados de un bloque, con el número de línea global (base + local)."""
+    nums, ids_u, ids_l, prestamos, devoluciones, nombres, titulos, errores = bloque
+    columnas = zip(nums, ids_u, ids_l, prestamos, devoluciones, nombres, titulos)
+    for i, (num, id_u, id_l, fp, fd, nombre, titulo) in enumerate(columnas):
+        if not fp:
+            yield base + num, None, errores[i]
+        else:
+            yield base + num, (id_u, id_l, _fecha(fp), _fecha(fd), nombre, titulo), errores.get(i, [])
+
+def _procesar_en_orden(pool: ProcessPoolExecutor, ruta: str, bloques: List[Tuple[int, int]],
+                       en_vuelo: int) -> Iterator[Tuple[int, BloqueProcesado]]:
+    """Como pool.map, pero con a lo sumo 'en_vuelo' bloques enviados y sin entregar: el resultado
+    de cada bloque se pide recién cuando se entregó uno anterior."""
+    pendientes: deque = deque()
+    for inicio, fin in bloques:
+        if len(pendientes) >= en_vuelo:
+            yield pendientes.popleft().result()
+        pendientes.append(pool.submit(_procesar_bloque, ruta, inicio, fin))
+    while pendientes:
+        yield pendientes.popleft().result()
+
+def iter_prestamos_paralelo(ruta: str, workers: int, progreso: Optional[Progreso] = None,
+                            metricas: Optional[Metricas] = None,
+                            catalogos: Optional[Catalogos] = None) -> Iterator[ResultadoLinea]:
+    """Igual que iter_prestamos, pero validando/parseando (y verificando contra 'catalogos')
+    bloques en un ProcessPoolExecutor, con BLOQUES_EN_VUELO_POR_WORKER bloques por worker en vuelo.
+    Los resultados se entregan en el orden original y con el número de línea global.
+    Con 'metricas' se cuentan líneas y bloques, y se mide el tiempo esperando a los workers
+    (lectura y validación ocurren en los otros procesos).
+    """
+    if progreso is None:
+        bloques = dividir_en_bloques(ruta, workers * BLOQUES_POR_WORKER)
+    else:
+        saltar_fin_pendiente(ruta, progreso)
+        bloques = dividir_en_bloques(ruta, workers * BLOQUES_POR_WORKER, progreso.offset, fin_de_lectura(ruta, progreso))
+    if len(bloques) <= 1:
+        # Poco por leer: no compensa levantar procesos
+        yield from iter_prestamos(ruta, progreso, metricas=metricas, catalogos=catalogos)
+        return
+    if catalogos is not None:
+        catalogos = (frozenset(catalogos[0]), frozenset(catalogos[1]))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker, initargs=(catalogos,)) as pool:
+        base = progreso.linea if progreso else 0  # líneas de los bloques anteriores
+        procesados = _procesar_en_orden(pool, ruta, bloques, workers * BLOQUES_EN_VUELO_POR_WORKER)
+        if metricas is not None:
+            procesados = metricas.iterar("prestamos", procesados, "espera_workers", "bloques")
+        for (_, fin), (n_lineas, bloque) in zip(bloques, procesados):
+            if metricas is not None:
+                validadas = len(bloque[0])
+                metricas.sumar("prestamos", "lineas_leidas", n_lineas)
+                metricas.sumar("prestamos", "lineas_validadas", validadas)
+                metricas.sumar("prestamos", "lineas_ignoradas", n_lineas - validadas)
+            yield from _resultados_de_bloque(bloque, base)
+            base += n_lineas
+            if progreso is not None:
+                progreso.offset, progreso.linea = fin, base
@@ -0,0 +1,246 @@
+"""Modo por lotes (sin menú) del sistema de biblioteca.
+
+Ejemplos (desde la carpeta src):
+    python cli.py load --timings
+    python cli.py report historial vencidos --hoy 2025-09-10
+    python cli.py export --salida ../output --filas-por-pagina 5000 --concurrente
+    python cli.py export --formato jsonl --gzip --salida /tmp/datos   # para procesos posteriores
+    python cli.py stats --prestamos ../data/prestamos.lfa --workers 8
+    python cli.py report vencidos --snapshot /tmp/biblioteca.snap
+    python cli.py load --metricas metricas.json
+    python cli.py ranking pares --top 20 --desde 2025-01-01 --hasta 2025-06-30 --html ../output
+    python cli.py stats --sqlite biblioteca.db      # cada corrida solo agrega lo nuevo de los .lfa
+    python cli.py serve --puerto 8000               # reportes HTML/JSON por HTTP; POST /recargar
+
+Códigos de salida:
+    0  todo correcto
+    1  error de ejecución (archivo inexistente, permisos, etc.)
+    2  uso incorrecto de la línea de comandos (argparse)
+    3  con --estricto: la carga registró errores de validación
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date
+from typing import List, Optional, Tuple
+
+from datos_exporter import EXTENSIONES
+from errores import LIMITE_ERRORES
+from estadisticas import TIPOS_RANKING
+from almacen_sqlite import AlmacenSQLite
+from main import Almacen, DATA_DIR, OUT_DIR
+from servidor import POR_PAGINA, servir
+from snapshot import cargar_snapshot, guardar_snapshot
+from utils import parse_fecha
+
+SALIDA_OK = 0
+SALIDA_ERROR = 1
+SALIDA_VALIDACION = 3
+
+REPORTES = ("historial", "usuarios", "libros", "estadisticas", "vencidos", "errores")
+
+class Cronometro:
+    """Acumula el tiempo de cada fase y, si se conoce, la cantidad de filas procesadas."""
+
+    def __init__(self, activo: bool) -> None:
+        self.activo = activo
+        self.fases: List[Tuple[str, float, Optional[int]]] = []
+
+    def medir(self, nombre: str, funcion, *args, filas=None, **kwargs):
+        """Ejecuta funcion(*args, **kwargs) midiendo su duración.
+        'filas' puede ser un entero o una función que lo calcula después de ejecutar.
+        """
+        inicio = time.perf_counter()
+        resultado = funcion(*args, **kwargs)
+        duracion = time.perf_counter() - inicio
+        if callable(filas):
+            filas = filas()
+        self.fases.append((nombre, duracion, filas))
+        return resultado
+
+    def imprimir(self) -> None:
+        if not self.activo:
+            return
+        # A stderr para no mezclarse con la salida de los reportes
+        print("TIEMPOS", file=sys.stderr)
+        print("-" * 60, file=sys.stderr)
+        for nombre, duracion, filas in self.fases:
+            linea = f"{nombre:<24} {duracion:>10.3f} s"
+            if filas is not None:
+                por_seg = filas / duracion if duracion > 0 else float("inf")
+                linea += f" {filas:>12} filas {por_seg:>14,.0f} filas/s"
+            print(linea, file=sys.stderr)
+        total = sum(d for _, d, _ in self.fases)
+        print(f"{'total':<24} {total:>10.3f} s", file=sys.stderr)
+
+def _fecha(valor: str) -> date:
+    """Tipo argparse para --hoy (YYYY-MM-DD)."""
+    try:
+        return parse_fecha(valor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"fecha inválida: {valor!r} (use YYYY-MM-DD)")
+
+def construir_parser() -> argparse.ArgumentParser:
+    comunes = argparse.ArgumentParser(add_help=False)
+    comunes.add_argument("--usuarios", default=os.path.join(DATA_DIR, "usuarios.lfa"), help="archivo de usuarios")
+    comunes.add_argument("--libros", default=os.path.join(DATA_DIR, "libros.lfa"), help="archivo de libros")
+    comunes.add_argument("--prestamos", default=os.path.join(DATA_DIR, "prestamos.lfa"), help="archivo de préstamos")
+    comunes.add_argument("--workers", type=int, default=1, help="procesos para validar préstamos (1 = en serie)")
+    comunes.add_argument("--columnar", action="store_true", help="guardar préstamos en formato columnar")
+    comunes.add_argument("--mmap", action="store_true", help="leer los .lfa con mmap (cargas masivas)")
+    comunes.add_argument("--hoy", type=_fecha, default=None, help="fecha de referencia para vencidos (YYYY-MM-DD)")
+    comunes.add_argument("--timings", action="store_true", help="imprimir tiempo por fase y filas/s en stderr")
+    comunes.add_argument("--sqlite", default=None, metavar="DB",
+                         help="guardar los datos en esta base SQLite (cargas incrementales entre corridas)")
+    comunes.add_argument("--snapshot", default=None,
+                         help="snapshot binario: se usa si los .lfa no cambiaron; si no, se regenera")
+    comunes.add_argument("--metricas", default=None, metavar="ARCHIVO",
+                         help="guardar contadores y tiempos internos en JSON ('-' = stderr)")
+    comunes.add_argument("--limite-errores", type=int, default=LIMITE_ERRORES, metavar="N",
+                         help=f"errores guardados como máximo; el resto solo se cuenta (0 = sin límite, por defecto {LIMITE_ERRORES})")
+    comunes.add_argument("--estricto", action="store_true", help="salir con código 3 si hubo errores de validación")
+
+    parser = argparse.ArgumentParser(prog="cli.py", description="Biblioteca Digital - modo por lotes")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    sub.add_parser("load", parents=[comunes], help="cargar los tres archivos y resumir la carga")
+
+    p_report = sub.add_parser("report", parents=[comunes], help="mostrar reportes en consola")
+    p_report.add_argument("reportes", nargs="+", choices=REPORTES, metavar="REPORTE",
+                          help="uno o más de: " + ", ".join(REPORTES))
+
+    p_export = sub.add_parser("export", parents=[comunes], help="exportar los reportes a HTML")
+    p_export.add_argument("--salida", default=OUT_DIR, help="carpeta destino de los HTML")
+    p_export.add_argument("--filas-por-pagina", type=int, default=None, help="paginar tablas grandes")
+    p_export.add_argument("--concurrente", action="store_true", help="generar los reportes en paralelo")
+    p_export.add_argument("--formato", choices=("html",) + tuple(EXTENSIONES), default="html",
+                          help="html (por defecto), csv o jsonl (un objeto JSON por línea)")
+    p_export.add_argument("--gzip", action="store_true", help="comprimir los archivos csv/jsonl (.gz)")
+
+    sub.add_parser("stats", parents=[comunes], help="mostrar estadísticas de préstamos")
+
+    p_ranking = sub.add_parser("ranking", parents=[comunes], help="top N de libros, usuarios o pares usuario-libro")
+    p_ranking.add_argument("tipo", choices=TIPOS_RANKING)
+    p_ranking.add_argument("--top", type=int, default=10, help="cantidad de puestos (por defecto 10)")
+    p_ranking.add_argument("--desde", type=_fecha, default=None, help="solo préstamos desde esta fecha (YYYY-MM-DD)")
+    p_ranking.add_argument("--hasta", type=_fecha, default=None, help="solo préstamos hasta esta fecha (YYYY-MM-DD)")
+    p_ranking.add_argument("--html", default=None, metavar="CARPETA", help="además exportar ranking_<tipo>.html")
+
+    p_serve = sub.add_parser("serve", parents=[comunes], help="servir los reportes por HTTP (HTML y JSON)")
+    p_serve.add_argument("--host", default="127.0.0.1", help="dirección donde escuchar (por defecto 127.0.0.1)")
+    p_serve.add_argument("--puerto", type=int, default=8000, help="puerto (por defecto 8000)")
+    p_serve.add_argument("--por-pagina", type=int, default=POR_PAGINA,
+                         help=f"filas por página si la petición no indica otra cosa (por defecto {POR_PAGINA})")
+    return parser
+
+def cargar(store: Almacen, args: argparse.Namespace, crono: Cronometro, incremental: bool = False) -> None:
+    """Carga catálogos y préstamos en el mismo orden que el menú (1, 2, 3)."""
+    crono.medir("cargar_usuarios", store.cargar_usuarios, args.usuarios, incremental=incremental,
+                filas=lambda: len(store.usuarios))
+    crono.medir("cargar_libros", store.cargar_libros, args.libros, incremental=incremental,
+                filas=lambda: len(store.libros))
+    crono.medir("cargar_prestamos", store.cargar_prestamos, args.prestamos, workers=args.workers,
+                incremental=incremental, filas=lambda: len(store.prestamos))
+
+def obtener_almacen(args: argparse.Namespace, crono: Cronometro) -> Almacen:
+    """Carga desde el snapshot si está vigente; si no, desde los .lfa (y guarda el snapshot).
+    El servidor carga en modo incremental para que /recargar solo lea lo agregado después.
+    """
+    if args.sqlite:
+        # La base ya guarda lo cargado en corridas anteriores: solo se agrega lo nuevo
+        store = AlmacenSQLite(args.sqlite, usar_mmap=args.mmap, metricas=bool(args.metricas),
+                              limite_errores=args.limite_errores or None)
+        cargar(store, args, crono, incremental=True)
+        return store
+    fuentes = [args.usuarios, args.libros, args.prestamos]
+    if args.snapshot:
+        store = crono.medir("cargar_snapshot", cargar_snapshot, args.snapshot, fuentes)
+        if store is not None:
+            if args.metricas:
+                store.activar_metricas()
+            return store
+    store = Almacen(columnar=args.columnar, usar_mmap=args.mmap, metricas=bool(args.metricas),
+                    limite_errores=args.limite_errores or None)
+    cargar(store, args, crono, incremental=args.comando == "serve")
+    if args.snapshot:
+        crono.medir("guardar_snapshot", guardar_snapshot, store, args.snapshot, fuentes)
+    return store
+
+def escribir_metricas(store: Almacen, destino: str) -> None:
+    texto = json.dumps(store.metricas(), ensure_ascii=False, indent=2)
+    if destino == "-":
+        print(texto, file=sys.stderr)
+        return
+    with open(destino, "w", encoding="utf-8") as f:
+        f.write(texto + "\n")
+
+def ejecutar(args: argparse.Namespace) -> int:
+    crono = Cronometro(args.timings)
+    store = obtener_almacen(args, crono)
+
+    if args.comando == "load":
+        print(f"Usuarios: {len(store.usuarios)}")
+        print(f"Libros: {len(store.libros)}")
+        print(f"Préstamos: {len(store.prestamos)}")
+        print(f"Errores: {store.errores.total}")
+    elif args.comando == "report":
+        acciones = {
+            "historial": (store.mostrar_historial, ()),
+            "usuarios": (store.mostrar_usuarios_unicos, ()),
+            "libros": (store.mostrar_libros_prestados, ()),
+            "estadisticas": (store.mostrar_estadisticas, (args.hoy,)),
+            "vencidos": (store.mostrar_prestamos_vencidos, (args.hoy,)),
+            "errores": (store.mostrar_errores, ()),
+        }
+        for nombre in args.reportes:
+            funcion, extra = acciones[nombre]
+            crono.medir(f"report {nombre}", funcion, *extra)
+    elif args.comando == "export":
+        os.makedirs(args.salida, exist_ok=True)
+        crono.medir(f"exportar_reportes ({args.formato})", store.exportar_reportes,
+                    formato=args.formato, comprimir=args.gzip,
+                    filas_por_pagina=args.filas_por_pagina, concurrente=args.concurrente,
+                    h=args.hoy, carpeta=args.salida, filas=len(store.prestamos))
+    elif args.comando == "stats":
+        crono.medir("estadisticas", store.mostrar_estadisticas, args.hoy, filas=len(store.prestamos))
+    elif args.comando == "ranking":
+        crono.medir("ranking", store.mostrar_ranking, args.tipo, args.top, args.desde, args.hasta)
+        if args.html:
+            os.makedirs(args.html, exist_ok=True)
+            crono.medir("exportar_ranking_html", store.exportar_ranking_html,
+                        args.tipo, args.top, args.desde, args.hasta, args.html)
+    elif args.comando == "serve":
+        crono.imprimir()  # tiempos de la carga inicial, antes de quedar atendiendo
+        crono = Cronometro(False)
+        servir(store, lambda: cargar(store, args, Cronometro(False), incremental=True),
+               args.host, args.puerto, args.hoy, args.por_pagina)
+
+    crono.imprimir()
+    if args.metricas:
+        escribir_metricas(store, args.metricas)
+    if args.estricto and store.errores.total:
+        print(f"Se registraron {store.errores.total} errores de validación.", file=sys.stderr)
+        return SALIDA_VALIDACION
+    return SALIDA_OK
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = construir_parser()
+    args = parser.parse_args(argv)
+    if args.sqlite and (args.snapshot or args.columnar):
+        parser.error("--sqlite no se combina con --snapshot ni --columnar")
+    if args.comando == "export" and args.formato != "html" and args.filas_por_pagina:
+        parser.error("--filas-por-pagina solo aplica a --formato html")
+    if args.comando == "export" and args.gzip and args.formato == "html":
+        parser.error("--gzip solo aplica a --formato csv o jsonl")
+    if args.comando == "serve" and args.snapshot:
+        parser.error("serve no usa --snapshot (la recarga necesita saber hasta dónde se leyó cada archivo)")
+    try:
+        return ejecutar(args)
+    except (OSError, ValueError) as ex:
+        print(f"Error: {ex}", file=sys.stderr)
+        return SALIDA_ERROR
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import csv
+import json
+import unicodedata
+from json.encoder import encode_basestring
+from typing import Iterable, List
+
+from html_exporter import FILAS_POR_BLOQUE, escritura_atomica
+
+# Formatos de datos (además de "html") y extensión de sus archivos; con gzip se agrega ".gz"
+EXTENSIONES = {"csv": ".csv", "jsonl": ".jsonl"}
+
+def clave_columna(encabezado: str) -> str:
+    """Nombre de columna para CSV/JSON a partir del encabezado del reporte:
+    "Fecha Préstamo" -> "fecha_prestamo", "ID Usuario" -> "id_usuario".
+    """
+    sin_tildes = unicodedata.normalize("NFKD", encabezado).encode("ascii", "ignore").decode("ascii")
+    return "_".join(sin_tildes.lower().split())
+
+def exportar_csv(headers: List[str], filas: Iterable[List[str]], destino: str, comprimir: bool = False) -> None:
+    """CSV en UTF-8 (primera fila: nombres de columna). Las filas se escriben a medida que
+    se recorren, así que la memoria no depende del tamaño del reporte."""
+    with escritura_atomica(destino, comprimir, newline="") as f:
+        escritor = csv.writer(f)
+        escritor.writerow([clave_columna(h) for h in headers])
+        escritor.writerows(filas)
+
+def exportar_jsonl(headers: List[str], filas: Iterable[List[str]], destino: str, comprimir: bool = False) -> None:
+    """JSON Lines: un objeto {columna: valor} por línea, en UTF-8, escrito en bloques de FILAS_POR_BLOQUE."""
+    # Las filas son de textos: las claves se codifican una vez en una plantilla y por fila solo
+    # se codifican los valores (bastante más rápido que armar un dict y pasarlo por json)
+    codificar = json.JSONEncoder(ensure_ascii=False).encode
+    plantilla = "{" + ", ".join(codificar(clave_columna(h)).replace("%", "%%") + ": %s" for h in headers) + "}"
+    with escritura_atomica(destino, comprimir) as f:
+        bloque: List[str] = []
+        for fila in filas:
+            bloque.append(plantilla % tuple(map(encode_basestring, fila)))
+            if len(bloque) >= FILAS_POR_BLOQUE:
+                bloque.append("")
+                f.write("\n".join(bloque))
+                bloque.clear()
+        if bloque:
+            bloque.append("")
+            f.write("\n".join(bloque))
+
+def exportar_datos(formato: str, headers: List[str], filas: Iterable[List[str]], destino: str, comprimir: bool = False) -> None:
+    """Exporta en "csv" o "jsonl" (ver EXTENSIONES)."""
+    if formato == "csv":
+        exportar_csv(headers, filas, destino, comprimir)
+    elif formato == "jsonl":
+        exportar_jsonl(headers, filas, destino, comprimir)
+    else:
+        raise ValueError(f"formato de datos inválido: {formato!r} (use {', '.join(EXTENSIONES)})")
@@ -0,0 +1,138 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Códigos de error de validación y carga
+CARACTER_INVALIDO = "caracter_invalido"
+CANTIDAD_CAMPOS = "cantidad_campos"
+CAMPO_VACIO = "campo_vacio"
+FECHA_PRESTAMO_INVALIDA = "fecha_prestamo_invalida"
+FECHA_DEVOLUCION_INVALIDA = "fecha_devolucion_invalida"
+USUARIO_INEXISTENTE = "usuario_inexistente"
+LIBRO_INEXISTENTE = "libro_inexistente"
+PRESTAMO_SOLAPADO = "prestamo_solapado"
+
+# Error devuelto por los validadores: (codigo, posicion, valor).
+# 'posicion' es la columna (1-indexed) del carácter inválido, o 0 si no aplica;
+# 'valor' es el carácter, la fecha o el id erróneo, o la cantidad de campos recibidos.
+# En PRESTAMO_SOLAPADO, 'posicion' es el número (1-indexed) en el historial del préstamo con que choca.
+ErrorValidacion = Tuple[str, int, str]
+# Error registrado en una carga: (archivo, num_linea, codigo, posicion, valor)
+RegistroError = Tuple[str, int, str, int, str]
+
+# Máximo de errores guardados por defecto (los contadores por código siguen después del límite)
+LIMITE_ERRORES = 100_000
+
+# Textos de cada código (mismo texto que se mostraba antes de guardar errores estructurados)
+_MENSAJES: Dict[str, str] = {
+    CARACTER_INVALIDO: "pos {pos}: '{valor}' inválido",
+    FECHA_PRESTAMO_INVALIDA: "fecha_prestamo inválida: {valor!r}",
+    FECHA_DEVOLUCION_INVALIDA: "fecha_devolucion inválida: {valor!r}",
+    USUARIO_INEXISTENTE: "id_usuario {valor!r} no existe en catálogo de usuarios",
+    LIBRO_INEXISTENTE: "id_libro {valor!r} no existe en catálogo de libros",
+    PRESTAMO_SOLAPADO: "id_libro {valor!r} ya estaba prestado en esas fechas (se superpone con el préstamo #{pos} del historial)",
+}
+# Códigos cuyo texto depende del tipo de archivo
+_MENSAJES_POR_ARCHIVO: Dict[Tuple[str, str], str] = {
+    ("usuarios", CANTIDAD_CAMPOS): "Se esperaban 2 campos (id|nombre), recibidos: {valor}",
+    ("libros", CANTIDAD_CAMPOS): "Se esperaban 2 campos (id|titulo), recibidos: {valor}",
+    ("prestamos", CANTIDAD_CAMPOS): "Formato no soportado. Use 4 o 6 campos. Recibidos: {valor}",
+    ("usuarios", CAMPO_VACIO): "id_usuario y nombre no pueden ser vacíos",
+    ("libros", CAMPO_VACIO): "id_libro y titulo no pueden ser vacíos",
+}
+
+def mensaje(archivo: str, codigo: str, pos: int, valor: str) -> str:
+    """Texto legible de un error (sin el prefijo de archivo y línea)."""
+    plantilla = _MENSAJES_POR_ARCHIVO.get((archivo, codigo)) or _MENSAJES.get(codigo)
+    if plantilla is None:
+        return f"{codigo}: {valor}" if valor else codigo
+    return plantilla.format(pos=pos, valor=valor)
+
+def formatear(archivo: str, linea: int, codigo: str, pos: int, valor: str) -> str:
+    """Línea de reporte de un error, p. ej. "[usuarios] Línea 3: pos 7: '$' inválido"."""
+    return f"[{archivo}] Línea {linea}: {mensaje(archivo, codigo, pos, valor)}"
+
+class ColeccionErrores:
+    """Errores de carga guardados como registros estructurados y compactos.
+
+    - Cada registro ocupa unas pocas posiciones en arrays de enteros (archivo y código como
+      índices a una tabla de textos) más el valor erróneo; el texto se arma solo al mostrarlo.
+    - Se guardan como máximo 'limite' registros (None = sin límite). Después del límite los
+      contadores por (archivo, código) y el total siguen contando, así que un archivo muy dañado
+      no agota la memoria pero el resumen sigue siendo exacto.
+    - Se recorre como una lista de mensajes: iterar (o indexar) entrega el mismo texto que antes.
+      len() es la cantidad de errores guardados; 'total' cuenta también los que ya no se guardaron.
+    """
+
+    def __init__(self, limite: Optional[int] = LIMITE_ERRORES) -> None:
+        self.limite = limite
+        # Errores detectados, incluidos los descartados por el límite
+        self.total = 0
+        self.conteo: Dict[Tuple[str, str], int] = {}
+        # Tabla de textos (archivos y códigos) y su índice
+        self._textos: List[str] = []
+        self._indices: Dict[str, int] = {}
+        # Columnas de los registros guardados
+        self._archivo = array("H")
+        self._codigo = array("H")
+        self._linea = array("q")
+        self._pos = array("q")
+        self._valor: List[str] = []
+
+    def _indice(self, texto: str) -> int:
+        i = self._indices.get(texto)
+        if i is None:
+            i = self._indices[texto] = len(self._textos)
+            self._textos.append(texto)
+        return i
+
+    def agregar(self, archivo: str, linea: int, codigo: str, pos: int = 0, valor: str = "") -> None:
+        self.total += 1
+        llave = (archivo, codigo)
+        self.conteo[llave] = self.conteo.get(llave, 0) + 1
+        if self.limite is not None and len(self._valor) >= self.limite:
+            return
+        self._archivo.append(self._indice(archivo))
+        self._codigo.append(self._indice(codigo))
+        self._linea.append(linea)
+        self._pos.append(pos)
+        self._valor.append(valor)
+
+    def agregar_todos(self, archivo: str, linea: int, errores: Iterable[ErrorValidacion]) -> None:
+        """Registra los errores que devolvió un validador para una línea."""
+        for codigo, pos, valor in errores:
+            self.agregar(archivo, linea, codigo, pos, valor)
+
+    @property
+    def descartados(self) -> int:
+        """Errores detectados que no se guardaron por el límite."""
+        return self.total - len(self._valor)
+
+    def registro(self, i: int) -> RegistroError:
+        t = self._textos
+        return t[self._archivo[i]], self._linea[i], t[self._codigo[i]], self._pos[i], self._valor[i]
+
+    def registros(self) -> Iterator[RegistroError]:
+        """Registros guardados (archivo, num_linea, codigo, posicion, valor), en orden de detección."""
+        return (self.registro(i) for i in range(len(self._valor)))
+
+    def resumen(self) -> Dict[str, Dict[str, int]]:
+        """{archivo: {codigo: cantidad}} con todos los errores detectados (también los descartados)."""
+        salida: Dict[str, Dict[str, int]] = {}
+        for (archivo, codigo), n in self.conteo.items():
+            salida.setdefault(archivo, {})[codigo] = n
+        return salida
+
+    def __len__(self) -> int:
+        return len(self._valor)
+
+    def __iter__(self) -> Iterator[str]:
+        return (formatear(*r) for r in self.registros())
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(i, slice):
+            return [formatear(*self.registro(k)) for k in range(*i.indices(len(self._valor)))]
+        if i < 0:
+            i += len(self._valor)
+        if not 0 <= i < len(self._valor):
+            raise IndexError("índice de error fuera de rango")
+        return formatear(*self.registro(i))
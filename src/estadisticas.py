@@ -0,0 +1,113 @@
+from datetime import date
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from indices import IndiceFechas, IndicePorEntidad, IndiceVencimientos
+from prestamo import Prestamo
+from utils import max_por_valor
+
+# Rankings disponibles: libros, usuarios y pares (usuario, libro)
+TIPOS_RANKING = ("libros", "usuarios", "pares")
+
+class Estadisticas:
+    """Resumen de préstamos a una fecha; se arma con los contadores de ContadoresPrestamos."""
+
+    def __init__(self, total: int, frec_libros: Dict[str, int], frec_usuarios: Dict[str, int], vencidos: int, hoy: date) -> None:
+        # total: cantidad de préstamos
+        self.total = total
+        # frec_libros / frec_usuarios: id -> veces (en orden de primera aparición)
+        self.frec_libros = frec_libros
+        self.frec_usuarios = frec_usuarios
+        # vencidos: préstamos no devueltos fuera de plazo a la fecha 'hoy'
+        self.vencidos = vencidos
+        self.hoy = hoy
+
+    @property
+    def usuarios_unicos(self) -> int:
+        return len(self.frec_usuarios)
+
+    def libro_mas_prestado(self) -> Tuple[str, int]:
+        return max_por_valor(self.frec_libros)
+
+    def usuario_mas_activo(self) -> Tuple[str, int]:
+        return max_por_valor(self.frec_usuarios)
+
+class ContadoresPrestamos:
+    """Contadores de préstamos calculados en una sola pasada: Almacen los actualiza al guardar
+    cada préstamo, así que las estadísticas nunca recorren los préstamos ni arman filas.
+    - frec_libros / frec_usuarios: id -> veces, en orden de primera aparición (las claves de
+      frec_libros son también los libros prestados sin duplicados).
+    - frec_pares: (id_usuario, id_libro) -> veces, en orden de primera aparición.
+    - titulos: título embebido en el primer préstamo de cada libro que lo trae.
+    - abiertos: préstamos sin devolución por fecha límite (vencidos a cualquier fecha).
+    - por_fecha: todos los préstamos por fecha de préstamo (rankings por rango de fechas).
+    - por_usuario / por_libro: posiciones de los préstamos de cada id, por fecha de préstamo
+      (historial de un usuario o de un libro sin recorrer los demás).
+    """
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.frec_libros: Dict[str, int] = {}
+        self.frec_usuarios: Dict[str, int] = {}
+        self.frec_pares: Dict[Tuple[str, str], int] = {}
+        self.titulos: Dict[str, str] = {}
+        self.abiertos = IndiceVencimientos()
+        self.por_fecha = IndiceFechas()
+        self.por_usuario = IndicePorEntidad()
+        self.por_libro = IndicePorEntidad()
+
+    def agregar(self, id_usuario: str, id_libro: str, fecha_prestamo: date, fecha_devolucion: Optional[date],
+                titulo_libro: str = "") -> None:
+        """Cuenta el préstamo que ocupa la posición 'total' en Almacen.prestamos."""
+        veces = self.frec_libros.get(id_libro, 0)
+        if not veces and titulo_libro:
+            self.titulos[id_libro] = titulo_libro
+        self.frec_libros[id_libro] = veces + 1
+        self.frec_usuarios[id_usuario] = self.frec_usuarios.get(id_usuario, 0) + 1
+        par = (id_usuario, id_libro)
+        self.frec_pares[par] = self.frec_pares.get(par, 0) + 1
+        fecha = fecha_prestamo.toordinal()
+        if fecha_devolucion is None:
+            self.abiertos.agregar(self.total, fecha + Prestamo.PLAZO_DIAS)
+        self.por_fecha.agregar(self.total, fecha)
+        abierto = fecha_devolucion is None
+        self.por_usuario.agregar(id_usuario, self.total, fecha, abierto)
+        self.por_libro.agregar(id_libro, self.total, fecha, abierto)
+        self.total += 1
+
+    def estadisticas(self, h: date) -> Estadisticas:
+        """Estadísticas a la fecha h (copias de las frecuencias: no cambian con cargas posteriores)."""
+        return Estadisticas(
+            total=self.total,
+            frec_libros=dict(self.frec_libros),
+            frec_usuarios=dict(self.frec_usuarios),
+            vencidos=self.abiertos.cantidad_vencidos(h),
+            hoy=h,
+        )
+
+    def conteos(
+        self,
+        tipo: str,
+        ids: Callable[[Optional[Iterable[int]]], Iterator[Tuple[str, str]]],
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+    ) -> Dict:
+        """Préstamos por libro, por usuario o por par (id_usuario, id_libro) según 'tipo'
+        (ver TIPOS_RANKING), en orden de primera aparición. Sin rango son los contadores mismos.
+        Con rango (desde <= fecha_prestamo <= hasta) se cuentan en el momento solo los préstamos
+        del rango, que por_fecha da con dos bisecciones: 'ids(posiciones)' da (id_usuario, id_libro)
+        de esas posiciones sin materializar préstamos si no hace falta.
+        """
+        if tipo not in TIPOS_RANKING:
+            raise ValueError(f"tipo de ranking inválido: {tipo!r} (use {', '.join(TIPOS_RANKING)})")
+        if desde is None and hasta is None:
+            return {"libros": self.frec_libros, "usuarios": self.frec_usuarios, "pares": self.frec_pares}[tipo]
+        conteo: Dict = {}
+        for id_u, id_l in ids(self.por_fecha.en_rango(desde, hasta)):
+            if tipo == "libros":
+                clave = id_l
+            elif tipo == "usuarios":
+                clave = id_u
+            else:
+                clave = (id_u, id_l)
+            conteo[clave] = conteo.get(clave, 0) + 1
+        return conteo
@@ -1,7 +1,38 @@
-from typing import List
+import glob
+import gzip
+import os
+import threading
+from contextlib import contextmanager
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
 
-def _plantilla_base(titulo: str, tabla_html: str) -> str:
-    """Crea una página HTML mínima con una tabla y CSS embebido."""
+# Filas que se acumulan antes de cada escritura en modo streaming
+FILAS_POR_BLOQUE = 1000
+
+@contextmanager
+def escritura_atomica(destino: str, comprimir: bool = False, newline: Optional[str] = None) -> Iterator[IO[str]]:
+    """Abre un archivo temporal junto a 'destino' y, solo si todo se escribió bien, lo renombra
+    sobre 'destino' (os.replace es atómico). Si algo falla, 'destino' queda como estaba.
+    Con comprimir=True el texto se escribe comprimido con gzip; 'newline' es el de open().
+    """
+    carpeta, nombre = os.path.split(os.path.abspath(destino))
+    # Nombre único por proceso e hilo (exportación concurrente); open() respeta el umask
+    tmp = os.path.join(carpeta, f".{nombre}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        if comprimir:
+            # Nivel 6 (el de zlib): casi el mismo tamaño que 9 en bastante menos tiempo
+            f = gzip.open(tmp, "wt", compresslevel=6, encoding="utf-8", newline=newline)
+        else:
+            f = open(tmp, "w", encoding="utf-8", newline=newline)
+        with f:
+            yield f
+        os.replace(tmp, destino)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def _cabecera(titulo: str) -> str:
+    """Parte inicial de la página (hasta donde va la tabla), con CSS embebido."""
     return f"""<!DOCTYPE html>
 <html lang="es">
 <head>
@@ -19,26 +50,154 @@ def _plantilla_base(titulo: str, tabla_html: str) -> str:
 </head>
 <body>
   <h1>{titulo}</h1>
-  {tabla_html}
+  """
+
+def _pie() -> str:
+    """Parte final de la página (después de la tabla)."""
+    return """
   <div class="small">Generado por Biblioteca Digital (consola)</div>
 </body>
 </html>"""
 
+def _plantilla_base(titulo: str, tabla_html: str) -> str:
+    """Crea una página HTML mínima con una tabla y CSS embebido."""
+    return _cabecera(titulo) + tabla_html + _pie()
+
+def _thead(headers: List[str]) -> str:
+    return "<thead><tr>" + "".join(f"<th>{h}</th>" for h in headers) + "</tr></thead>"
+
+def _fila_html(row: List[Optional[str]]) -> str:
+    celdas = "".join(f"<td>{(c if c is not None else '')}</td>" for c in row)
+    return f"<tr>{celdas}</tr>"
+
 def tabla(headers: List[str], filas: List[List[str]]) -> str:
     """Construye la tabla en HTML a partir de encabezados y filas (strings)."""
     # Encabezados
-    thead = "<thead><tr>" + "".join(f"<th>{h}</th>" for h in headers) + "</tr></thead>"
+    thead = _thead(headers)
     # Filas
-    rows_html = []
-    for row in filas:
-        celdas = "".join(f"<td>{(c if c is not None else '')}</td>" for c in row)
-        rows_html.append(f"<tr>{celdas}</tr>")
+    rows_html = [_fila_html(row) for row in filas]
     tbody = "<tbody>" + "".join(rows_html) + "</tbody>"
     return "<table>" + thead + tbody + "</table>"
 
-def exportar(titulo: str, headers: List[str], filas: List[List[str]], destino: str) -> None:
-    """Genera el HTML con plantilla y lo guarda en 'destino' (ruta de archivo)."""
-    html_tabla = tabla(headers, filas)
-    pagina = _plantilla_base(titulo, html_tabla)
-    with open(destino, "w", encoding="utf-8") as f:
-        f.write(pagina)
+def pagina_html(titulo: str, headers: List[str], filas: Iterable[List[str]], navegacion: str = "") -> str:
+    """Página completa como texto (la usa el servidor de reportes); 'navegacion' va antes y después de la tabla."""
+    return _cabecera(titulo) + navegacion + tabla(headers, filas) + navegacion + _pie()
+
+def exportar(titulo: str, headers: List[str], filas: Iterable[List[str]], destino: str) -> None:
+    """Genera el HTML con plantilla y lo guarda en 'destino' (ruta de archivo).
+    'filas' puede ser cualquier iterable (p. ej. un generador): se escribe en streaming.
+    """
+    exportar_stream(titulo, headers, filas, destino)
+
+def exportar_stream(
+    titulo: str,
+    headers: List[str],
+    filas: Iterable[List[str]],
+    destino: str,
+    filas_por_bloque: int = FILAS_POR_BLOQUE,
+) -> None:
+    """Escribe la página en streaming: cabecera, filas en bloques y pie.
+    La memoria usada no depende del tamaño de la tabla (solo un bloque a la vez).
+    El resultado es idéntico byte a byte al de _plantilla_base(titulo, tabla(...)).
+    """
+    with escritura_atomica(destino) as f:
+        f.write(_cabecera(titulo))
+        f.write("<table>" + _thead(headers) + "<tbody>")
+        bloque: List[str] = []
+        for row in filas:
+            bloque.append(_fila_html(row))
+            if len(bloque) >= filas_por_bloque:
+                f.write("".join(bloque))
+                bloque.clear()
+        if bloque:
+            f.write("".join(bloque))
+        f.write("</tbody></table>")
+        f.write(_pie())
+
+def exportar_secciones(
+    titulo: str,
+    secciones: Iterable[Tuple[str, List[str], Iterable[List[str]]]],
+    destino: str,
+) -> None:
+    """Página con varias tablas, cada una bajo su subtítulo: secciones = [(subtitulo, headers, filas), ...]."""
+    with escritura_atomica(destino) as f:
+        f.write(_cabecera(titulo))
+        for subtitulo, headers, filas in secciones:
+            f.write(f"<h2>{subtitulo}</h2>")
+            f.write("<table>" + _thead(headers) + "<tbody>")
+            f.write("".join(_fila_html(row) for row in filas))
+            f.write("</tbody></table>")
+        f.write(_pie())
+
+# ---------- Reportes paginados ----------
+
+def ruta_pagina(destino: str, numero: int) -> str:
+    """'.../historial.html' -> '.../historial_0001.html'."""
+    base, ext = os.path.splitext(destino)
+    return f"{base}_{numero:04d}{ext}"
+
+def _navegacion(destino: str, numero: int, hay_siguiente: bool) -> str:
+    """Enlaces anterior / índice / siguiente (relativos, las páginas viven junto al índice)."""
+    enlaces = []
+    if numero > 1:
+        enlaces.append(f'<a href="{os.path.basename(ruta_pagina(destino, numero - 1))}">&laquo; Anterior</a>')
+    enlaces.append(f'<a href="{os.path.basename(destino)}">Índice</a>')
+    if hay_siguiente:
+        enlaces.append(f'<a href="{os.path.basename(ruta_pagina(destino, numero + 1))}">Siguiente &raquo;</a>')
+    return '<p class="small">' + " | ".join(enlaces) + "</p>"
+
+def _escribir_pagina(titulo: str, headers: List[str], filas: List[str], destino: str, numero: int, hay_siguiente: bool) -> None:
+    nav = _navegacion(destino, numero, hay_siguiente)
+    with escritura_atomica(ruta_pagina(destino, numero)) as f:
+        f.write(_cabecera(f"{titulo} (página {numero})"))
+        f.write(nav)
+        f.write("<table>" + _thead(headers) + "<tbody>")
+        f.write("".join(filas))
+        f.write("</tbody></table>")
+        f.write(nav)
+        f.write(_pie())
+
+def _eliminar_paginas_sobrantes(destino: str, ultima: int) -> None:
+    """Borra páginas de una exportación anterior más larga (p. ej. _0007 si ahora hay 5)."""
+    base, ext = os.path.splitext(destino)
+    for ruta in glob.glob(f"{glob.escape(base)}_[0-9][0-9][0-9][0-9]{ext}"):
+        if int(ruta[len(base) + 1:len(base) + 5]) > ultima:
+            os.remove(ruta)
+
+def exportar_paginado(
+    titulo: str,
+    headers: List[str],
+    filas: Iterable[List[str]],
+    destino: str,
+    filas_por_pagina: int,
+) -> int:
+    """Reparte la tabla en páginas 'destino_0001.html', 'destino_0002.html', ... y escribe en
+    'destino' un índice con enlaces a cada una. Funciona como pipeline: cada página se escribe
+    en cuanto se llena, mientras el iterable de filas todavía se está recorriendo.
+    Devuelve la cantidad de páginas generadas.
+    """
+    if filas_por_pagina < 1:
+        raise ValueError("filas_por_pagina debe ser >= 1")
+    it: Iterator[List[str]] = iter(filas)
+    paginas: List[List[str]] = []  # filas del índice: [enlace, rango de filas]
+    numero = 0
+    inicio = 1
+    siguiente = next(it, None)
+    while True:
+        numero += 1
+        bloque: List[str] = []
+        while siguiente is not None and len(bloque) < filas_por_pagina:
+            bloque.append(_fila_html(siguiente))
+            siguiente = next(it, None)
+        # La fila ya leída por adelantado indica si habrá otra página
+        hay_siguiente = siguiente is not None
+        _escribir_pagina(titulo, headers, bloque, destino, numero, hay_siguiente)
+        nombre = os.path.basename(ruta_pagina(destino, numero))
+        rango = f"{inicio} - {inicio + len(bloque) - 1}" if bloque else "sin filas"
+        paginas.append([f'<a href="{nombre}">Página {numero}</a>', rango])
+        inicio += len(bloque)
+        if not hay_siguiente:
+            break
+    exportar_stream(titulo, ["Página", "Filas"], paginas, destino)
+    _eliminar_paginas_sobrantes(destino, numero)
+    return numero
@@ -0,0 +1,195 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Dict, List, Optional
+
+class _IndiceOrdenado:
+    """Posiciones de préstamos (en Almacen.prestamos) ordenadas por una clave entera (ordinal de día)."""
+
+    def __init__(self) -> None:
+        # Arrays paralelos ordenados por clave; a igual clave, por posición de carga
+        self._claves = array("i")
+        self._posiciones = array("i")
+        # False si llegó alguna clave fuera de orden: se ordena una sola vez, al consultar
+        # (insertar cada una en su lugar costaría O(n) por préstamo)
+        self._ordenado = True
+
+    def __len__(self) -> int:
+        return len(self._claves)
+
+    def agregar(self, posicion: int, clave: int) -> None:
+        """Registra un préstamo (posición en Almacen.prestamos y su clave)."""
+        if self._ordenado and self._claves and clave < self._claves[-1]:
+            self._ordenado = False
+        self._claves.append(clave)
+        self._posiciones.append(posicion)
+
+    def _ordenar(self) -> None:
+        if self._ordenado:
+            return
+        # sorted es estable y las posiciones se agregan crecientes: a igual clave queda el orden de carga
+        claves, posiciones = self._claves, self._posiciones
+        orden = sorted(range(len(claves)), key=claves.__getitem__)
+        self._claves = array("i", [claves[i] for i in orden])
+        self._posiciones = array("i", [posiciones[i] for i in orden])
+        self._ordenado = True
+
+    def posiciones(self) -> List[int]:
+        """Todas las posiciones, en orden de clave (a igual clave, en orden de carga)."""
+        self._ordenar()
+        return self._posiciones.tolist()
+
+class IndiceVencimientos(_IndiceOrdenado):
+    """Índice de préstamos abiertos (sin devolución) ordenado por fecha límite.
+
+    La fecha límite es fecha_prestamo + Prestamo.PLAZO_DIAS (como ordinal de día). Un préstamo
+    abierto está vencido a la fecha h si h > límite, así que los vencidos a cualquier fecha son
+    un prefijo del índice: búsqueda binaria + corte, sin recorrer todos los préstamos.
+    """
+
+    def cantidad_vencidos(self, h: date) -> int:
+        """Cuántos préstamos abiertos están vencidos a la fecha h."""
+        self._ordenar()
+        return bisect_left(self._claves, h.toordinal())
+
+    def vencidos(self, h: date) -> List[int]:
+        """Posiciones de los préstamos vencidos a la fecha h, en orden de carga."""
+        n = self.cantidad_vencidos(h)
+        return sorted(self._posiciones[:n])
+
+class IndiceFechas(_IndiceOrdenado):
+    """Índice de todos los préstamos ordenado por fecha_prestamo, para consultas por rango de fechas."""
+
+    def en_rango(self, desde: Optional[date] = None, hasta: Optional[date] = None) -> List[int]:
+        """Posiciones (en orden de carga) de los préstamos con desde <= fecha_prestamo <= hasta;
+        un extremo None no limita.
+        """
+        self._ordenar()
+        i = 0 if desde is None else bisect_left(self._claves, desde.toordinal())
+        j = len(self._claves) if hasta is None else bisect_right(self._claves, hasta.toordinal())
+        return sorted(self._posiciones[i:j])
+
+class IndicePorEntidad:
+    """Índice secundario id (de usuario o de libro) -> posiciones de sus préstamos, ordenadas
+    por fecha_prestamo, con los préstamos abiertos (sin devolución) también por separado.
+    Consultar un id cuesta lo que mide el resultado, no la cantidad total de préstamos.
+    """
+
+    def __init__(self) -> None:
+        self._todos: Dict[str, IndiceFechas] = {}
+        self._abiertos: Dict[str, IndiceFechas] = {}
+
+    def __len__(self) -> int:
+        return len(self._todos)
+
+    def __contains__(self, id_: object) -> bool:
+        return id_ in self._todos
+
+    def agregar(self, id_: str, posicion: int, fecha: int, abierto: bool) -> None:
+        """Registra un préstamo del id (posición en Almacen.prestamos y ordinal de fecha_prestamo)."""
+        indice = self._todos.get(id_)
+        if indice is None:
+            indice = self._todos[id_] = IndiceFechas()
+        indice.agregar(posicion, fecha)
+        if abierto:
+            indice = self._abiertos.get(id_)
+            if indice is None:
+                indice = self._abiertos[id_] = IndiceFechas()
+            indice.agregar(posicion, fecha)
+
+    def posiciones(self, id_: str, solo_abiertos: bool = False) -> List[int]:
+        """Posiciones de los préstamos del id ordenadas por fecha_prestamo ([] si no tiene)."""
+        indice = (self._abiertos if solo_abiertos else self._todos).get(id_)
+        return indice.posiciones() if indice is not None else []
+
+# Fin de un préstamo abierto (sin devolución): después de cualquier fecha real
+INFINITO = date.max.toordinal() + 1
+
+class _IntervalosLibro:
+    """Intervalos [inicio, fin) de los préstamos de un libro, ordenados por inicio. 'max_fin[i]' es
+    el mayor fin entre los intervalos 0..i (no decrece), lo que permite responder "¿algún
+    intervalo con inicio < x termina después de y?" con dos búsquedas binarias.
+    """
+
+    __slots__ = ("inicios", "fines", "max_fin", "posiciones")
+
+    def __init__(self) -> None:
+        self.inicios = array("i")
+        self.fines = array("i")
+        self.max_fin = array("i")
+        self.posiciones = array("i")
+
+    def agregar(self, posicion: int, inicio: int, fin: int) -> None:
+        if not self.inicios or inicio >= self.inicios[-1]:
+            # Caso común: los préstamos llegan en orden cronológico
+            self.inicios.append(inicio)
+            self.fines.append(fin)
+            self.posiciones.append(posicion)
+            self.max_fin.append(max(fin, self.max_fin[-1]) if self.max_fin else fin)
+            return
+        i = bisect_right(self.inicios, inicio)
+        self.inicios.insert(i, inicio)
+        self.fines.insert(i, fin)
+        self.posiciones.insert(i, posicion)
+        max_fin = self.max_fin
+        max_fin.insert(i, max(max_fin[i - 1], fin) if i else fin)
+        # Los máximos siguientes pasan a ser max(anterior, fin); como no decrecen, basta
+        # actualizar hasta el primero que ya era >= fin
+        for k in range(i + 1, len(max_fin)):
+            if max_fin[k] >= fin:
+                break
+            max_fin[k] = fin
+
+    def cubre(self, desde: int, hasta: int) -> Optional[int]:
+        """Posición de un préstamo cuyo intervalo corta a [desde, hasta), o None.
+        Entre los intervalos con inicio < hasta, el primero cuyo max_fin supera 'desde'
+        termina después de 'desde' (su fin es ese máximo).
+        """
+        k = bisect_left(self.inicios, hasta)
+        if k == 0 or self.max_fin[k - 1] <= desde:
+            return None
+        return self.posiciones[bisect_right(self.max_fin, desde, 0, k)]
+
+class IndiceIntervalos:
+    """Índice de intervalos por libro: cada préstamo ocupa el libro en [fecha_prestamo,
+    fecha_devolucion) (o hasta INFINITO si no se devolvió), en ordinales de día.
+    - agregar() informa si el nuevo préstamo se superpone con uno anterior del mismo libro.
+    - prestado_en() dice si un libro está prestado un día dado, en tiempo logarítmico.
+    """
+
+    def __init__(self) -> None:
+        self._libros: Dict[str, _IntervalosLibro] = {}
+
+    def __len__(self) -> int:
+        return len(self._libros)
+
+    def __contains__(self, id_libro: object) -> bool:
+        return id_libro in self._libros
+
+    def libros(self) -> List[str]:
+        """Libros con al menos un préstamo, en orden de primer préstamo cargado."""
+        return list(self._libros)
+
+    def agregar(self, id_libro: str, posicion: int, inicio: date, fin: Optional[date]) -> Optional[int]:
+        """Registra el préstamo y devuelve la posición de un préstamo anterior del mismo libro
+        cuyo intervalo se superpone con el nuevo (None si no hay). Un intervalo vacío
+        (devuelto el mismo día, o antes) no se superpone con nada.
+        """
+        a = inicio.toordinal()
+        b = fin.toordinal() if fin is not None else INFINITO
+        intervalos = self._libros.get(id_libro)
+        if intervalos is None:
+            intervalos = self._libros[id_libro] = _IntervalosLibro()
+        if a >= b:
+            return None  # no ocupa el libro: no se indexa
+        solapado = intervalos.cubre(a, b)
+        intervalos.agregar(posicion, a, b)
+        return solapado
+
+    def prestado_en(self, id_libro: str, dia: date) -> Optional[int]:
+        """Posición de un préstamo que tiene el libro en su poder el día dado, o None si está disponible."""
+        intervalos = self._libros.get(id_libro)
+        if intervalos is None:
+            return None
+        d = dia.toordinal()
+        return intervalos.cubre(d, d + 1)
@@ -1,14 +1,132 @@
-from typing import List, Tuple
+import mmap
+import os
+from typing import Iterator, List, Tuple
 
-def leer_lineas(ruta: str) -> List[Tuple[int, str]]:
-    """Lee un archivo de texto en UTF-8 y devuelve una lista de tuplas (num_linea, contenido).
+def iter_lineas(ruta: str) -> Iterator[Tuple[int, str]]:
+    """Genera tuplas (num_linea, contenido) leyendo el archivo UTF-8 de forma perezosa.
+    - Solo mantiene en memoria la línea actual: el consumo no crece con el tamaño del archivo.
     - Ignora el salto de línea, mantiene espacios internos.
     - No elimina líneas en blanco (útil para reportar exactamente lo que hay).
     """
-    lineas: List[Tuple[int, str]] = []
     with open(ruta, "r", encoding="utf-8") as f:
         num = 0
         for cruda in f:
             num += 1
-            lineas.append((num, cruda.rstrip("\n")))  # quitar solo salto de línea
-    return lineas
+            yield num, cruda.rstrip("\n")  # quitar solo salto de línea
+
+def leer_lineas(ruta: str) -> List[Tuple[int, str]]:
+    """Lee un archivo de texto en UTF-8 y devuelve una lista de tuplas (num_linea, contenido).
+    Versión materializada de iter_lineas; preferir iter_lineas para archivos grandes.
+    """
+    return list(iter_lineas(ruta))
+
+# Bytes leídos del mapeo en cada bloque (se extiende hasta el siguiente '\n')
+TAM_BLOQUE_MMAP = 1 << 20
+# Primer byte > '#' (0x23): la línea no está vacía ni puede ser comentario
+_MAX_BYTE_IGNORABLE = 0x23
+
+def iter_lineas_mmap(ruta: str) -> Iterator[Tuple[int, str]]:
+    """Lector para cargas masivas: recorre el archivo mapeado en memoria (mmap) por bloques
+    de bytes crudos, separa líneas sin pasar por la capa de texto y decodifica solo las líneas
+    que se van a validar.
+    - Las líneas vacías y los comentarios ('#' tras espacios ASCII) se saltan sin decodificar.
+    - El resto se entrega igual que en iter_lineas: mismo número de línea y mismo contenido.
+    Las líneas saltadas son exactamente las que cargar_* ignoraría, así que puede usarse en su lugar.
+    """
+    with open(ruta, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return  # mmap no admite archivos vacíos
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            tam = len(mm)
+            pos = 0
+            num = 0
+            while pos < tam:
+                fin = mm.find(b"\n", min(pos + TAM_BLOQUE_MMAP, tam) - 1)
+                fin = tam if fin < 0 else fin + 1
+                bloque = mm[pos:fin]
+                pos = fin
+                if b"\r" in bloque:
+                    # Igual que el modo texto: '\r\n' y '\r' suelto son fin de línea
+                    bloque = bloque.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+                lineas = bloque.split(b"\n")
+                if lineas[-1] == b"":
+                    lineas.pop()  # el bloque termina en salto de línea
+                for cruda in lineas:
+                    num += 1
+                    if cruda and (cruda[0] > _MAX_BYTE_IGNORABLE or not cruda.lstrip().startswith(b"#")):
+                        yield num, cruda.decode("utf-8")
+
+class Progreso:
+    """Hasta dónde se procesó un archivo de solo-agregar: byte siguiente y última línea leída."""
+
+    __slots__ = ("offset", "linea")
+
+    def __init__(self, offset: int = 0, linea: int = 0) -> None:
+        self.offset = offset
+        self.linea = linea
+
+    def __repr__(self) -> str:
+        return f"Progreso(offset={self.offset!r}, linea={self.linea!r})"
+
+def fin_ultima_linea_completa(ruta: str, desde: int = 0) -> int:
+    """Posición (en bytes) justo después del último '\n' del archivo, o 'desde' si no hay
+    ninguno a partir de esa posición. Lo que sigue es una línea aún a medio escribir.
+    """
+    tam = os.path.getsize(ruta)
+    with open(ruta, "rb") as f:
+        pos = tam
+        while pos > desde:
+            inicio = max(desde, pos - 65536)
+            f.seek(inicio)
+            i = f.read(pos - inicio).rfind(b"\n")
+            if i >= 0:
+                return inicio + i + 1
+            pos = inicio
+    return desde
+
+def fin_de_lectura(ruta: str, progreso: Progreso) -> int:
+    """Hasta qué byte leer en una carga incremental. La primera carga de un archivo (nada
+    procesado todavía) llega hasta el final, como iter_lineas, así que la última línea de un
+    archivo editado a mano sin '\n' final no se pierde. Las siguientes solo toman líneas
+    completas: lo que sigue al último '\n' puede estar a medio escribir.
+    """
+    if progreso.offset == 0:
+        return os.path.getsize(ruta)
+    return fin_ultima_linea_completa(ruta, progreso.offset)
+
+def saltar_fin_pendiente(ruta: str, progreso: Progreso) -> None:
+    """Si la carga anterior terminó en una última línea sin salto (ver fin_de_lectura) y lo
+    agregado empieza con el '\n' que le faltaba, lo consume sin contar una línea vacía.
+    """
+    if progreso.offset == 0:
+        return
+    with open(ruta, "rb") as f:
+        f.seek(progreso.offset - 1)
+        previo, siguiente = f.read(1), f.read(1)
+    if previo != b"\n" and siguiente == b"\n":
+        progreso.offset += 1
+
+def iter_lineas_nuevas(ruta: str, progreso: Progreso) -> Iterator[Tuple[int, str]]:
+    """Como iter_lineas, pero empieza en progreso.offset y termina en fin_de_lectura (en las
+    recargas, solo líneas completas); progreso se actualiza tras cada línea, así que la próxima
+    llamada continúa exactamente donde terminó esta. Los saltos '\r\n' y '\r' se tratan igual
+    que en el modo texto de open().
+    """
+    saltar_fin_pendiente(ruta, progreso)
+    fin = fin_de_lectura(ruta, progreso)
+    with open(ruta, "rb") as f:
+        f.seek(progreso.offset)
+        while f.tell() < fin:
+            cruda = f.readline()
+            texto = cruda.decode("utf-8")
+            if texto.endswith("\r\n"):
+                texto = texto[:-2]
+            elif texto.endswith(("\n", "\r")):
+                texto = texto[:-1]  # sin salto: última línea del archivo (primera carga)
+            # Un '\r' suelto también es fin de línea en modo texto
+            partes = texto.split("\r")
+            for k, contenido in enumerate(partes, start=1):
+                yield progreso.linea + k, contenido
+            # Se avanza solo cuando la línea ya fue consumida (si se interrumpe, se relee)
+            progreso.linea += len(partes)
+            progreso.offset += len(cruda)
@@ -1,6 +1,8 @@
 class Libro:
     """Modelo simple para un libro del catálogo."""
 
+    __slots__ = ("id_libro", "titulo")
+
     def __init__(self, id_libro: str, titulo: str) -> None:
         # id_libro: código único del libro
         self.id_libro = id_libro
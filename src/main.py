@@ -1,106 +1,399 @@
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import os
+from array import array
+import time
 from os import path
-from utils import hoy, parse_fecha, contar_frecuencias, max_por_valor, dedup_preservando_orden
-from lector import leer_lineas
-from validador import validar_usuario, validar_libro, validar_prestamo
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from utils import hoy, parse_fecha, top_n_por_valor
+from lector import Progreso, iter_lineas, iter_lineas_mmap
+from validador import validar_usuario, validar_libro
+from carga import RegistroPrestamo, iter_prestamos, iter_prestamos_paralelo
 from usuario import Usuario
 from libro import Libro
 from prestamo import Prestamo
-from html_exporter import exportar
+from prestamos_columnar import PrestamosColumnar
+from html_exporter import exportar, exportar_paginado, exportar_secciones
+from datos_exporter import EXTENSIONES, exportar_datos
+from estadisticas import ContadoresPrestamos, Estadisticas
+from analitica import Analitica, calcular as calcular_analitica
+from metricas import Metricas
+from errores import LIMITE_ERRORES, PRESTAMO_SOLAPADO, ColeccionErrores, ErrorValidacion
+from indices import IndiceIntervalos
 
 # Rutas relativas esperadas (asumiendo estructura propuesta de carpetas)
 DATA_DIR = path.join(path.dirname(__file__), "..", "data")
 OUT_DIR  = path.join(path.dirname(__file__), "..", "output")
 
+# Título y encabezados de cada reporte tabular (exportación HTML y servidor de reportes)
+ENCABEZADOS_REPORTES: Dict[str, Tuple[str, List[str]]] = {
+    "historial": ("Historial de Préstamos",
+                  ["ID Usuario", "Usuario", "ID Libro", "Libro", "Fecha Préstamo", "Fecha Devolución"]),
+    "usuarios": ("Listado de Usuarios", ["ID Usuario", "Nombre"]),
+    "libros": ("Listado de Libros Prestados", ["ID Libro", "Título"]),
+    "estadisticas": ("Estadísticas de Préstamos", ["Métrica", "Valor"]),
+    "vencidos": ("Préstamos Vencidos", ["ID Usuario", "Usuario", "ID Libro", "Libro", "Fecha Préstamo"]),
+}
+
 class Almacen:
-    """Contiene la información cargada en memoria."""
-    def __init__(self) -> None:
+    """Contiene la información cargada en memoria.
+    Con columnar=True los préstamos se guardan en PrestamosColumnar (mucho menos memoria);
+    los reportes materializan los objetos Prestamo al recorrerlos.
+    Con usar_mmap=True los archivos se leen con iter_lineas_mmap (cargas masivas).
+    Con metricas=True se registran contadores y tiempos de cargas y exportaciones (ver metricas()).
+    limite_errores es la cantidad máxima de errores guardados (None = sin límite); después
+    del límite solo se cuentan por código (ver ColeccionErrores).
+    """
+    def __init__(self, columnar: bool = False, usar_mmap: bool = False, metricas: bool = False,
+                 limite_errores: Optional[int] = LIMITE_ERRORES) -> None:
         self.usuarios: Dict[str, Usuario] = {}   # id -> Usuario
         self.libros: Dict[str, Libro] = {}       # id -> Libro
-        self.prestamos: List[Prestamo] = []      # lista de préstamos
-        self.errores: List[str] = []             # acumulador de mensajes de error
+        self.usar_mmap = usar_mmap
+        # lista de préstamos (o su equivalente columnar)
+        self.prestamos: Union[List[Prestamo], PrestamosColumnar] = PrestamosColumnar() if columnar else []
+        self.errores = ColeccionErrores(limite_errores)  # errores estructurados (se recorren como texto)
+        # Versión de los datos: aumenta con cada carga que agrega o cambia registros (sirve de
+        # llave para cachés; una recarga sin novedades no las invalida)
+        self.version = 0
+        # Totales, frecuencias, vencidos, fechas de préstamos y posiciones por usuario/libro,
+        # actualizados al guardar cada préstamo
+        self._contadores = ContadoresPrestamos()
+        # Cachés de resultados derivados chicos, con llave (version, hoy): estadísticas y
+        # posiciones de los vencidos. Las filas de texto de los reportes no se guardan nunca:
+        # se resuelven al recorrerlas.
+        self._estadisticas: Optional[Estadisticas] = None
+        self._estadisticas_llave = None
+        self._vencidos: List[int] = []
+        self._vencidos_llave = None
+        # Cargas incrementales: (tipo, ruta absoluta) -> hasta dónde se procesó el archivo
+        self._progreso: Dict[Tuple[str, str], Progreso] = {}
+        # Intervalos de préstamo por libro: detecta préstamos superpuestos al cargar y
+        # responde qué libros están prestados a una fecha
+        self._intervalos = IndiceIntervalos()
+        # Instrumentación opcional (None = apagada, sin costo en las cargas)
+        self._metricas: Optional[Metricas] = Metricas() if metricas else None
+
+    # ---------- Snapshot (pickle) ----------
+    # Solo se guardan los datos cargados (con sus contadores e índices); las cachés se reconstruyen solas.
+    _ESTADO_PERSISTENTE = ("usuarios", "libros", "prestamos", "errores", "version", "_progreso", "_intervalos",
+                           "_contadores")
+
+    def __getstate__(self) -> Dict:
+        return {nombre: getattr(self, nombre) for nombre in self._ESTADO_PERSISTENTE}
+
+    def __setstate__(self, estado: Dict) -> None:
+        self.__init__()
+        self.__dict__.update(estado)
+
+    # ---------- Métricas ----------
+    def activar_metricas(self) -> None:
+        """Empieza a registrar métricas (por ejemplo, en un almacén restaurado de un snapshot)."""
+        if self._metricas is None:
+            self._metricas = Metricas()
+
+    def metricas(self) -> Dict[str, Dict[str, Dict]]:
+        """Contadores y tiempos por fase ({} si las métricas están apagadas); apto para json.dumps:
+        - contadores: lineas_leidas, lineas_ignoradas, lineas_validadas, lineas_rechazadas,
+          rechazo.<motivo>, registros_creados, aviso.<motivo> (ids fuera de catálogo), filas.<archivo>
+        - tiempos_s: lectura, validacion, parseo_fechas, catalogo, creacion, total, <archivo>...
+        """
+        return self._metricas.a_dict() if self._metricas is not None else {}
+
+    def _contar_rechazo(self, fase: str, errores: List[ErrorValidacion]) -> None:
+        self._metricas.sumar(fase, "lineas_rechazadas")
+        self._metricas.sumar(fase, "rechazo." + errores[0][0])
 
     # ---------- Carga de archivos ----------
-    def cargar_usuarios(self, ruta: str) -> None:
-        lineas = leer_lineas(ruta)
+    def _lineas(self, ruta: str):
+        """Lector de (num_linea, contenido) según la configuración del almacén."""
+        return iter_lineas_mmap(ruta) if self.usar_mmap else iter_lineas(ruta)
+
+    def _progreso_de(self, tipo: str, ruta: str) -> Progreso:
+        return self._progreso.setdefault((tipo, path.abspath(ruta)), Progreso())
+
+    def cargar_usuarios(self, ruta: str, incremental: bool = False) -> None:
+        """Carga usuarios. Con incremental=True (recarga de un catálogo ya cargado) solo se aplican
+        usuarios nuevos o con nombre distinto, y solo se reportan errores de líneas posteriores
+        a las ya procesadas de ese archivo, para no duplicarlos.
+        """
+        inicio = time.perf_counter()
+        ya_leidas = self._progreso_de("usuarios", ruta).linea if incremental else 0
+        m = self._metricas
+        lineas, validar, crear = self._lineas(ruta), validar_usuario, Usuario
+        if m is not None:
+            lineas = m.iterar("usuarios", lineas, "lectura", "lineas_leidas")
+            validar = m.envolver("usuarios", "validacion", validar_usuario, "lineas_validadas")
+            crear = m.envolver("usuarios", "creacion", Usuario, "registros_creados")
+        num = 0
+        cambios = 0
         for num, linea in lineas:
             # Ignorar comentarios y líneas vacías
             if not linea or linea.strip().startswith("#"):
+                if m is not None:
+                    m.sumar("usuarios", "lineas_ignoradas")
                 continue
-            ok, data, errores = validar_usuario(linea)
+            ok, data, errores = validar(linea)
             if not ok:
                 # Por requerimiento: reportar línea, posición y carácter erróneo.
                 # Aquí 'errores' ya trae descripciones de posición si aplica.
-                for msg in errores:
-                    self.errores.append(f"[usuarios] Línea {num}: {msg}")
+                if num > ya_leidas:
+                    self.errores.agregar_todos("usuarios", num, errores)
+                if m is not None:
+                    self._contar_rechazo("usuarios", errores)
                 # Pasar a la siguiente línea
                 continue
+            if incremental:
+                actual = self.usuarios.get(data["id_usuario"])
+                if actual is not None and actual.nombre == data["nombre"]:
+                    continue  # sin cambios
             # Crear/actualizar el usuario
-            u = Usuario(data["id_usuario"], data["nombre"])
-            self.usuarios[u.id_usuario] = u
+            self._guardar_usuario(crear(data["id_usuario"], data["nombre"]))
+            cambios += 1
+        if incremental:
+            self._progreso_de("usuarios", ruta).linea = max(ya_leidas, num)
+        if cambios:
+            self.version += 1
+        if m is not None:
+            m.sumar("usuarios", "cargas")
+            m.acumular_tiempo("usuarios", "total", time.perf_counter() - inicio)
 
-    def cargar_libros(self, ruta: str) -> None:
-        lineas = leer_lineas(ruta)
+    def _guardar_usuario(self, u: Usuario) -> None:
+        """Crear/actualizar el usuario en el catálogo."""
+        self.usuarios[u.id_usuario] = u
+
+    def cargar_libros(self, ruta: str, incremental: bool = False) -> None:
+        """Carga libros. incremental=True funciona igual que en cargar_usuarios."""
+        inicio = time.perf_counter()
+        ya_leidas = self._progreso_de("libros", ruta).linea if incremental else 0
+        m = self._metricas
+        lineas, validar, crear = self._lineas(ruta), validar_libro, Libro
+        if m is not None:
+            lineas = m.iterar("libros", lineas, "lectura", "lineas_leidas")
+            validar = m.envolver("libros", "validacion", validar_libro, "lineas_validadas")
+            crear = m.envolver("libros", "creacion", Libro, "registros_creados")
+        num = 0
+        cambios = 0
         for num, linea in lineas:
             if not linea or linea.strip().startswith("#"):
+                if m is not None:
+                    m.sumar("libros", "lineas_ignoradas")
                 continue
-            ok, data, errores = validar_libro(linea)
+            ok, data, errores = validar(linea)
             if not ok:
-                for msg in errores:
-                    self.errores.append(f"[libros] Línea {num}: {msg}")
+                if num > ya_leidas:
+                    self.errores.agregar_todos("libros", num, errores)
+                if m is not None:
+                    self._contar_rechazo("libros", errores)
                 continue
-            l = Libro(data["id_libro"], data["titulo"])
-            self.libros[l.id_libro] = l
+            if incremental:
+                actual = self.libros.get(data["id_libro"])
+                if actual is not None and actual.titulo == data["titulo"]:
+                    continue  # sin cambios
+            self._guardar_libro(crear(data["id_libro"], data["titulo"]))
+            cambios += 1
+        if incremental:
+            self._progreso_de("libros", ruta).linea = max(ya_leidas, num)
+        if cambios:
+            self.version += 1
+        if m is not None:
+            m.sumar("libros", "cargas")
+            m.acumular_tiempo("libros", "total", time.perf_counter() - inicio)
 
-    def cargar_prestamos(self, ruta: str) -> None:
-        lineas = leer_lineas(ruta)
-        for num, linea in lineas:
-            if not linea or linea.strip().startswith("#"):
-                continue
-            ok, data, errores = validar_prestamo(linea)
-            if not ok:
-                for msg in errores:
-                    self.errores.append(f"[prestamos] Línea {num}: {msg}")
+    def _guardar_libro(self, l: Libro) -> None:
+        self.libros[l.id_libro] = l
+
+    def cargar_prestamos(self, ruta: str, workers: int = 1, incremental: bool = False) -> None:
+        """Carga préstamos. Con workers > 1 la validación y el parseo se reparten entre
+        procesos (opt-in para archivos grandes); el orden y la numeración de líneas se conservan.
+        Con incremental=True se recuerda el byte y la línea donde terminó la carga anterior de
+        este archivo y solo se procesan las líneas completas agregadas después (el archivo
+        de préstamos solo crece), sin duplicar préstamos ya cargados. La primera carga
+        incremental de un archivo lee hasta el final, igual que una carga completa.
+        """
+        inicio = time.perf_counter()
+        m = self._metricas
+        progreso = None
+        if incremental:
+            progreso = self._progreso_de("prestamos", ruta)
+            if os.path.getsize(ruta) < progreso.offset:
+                raise ValueError(f"{ruta} es más corto que lo ya procesado (¿se truncó o reemplazó?); "
+                                 "use una carga completa en un almacén nuevo")
+        # Los ids se verifican contra los catálogos al leer (en los workers, en modo paralelo)
+        catalogos = (self.usuarios, self.libros)
+        if workers > 1:
+            resultados = iter_prestamos_paralelo(ruta, workers, progreso, m, catalogos)
+        else:
+            resultados = iter_prestamos(ruta, progreso, self.usar_mmap, m, catalogos)
+        verificar, guardar = self._verificar_prestamo, self._guardar_prestamo
+        if m is not None:
+            verificar = m.envolver("prestamos", "verificacion", self._verificar_prestamo)
+            guardar = m.envolver("prestamos", "creacion", self._guardar_prestamo, "registros_creados")
+        antes = len(self.prestamos)
+        for num, registro, errores in resultados:
+            if registro is None:
+                self.errores.agregar_todos("prestamos", num, errores)
+                if m is not None:
+                    self._contar_rechazo("prestamos", errores)
                 continue
+            verificar(num, registro, errores)
+            guardar(*registro)
+        if len(self.prestamos) != antes:
+            self.version += 1
+        if m is not None:
+            m.sumar("prestamos", "cargas")
+            m.acumular_tiempo("prestamos", "total", time.perf_counter() - inicio)
 
-            # Validar que IDs existan en catálogos si están cargados
-            id_u = data["id_usuario"]
-            id_l = data["id_libro"]
-            if id_u not in self.usuarios:
-                self.errores.append(f"[prestamos] Línea {num}: id_usuario {id_u!r} no existe en catálogo de usuarios")
-            if id_l not in self.libros:
-                self.errores.append(f"[prestamos] Línea {num}: id_libro {id_l!r} no existe en catálogo de libros")
-
-            # Crear objeto préstamo (parsear fechas)
-            fp = parse_fecha(data["fecha_prestamo"])
-            fd = parse_fecha(data["fecha_devolucion"])
-            p = Prestamo(
-                id_usuario=id_u,
-                id_libro=id_l,
-                fecha_prestamo=fp,
-                fecha_devolucion=fd,
-                nombre_usuario=data.get("nombre_usuario",""),
-                titulo_libro=data.get("titulo_libro",""),
-            )
-            self.prestamos.append(p)
+    def _verificar_prestamo(self, num: int, registro: RegistroPrestamo, avisos: List[ErrorValidacion]) -> None:
+        """Verificaciones contra lo ya cargado; el préstamo se guarda igual, pero se reporta:
+        - ids que no existen en los catálogos ('avisos', ya calculados al leer la línea),
+        - el mismo libro prestado en fechas que se cruzan con un préstamo anterior,
+          con intervalos [fecha_prestamo, fecha_devolucion) (sin devolución = sin fin).
+        """
+        for codigo, pos, valor in avisos:
+            self.errores.agregar("prestamos", num, codigo, pos, valor)
+            if self._metricas is not None:
+                self._metricas.sumar("prestamos", "aviso." + codigo)
+        _, id_l, fp, fd = registro[:4]
+        # El préstamo nuevo ocupará la posición len(self.prestamos)
+        solapado = self._intervalos.agregar(id_l, len(self.prestamos), fp, fd)
+        if solapado is not None:
+            self.errores.agregar("prestamos", num, PRESTAMO_SOLAPADO, solapado + 1, id_l)
+            if self._metricas is not None:
+                self._metricas.sumar("prestamos", "aviso." + PRESTAMO_SOLAPADO)
+
+    def _guardar_prestamo(self, id_u: str, id_l: str, fp, fd, nombre_usuario: str, titulo_libro: str) -> None:
+        self._contadores.agregar(id_u, id_l, fp, fd, titulo_libro)
+        if isinstance(self.prestamos, PrestamosColumnar):
+            # Sin crear el objeto: se guarda directo en las columnas
+            self.prestamos.agregar(id_u, id_l, fp, fd, nombre_usuario, titulo_libro)
+            return
+        # Crear objeto préstamo (fechas ya parseadas)
+        p = Prestamo(
+            id_usuario=id_u,
+            id_libro=id_l,
+            fecha_prestamo=fp,
+            fecha_devolucion=fd,
+            nombre_usuario=nombre_usuario,
+            titulo_libro=titulo_libro,
+        )
+        self.prestamos.append(p)
+
+    # ---------- Reportes en consola ----------
+    def _ids_prestamos(self, posiciones: Optional[Iterable[int]] = None) -> Iterator[Tuple[str, str]]:
+        """(id_usuario, id_libro) de los préstamos en 'posiciones' (None = todos); en modo
+        columnar se leen solo esas columnas."""
+        if isinstance(self.prestamos, PrestamosColumnar):
+            return self.prestamos.ids(posiciones)
+        prestamos = self.prestamos if posiciones is None else (self.prestamos[i] for i in posiciones)
+        return ((p.id_usuario, p.id_libro) for p in prestamos)
+
+    def _preparar_reportes(self, h: Optional[date] = None) -> None:
+        """Deja calculados los resultados derivados que leen los reportes a la fecha h (antes de
+        exportar en paralelo, así los hilos solo leen)."""
+        h = h or hoy()
+        self.estadisticas(h)
+        self._posiciones_vencidos(h)
+
+    def _fila_historial(self, p: Prestamo) -> List[str]:
+        """Fila del historial de un préstamo, con nombre y título resueltos en los catálogos."""
+        usuario = self.usuarios.get(p.id_usuario)
+        libro = self.libros.get(p.id_libro)
+        return p.to_row(
+            usuario_resuelto=(usuario.nombre if usuario else ""),
+            libro_resuelto=(libro.titulo if libro else ""),
+        )
+
+    def filas_historial(self) -> Iterator[List[str]]:
+        """Filas del historial, resueltas a medida que se recorren (no se guarda ninguna lista)."""
+        for p in self.prestamos:
+            yield self._fila_historial(p)
+
+    def pagina_historial(self, inicio: int, cantidad: int) -> List[List[str]]:
+        """Filas [inicio, inicio + cantidad) del historial (cuesta lo que mide la página)."""
+        return [self._fila_historial(p) for p in self.prestamos[inicio:inicio + cantidad]]
+
+    def filas_usuarios(self) -> Iterator[List[str]]:
+        """[id_usuario, nombre] de cada usuario del catálogo."""
+        return (u.to_row() for u in self.usuarios.values())
+
+    def filas_libros_prestados(self) -> Iterator[List[str]]:
+        """[id_libro, titulo] de cada libro que aparece en préstamos (sin duplicados)."""
+        c = self._contadores
+        for id_libro in c.frec_libros:
+            libro = self.libros.get(id_libro)
+            yield [id_libro, libro.titulo if libro else c.titulos.get(id_libro, "")]
+
+    def _posiciones_vencidos(self, h: date) -> List[int]:
+        """Posiciones de los préstamos vencidos a la fecha h, en orden de carga; se reutilizan
+        mientras no cambien los datos (versión) ni la fecha."""
+        llave = (self.version, h)
+        if self._vencidos_llave != llave:
+            self._vencidos = self._contadores.abiertos.vencidos(h)
+            self._vencidos_llave = llave
+        return self._vencidos
+
+    def prestamos_vencidos(self, h: Optional[date] = None) -> List[Prestamo]:
+        """Préstamos vencidos a la fecha h (por defecto hoy), en orden de carga.
+        Usa el índice de préstamos abiertos por fecha límite, así que cualquier fecha
+        de referencia ("al día X") cuesta una búsqueda binaria más el tamaño del resultado.
+        """
+        return [self.prestamos[pos] for pos in self._posiciones_vencidos(h or hoy())]
+
+    def filas_vencidos(self, h: Optional[date] = None) -> Iterator[List[str]]:
+        """Filas [id_usuario, usuario, id_libro, libro, fecha_prestamo] de préstamos vencidos."""
+        for pos in self._posiciones_vencidos(h or hoy()):
+            p = self.prestamos[pos]
+            usuario = self.usuarios.get(p.id_usuario)
+            libro = self.libros.get(p.id_libro)
+            yield [
+                p.id_usuario,
+                (usuario.nombre if usuario else (p.nombre_usuario or "")),
+                p.id_libro,
+                (libro.titulo if libro else (p.titulo_libro or "")),
+                p.fecha_prestamo.isoformat(),
+            ]
+
+    def filas_estadisticas(self, h: Optional[date] = None) -> List[List[str]]:
+        """[métrica, valor] del reporte de estadísticas a la fecha h."""
+        est = self.estadisticas(h)
+        mas_libro_id, mas_libro_freq = est.libro_mas_prestado()
+        mas_usr_id, mas_usr_freq = est.usuario_mas_activo()
+        return [
+            ["Total de préstamos", str(est.total)],
+            ["Libro más prestado", f"{mas_libro_id} - {self._titulo_libro(mas_libro_id)} (veces: {mas_libro_freq})"],
+            ["Usuario más activo", f"{mas_usr_id} - {self._nombre_usuario(mas_usr_id)} (veces: {mas_usr_freq})"],
+            ["Total de usuarios únicos", str(est.usuarios_unicos)],
+            ["Préstamos vencidos", str(est.vencidos)],
+        ]
+
+    def filas_reporte(self, nombre: str, h: Optional[date] = None) -> Iterator[List[str]]:
+        """Filas de un reporte de ENCABEZADOS_REPORTES por nombre; h se usa en estadísticas y vencidos."""
+        if nombre == "historial":
+            return self.filas_historial()
+        if nombre == "usuarios":
+            return self.filas_usuarios()
+        if nombre == "libros":
+            return self.filas_libros_prestados()
+        if nombre == "estadisticas":
+            return iter(self.filas_estadisticas(h))
+        if nombre == "vencidos":
+            return self.filas_vencidos(h)
+        raise ValueError(f"reporte desconocido: {nombre!r} (use {', '.join(ENCABEZADOS_REPORTES)})")
 
     # ---------- Reportes en consola ----------
     def mostrar_historial(self) -> None:
+        self._imprimir_prestamos("HISTORIAL DE PRÉSTAMOS", self.filas_historial())
+
+    @staticmethod
+    def _imprimir_prestamos(titulo: str, filas: Iterable[List[str]]) -> None:
+        """Tabla de préstamos en consola con las columnas del historial."""
         # Encabezado
-        print("HISTORIAL DE PRÉSTAMOS")
+        print(titulo)
         print("-" * 80)
         # Columnas
         print(f"{'ID_Usuario':<12} {'Usuario':<20} {'ID_Libro':<12} {'Libro':<20} {'F.Prestamo':<12} {'F.Devolucion':<12}")
-        # Filas
-        for p in self.prestamos:
-            usuario = self.usuarios.get(p.id_usuario)
-            libro = self.libros.get(p.id_libro)
-            fila = p.to_row(
-                usuario_resuelto=(usuario.nombre if usuario else ""),
-                libro_resuelto=(libro.titulo if libro else ""),
-            )
+        for u_id, u_nom, l_id, l_tit, f_p, f_d in filas:
             # Imprimir con anchos fijos (truncar si excede)
-            u_id, u_nom, l_id, l_tit, f_p, f_d = fila
             print(f"{u_id:<12} {u_nom[:20]:<20} {l_id:<12} {l_tit[:20]:<20} {f_p:<12} {f_d:<12}")
         print()
 
@@ -116,128 +409,338 @@ class Almacen:
         print("LIBROS PRESTADOS (sin duplicados en historial)")
         print("-" * 60)
         print(f"{'ID_Libro':<12} {'Titulo':<40}")
-        # Determinar libros que aparecen en la lista de préstamos
-        vistos = set()
-        for p in self.prestamos:
-            if p.id_libro not in vistos:
-                vistos.add(p.id_libro)
-                libro = self.libros.get(p.id_libro)
-                titulo = libro.titulo if libro else (p.titulo_libro or "")
-                print(f"{p.id_libro:<12} {titulo[:40]:<40}")
+        for id_libro, titulo in self.filas_libros_prestados():
+            print(f"{id_libro:<12} {titulo[:40]:<40}")
         print()
 
-    def mostrar_estadisticas(self) -> None:
+    def estadisticas(self, h: Optional[date] = None) -> Estadisticas:
+        """Estadísticas de préstamos a partir de los contadores que se actualizan al cargar (sin
+        recorrer los préstamos); se reutilizan mientras no cambien los datos (versión) ni la fecha.
+        """
+        h = h or hoy()
+        llave = (self.version, h)
+        if self._estadisticas is None or self._estadisticas_llave != llave:
+            self._estadisticas = self._contadores.estadisticas(h)
+            self._estadisticas_llave = llave
+        return self._estadisticas
+
+    def columnas_fechas(self) -> Tuple[Sequence[int], Sequence[int]]:
+        """Fechas de préstamo y de devolución como ordinales de día (0 = sin devolver), una
+        posición por préstamo en orden de carga. En modo columnar son las columnas mismas.
+        """
+        if isinstance(self.prestamos, PrestamosColumnar):
+            return self.prestamos.fecha_prestamo, self.prestamos.fecha_devolucion
+        fp, fd = array("i"), array("i")
+        for p in self.prestamos:
+            fp.append(p.fecha_prestamo.toordinal())
+            fd.append(p.fecha_devolucion.toordinal() if p.fecha_devolucion else PrestamosColumnar.SIN_DEVOLUCION)
+        return fp, fd
+
+    def analitica(self, h: Optional[date] = None) -> Analitica:
+        """Series de tiempo (préstamos por día/semana/mes, duración, retrasos y vencidos por mes) a la fecha h."""
+        return calcular_analitica(*self.columnas_fechas(), h or hoy())
+
+    def _titulo_libro(self, id_libro: str) -> str:
+        return self.libros[id_libro].titulo if id_libro in self.libros else ""
+
+    def _nombre_usuario(self, id_usuario: str) -> str:
+        return self.usuarios[id_usuario].nombre if id_usuario in self.usuarios else ""
+
+    def mostrar_estadisticas(self, h: Optional[date] = None) -> None:
         print("ESTADÍSTICAS DE PRÉSTAMOS")
         print("-" * 40)
-        total = len(self.prestamos)
+        est = self.estadisticas(h)
         # Libro más prestado
-        frec_libros = contar_frecuencias([p.id_libro for p in self.prestamos])
-        mas_libro_id, mas_libro_freq = max_por_valor(frec_libros)
-        mas_libro_titulo = self.libros[mas_libro_id].titulo if mas_libro_id in self.libros else ""
+        mas_libro_id, mas_libro_freq = est.libro_mas_prestado()
         # Usuario más activo
-        frec_usuarios = contar_frecuencias([p.id_usuario for p in self.prestamos])
-        mas_usr_id, mas_usr_freq = max_por_valor(frec_usuarios)
-        mas_usr_nombre = self.usuarios[mas_usr_id].nombre if mas_usr_id in self.usuarios else ""
-        # Usuarios únicos (que han prestado)
-        unicos = set([p.id_usuario for p in self.prestamos])
-
-        print(f"Total de préstamos: {total}")
-        print(f"Libro más prestado: {mas_libro_id} - {mas_libro_titulo} (veces: {mas_libro_freq})")
-        print(f"Usuario más activo: {mas_usr_id} - {mas_usr_nombre} (veces: {mas_usr_freq})")
-        print(f"Total de usuarios únicos (en préstamos): {len(unicos)}")
+        mas_usr_id, mas_usr_freq = est.usuario_mas_activo()
+
+        print(f"Total de préstamos: {est.total}")
+        print(f"Libro más prestado: {mas_libro_id} - {self._titulo_libro(mas_libro_id)} (veces: {mas_libro_freq})")
+        print(f"Usuario más activo: {mas_usr_id} - {self._nombre_usuario(mas_usr_id)} (veces: {mas_usr_freq})")
+        print(f"Total de usuarios únicos (en préstamos): {est.usuarios_unicos}")
+        print(f"Préstamos vencidos: {est.vencidos}")
         print()
 
-    def mostrar_prestamos_vencidos(self) -> None:
+    def mostrar_prestamos_vencidos(self, h: Optional[date] = None) -> None:
         print("PRÉSTAMOS VENCIDOS")
         print("-" * 40)
         print(f"{'ID_Usuario':<12} {'Usuario':<20} {'ID_Libro':<12} {'Libro':<20} {'F.Prestamo':<12}")
-        h = hoy()
-        for p in self.prestamos:
-            if p.esta_vencido(h):
-                usuario = self.usuarios.get(p.id_usuario)
-                libro = self.libros.get(p.id_libro)
-                u_nom = usuario.nombre if usuario else (p.nombre_usuario or "")
-                l_nom = libro.titulo if libro else (p.titulo_libro or "")
-                print(f"{p.id_usuario:<12} {u_nom[:20]:<20} {p.id_libro:<12} {l_nom[:20]:<20} {p.fecha_prestamo.isoformat():<12}")
+        for u_id, u_nom, l_id, l_nom, f_p in self.filas_vencidos(h):
+            print(f"{u_id:<12} {u_nom[:20]:<20} {l_id:<12} {l_nom[:20]:<20} {f_p:<12}")
         print()
 
-    # ---------- Exportar reportes a HTML ----------
-    def exportar_reportes_html(self) -> None:
-        # Historial
-        headers_h = ["ID Usuario", "Usuario", "ID Libro", "Libro", "Fecha Préstamo", "Fecha Devolución"]
-        filas_h: List[List[str]] = []
-        for p in self.prestamos:
-            usuario = self.usuarios.get(p.id_usuario)
-            libro = self.libros.get(p.id_libro)
-            filas_h.append(p.to_row(
-                usuario_resuelto=(usuario.nombre if usuario else ""),
-                libro_resuelto=(libro.titulo if libro else ""),
-            ))
-        exportar("Historial de Préstamos", headers_h, filas_h, path.join(OUT_DIR, "historial_prestamos.html"))
-
-        # Usuarios únicos (catálogo)
-        headers_u = ["ID Usuario", "Nombre"]
-        filas_u = [u.to_row() for u in self.usuarios.values()]
-        exportar("Listado de Usuarios", headers_u, filas_u, path.join(OUT_DIR, "usuarios.html"))
-
-        # Libros prestados (únicos)
-        headers_l = ["ID Libro", "Título"]
-        filas_l: List[List[str]] = []
-        vistos = set()
-        for p in self.prestamos:
-            if p.id_libro not in vistos:
-                vistos.add(p.id_libro)
-                libro = self.libros.get(p.id_libro)
-                titulo = libro.titulo if libro else (p.titulo_libro or "")
-                filas_l.append([p.id_libro, titulo])
-        exportar("Listado de Libros Prestados", headers_l, filas_l, path.join(OUT_DIR, "libros.html"))
-
-        # Estadísticas
-        total = len(self.prestamos)
-        frec_libros = contar_frecuencias([p.id_libro for p in self.prestamos])
-        mas_libro_id, mas_libro_freq = max_por_valor(frec_libros)
-        mas_libro_titulo = self.libros[mas_libro_id].titulo if mas_libro_id in self.libros else ""
-        frec_usuarios = contar_frecuencias([p.id_usuario for p in self.prestamos])
-        mas_usr_id, mas_usr_freq = max_por_valor(frec_usuarios)
-        mas_usr_nombre = self.usuarios[mas_usr_id].nombre if mas_usr_id in self.usuarios else ""
-        unicos = set([p.id_usuario for p in self.prestamos])
-        headers_e = ["Métrica", "Valor"]
-        filas_e = [
-            ["Total de préstamos", str(total)],
-            ["Libro más prestado", f"{mas_libro_id} - {mas_libro_titulo} (veces: {mas_libro_freq})"],
-            ["Usuario más activo", f"{mas_usr_id} - {mas_usr_nombre} (veces: {mas_usr_freq})"],
-            ["Total de usuarios únicos", str(len(unicos))],
+    # ---------- Préstamos de un usuario o de un libro ----------
+    def _posiciones_de(self, tipo: str, id_: str, solo_abiertos: bool = False) -> List[int]:
+        """Posiciones de los préstamos del usuario o libro ('usuario' o 'libro'), por fecha de préstamo.
+        Usa los índices que se llenan al cargar: el costo depende del resultado, no del total.
+        """
+        if tipo == "usuario":
+            return self._contadores.por_usuario.posiciones(id_, solo_abiertos)
+        if tipo == "libro":
+            return self._contadores.por_libro.posiciones(id_, solo_abiertos)
+        raise ValueError(f"tipo inválido: {tipo!r} (use 'usuario' o 'libro')")
+
+    def prestamos_de_usuario(self, id_usuario: str, solo_abiertos: bool = False) -> List[Prestamo]:
+        """Historial completo (o solo préstamos sin devolver) de un usuario, por fecha de préstamo."""
+        return [self.prestamos[pos] for pos in self._posiciones_de("usuario", id_usuario, solo_abiertos)]
+
+    def prestamos_de_libro(self, id_libro: str, solo_abiertos: bool = False) -> List[Prestamo]:
+        """Quiénes tuvieron (o tienen, con solo_abiertos) un libro, por fecha de préstamo."""
+        return [self.prestamos[pos] for pos in self._posiciones_de("libro", id_libro, solo_abiertos)]
+
+    def filas_prestamos_de(self, tipo: str, id_: str, solo_abiertos: bool = False) -> List[List[str]]:
+        """Filas del historial de un usuario o libro (solo se resuelven las de ese resultado)."""
+        return [self._fila_historial(self.prestamos[pos]) for pos in self._posiciones_de(tipo, id_, solo_abiertos)]
+
+    def mostrar_prestamos_de(self, tipo: str, id_: str, solo_abiertos: bool = False) -> None:
+        if tipo == "usuario":
+            titulo = f"PRÉSTAMOS DEL USUARIO {id_} - {self._nombre_usuario(id_)}"
+        else:
+            titulo = f"PRÉSTAMOS DEL LIBRO {id_} - {self._titulo_libro(id_)}"
+        if solo_abiertos:
+            titulo += " (SIN DEVOLVER)"
+        self._imprimir_prestamos(titulo, self.filas_prestamos_de(tipo, id_, solo_abiertos))
+
+    # ---------- Disponibilidad de libros ----------
+    def prestamos_activos_en(self, d: Optional[date] = None) -> List[Prestamo]:
+        """Préstamos que tienen un libro en su poder el día d (por defecto hoy): uno por libro
+        prestado, en orden de primer préstamo de cada libro. Cada libro se resuelve con una
+        búsqueda binaria en su índice de intervalos, sin recorrer los préstamos.
+        """
+        d = d or hoy()
+        activos = []
+        for id_libro in self._intervalos.libros():
+            pos = self._intervalos.prestado_en(id_libro, d)
+            if pos is not None:
+                activos.append(self.prestamos[pos])
+        return activos
+
+    def esta_disponible(self, id_libro: str, d: Optional[date] = None) -> bool:
+        """True si el libro no está prestado el día d (por defecto hoy)."""
+        return self._intervalos.prestado_en(id_libro, d or hoy()) is None
+
+    def libros_disponibles(self, d: Optional[date] = None) -> List[Libro]:
+        """Libros del catálogo que no están prestados el día d (por defecto hoy)."""
+        d = d or hoy()
+        return [l for l in self.libros.values() if self._intervalos.prestado_en(l.id_libro, d) is None]
+
+    def mostrar_prestados_en(self, d: Optional[date] = None) -> None:
+        d = d or hoy()
+        print(f"LIBROS PRESTADOS AL {d.isoformat()}")
+        print("-" * 80)
+        print(f"{'ID_Libro':<12} {'Libro':<20} {'ID_Usuario':<12} {'Usuario':<20} {'F.Prestamo':<12} {'F.Devolucion':<12}")
+        for p in self.prestamos_activos_en(d):
+            titulo = self._titulo_libro(p.id_libro) or p.titulo_libro
+            nombre = self._nombre_usuario(p.id_usuario) or p.nombre_usuario
+            fd = p.fecha_devolucion.isoformat() if p.fecha_devolucion else ""
+            print(f"{p.id_libro:<12} {titulo[:20]:<20} {p.id_usuario:<12} {nombre[:20]:<20} {p.fecha_prestamo.isoformat():<12} {fd:<12}")
+        print()
+
+    def mostrar_libros_disponibles(self, d: Optional[date] = None) -> None:
+        d = d or hoy()
+        print(f"LIBROS DISPONIBLES AL {d.isoformat()}")
+        print("-" * 60)
+        print(f"{'ID_Libro':<12} {'Titulo':<40}")
+        for l in self.libros_disponibles(d):
+            print(f"{l.id_libro:<12} {l.titulo[:40]:<40}")
+        print()
+
+    # ---------- Rankings (top N) ----------
+    def ranking(self, tipo: str, n: int = 10, desde: Optional[date] = None, hasta: Optional[date] = None) -> List[Tuple]:
+        """Top n de 'libros', 'usuarios' o 'pares' (id_usuario, id_libro) por cantidad de préstamos,
+        como [(clave, veces)] de mayor a menor. Con desde/hasta solo cuentan los préstamos con
+        fecha_prestamo en ese rango (ambos incluidos).
+        Se elige con heapq sobre los contadores que se mantienen al cargar (sin ordenar todo);
+        a igual cantidad va primero el que aparece antes en el historial.
+        """
+        return top_n_por_valor(self._contadores.conteos(tipo, self._ids_prestamos, desde, hasta), n)
+
+    _ENCABEZADOS_RANKING = {
+        "libros": ["#", "ID Libro", "Título", "Préstamos"],
+        "usuarios": ["#", "ID Usuario", "Usuario", "Préstamos"],
+        "pares": ["#", "ID Usuario", "Usuario", "ID Libro", "Título", "Préstamos"],
+    }
+
+    def filas_ranking(self, tipo: str, n: int = 10, desde: Optional[date] = None, hasta: Optional[date] = None) -> Iterator[List[str]]:
+        """Filas del ranking con nombres/títulos del catálogo (ver _ENCABEZADOS_RANKING)."""
+        for puesto, (clave, veces) in enumerate(self.ranking(tipo, n, desde, hasta), start=1):
+            if tipo == "libros":
+                yield [str(puesto), clave, self._titulo_libro(clave), str(veces)]
+            elif tipo == "usuarios":
+                yield [str(puesto), clave, self._nombre_usuario(clave), str(veces)]
+            else:
+                id_u, id_l = clave
+                yield [str(puesto), id_u, self._nombre_usuario(id_u), id_l, self._titulo_libro(id_l), str(veces)]
+
+    @staticmethod
+    def _titulo_ranking(tipo: str, n: int, desde: Optional[date], hasta: Optional[date]) -> str:
+        nombres = {"libros": "libros", "usuarios": "usuarios", "pares": "pares usuario-libro"}
+        titulo = f"Ranking de {nombres[tipo]} (top {n})"
+        if desde or hasta:
+            titulo += f" del {desde.isoformat() if desde else 'inicio'} al {hasta.isoformat() if hasta else 'final'}"
+        return titulo
+
+    def mostrar_ranking(self, tipo: str, n: int = 10, desde: Optional[date] = None, hasta: Optional[date] = None) -> None:
+        print(self._titulo_ranking(tipo, n, desde, hasta).upper())
+        print("-" * 60)
+        if tipo == "pares":
+            print(f"{'#':>3} {'ID_Usuario':<12} {'Usuario':<20} {'ID_Libro':<12} {'Libro':<20} {'Veces':>6}")
+            for puesto, id_u, nombre, id_l, titulo, veces in self.filas_ranking(tipo, n, desde, hasta):
+                print(f"{puesto:>3} {id_u:<12} {nombre[:20]:<20} {id_l:<12} {titulo[:20]:<20} {veces:>6}")
+        else:
+            print(f"{'#':>3} {'ID':<12} {'Nombre' if tipo == 'usuarios' else 'Titulo':<40} {'Veces':>6}")
+            for puesto, id_, texto, veces in self.filas_ranking(tipo, n, desde, hasta):
+                print(f"{puesto:>3} {id_:<12} {texto[:40]:<40} {veces:>6}")
+        print()
+
+    def exportar_ranking_html(self, tipo: str, n: int = 10, desde: Optional[date] = None,
+                              hasta: Optional[date] = None, carpeta: Optional[str] = None) -> str:
+        """Exporta el ranking a ranking_<tipo>.html y devuelve la ruta del archivo."""
+        destino = path.join(carpeta or OUT_DIR, f"ranking_{tipo}.html")
+        exportar(self._titulo_ranking(tipo, n, desde, hasta), self._ENCABEZADOS_RANKING[tipo],
+                 self.filas_ranking(tipo, n, desde, hasta), destino)
+        return destino
+
+    # ---------- Exportar reportes (HTML, CSV o JSON Lines) ----------
+    def exportar_reportes_html(
+        self,
+        filas_por_pagina: Optional[int] = None,
+        concurrente: bool = False,
+        h: Optional[date] = None,
+        carpeta: Optional[str] = None,
+    ) -> None:
+        """Exporta los cinco reportes y la analítica de series de tiempo (analitica.html).
+        Con filas_por_pagina, historial, usuarios y vencidos se dividen en páginas numeradas
+        y el archivo original pasa a ser un índice con enlaces.
+        Con concurrente=True los archivos se generan en paralelo (un hilo por reporte).
+        Cada archivo se escribe en un temporal y se renombra al final, así que una exportación
+        interrumpida nunca deja HTML a medio escribir en OUT_DIR.
+        'h' es la fecha de referencia para vencidos/estadísticas y 'carpeta' reemplaza a OUT_DIR.
+        """
+        self.exportar_reportes("html", False, filas_por_pagina, concurrente, h, carpeta)
+
+    def exportar_reportes(
+        self,
+        formato: str = "html",
+        comprimir: bool = False,
+        filas_por_pagina: Optional[int] = None,
+        concurrente: bool = False,
+        h: Optional[date] = None,
+        carpeta: Optional[str] = None,
+    ) -> None:
+        """Exporta los mismos reportes que exportar_reportes_html en el formato indicado:
+        "html", "csv" o "jsonl" (un objeto JSON por línea). En csv/jsonl cada archivo se escribe
+        mientras se recorren las filas (memoria constante), con nombres de columna como
+        "id_usuario"; la analítica sale en un archivo por sección (analitica_mensual.csv, ...).
+        comprimir=True (solo csv/jsonl) agrega ".gz" y escribe con gzip.
+        filas_por_pagina solo aplica a html; los demás parámetros, como en exportar_reportes_html.
+        """
+        if formato != "html" and formato not in EXTENSIONES:
+            raise ValueError(f"formato inválido: {formato!r} (use html, {', '.join(EXTENSIONES)})")
+        if comprimir and formato == "html":
+            raise ValueError("la compresión gzip solo aplica a csv y jsonl")
+        extension = ".html" if formato == "html" else EXTENSIONES[formato] + (".gz" if comprimir else "")
+        inicio_total = time.perf_counter()
+        carpeta = carpeta or OUT_DIR
+        m = self._metricas
+        def exportar_tabla(titulo: str, headers: List[str], filas, nombre: str, paginable: bool = True) -> None:
+            inicio = time.perf_counter()
+            archivo = nombre + extension
+            destino = path.join(carpeta, archivo)
+            if m is not None:
+                filas = m.iterar("exportacion", filas, "generar_filas." + archivo, "filas." + archivo)
+            if formato != "html":
+                exportar_datos(formato, headers, filas, destino, comprimir)
+            elif filas_por_pagina and paginable:
+                exportar_paginado(titulo, headers, filas, destino, filas_por_pagina)
+            else:
+                exportar(titulo, headers, filas, destino)
+            if m is not None:
+                m.acumular_tiempo("exportacion", archivo, time.perf_counter() - inicio)
+
+        # Calcular estadísticas y vencidos antes de repartir trabajo: los hilos solo leen
+        self._preparar_reportes(h)
+        est = self.estadisticas(h)
+        if m is not None:
+            m.acumular_tiempo("exportacion", "preparar_reportes", time.perf_counter() - inicio_total)
+
+        def exportar_analitica() -> None:
+            inicio = time.perf_counter()
+            a = self.analitica(est.hoy)
+            promedio = f"{a.duracion_promedio:.1f} días" if a.duracion_promedio is not None else "-"
+            # (sufijo del archivo en csv/jsonl, subtítulo, encabezados, filas)
+            secciones = [
+                ("resumen", "Resumen", ["Métrica", "Valor"], [
+                    ["Total de préstamos", str(a.total)],
+                    ["Devueltos", str(a.devueltos)],
+                    ["Sin devolver", str(a.abiertos)],
+                    ["Duración promedio (devueltos)", promedio],
+                ]),
+                ("retrasos", "Retraso en la devolución", ["Retraso", "Devoluciones"],
+                 [[t, str(n)] for t, n in a.retrasos]),
+                ("mensual", "Préstamos y vencidos por mes", ["Mes", "Préstamos", "Vencidos al cierre"],
+                 [[mes, str(n), "" if v is None else str(v)] for mes, n, v in a.resumen_mensual()]),
+                ("semanal", "Préstamos por semana", ["Semana (lunes)", "Préstamos"],
+                 [[d.isoformat(), str(n)] for d, n in a.por_semana]),
+                ("diaria", "Préstamos por día", ["Fecha", "Préstamos"],
+                 [[d.isoformat(), str(n)] for d, n in a.por_dia if n]),
+            ]
+            if formato == "html":
+                archivo = "analitica.html"
+                exportar_secciones("Analítica de Préstamos", [seccion[1:] for seccion in secciones], path.join(carpeta, archivo))
+            else:
+                archivo = "analitica_*" + extension
+                for sufijo, _, headers, filas in secciones:
+                    exportar_datos(formato, headers, filas, path.join(carpeta, f"analitica_{sufijo}{extension}"), comprimir)
+            if m is not None:
+                m.acumular_tiempo("exportacion", archivo, time.perf_counter() - inicio)
+
+        tareas = [
+            # Historial
+            (exportar_tabla, *ENCABEZADOS_REPORTES["historial"], self.filas_historial(), "historial_prestamos"),
+            # Usuarios únicos (catálogo)
+            (exportar_tabla, *ENCABEZADOS_REPORTES["usuarios"], self.filas_usuarios(), "usuarios"),
+            # Libros prestados (únicos)
+            (exportar_tabla, *ENCABEZADOS_REPORTES["libros"], self.filas_libros_prestados(), "libros", False),
+            # Estadísticas
+            (exportar_tabla, *ENCABEZADOS_REPORTES["estadisticas"], self.filas_estadisticas(est.hoy),
+             "estadisticas", False),
+            # Vencidos
+            (exportar_tabla, *ENCABEZADOS_REPORTES["vencidos"], self.filas_vencidos(est.hoy), "vencidos"),
+            # Series de tiempo
+            (exportar_analitica,),
         ]
-        exportar("Estadísticas de Préstamos", headers_e, filas_e, path.join(OUT_DIR, "estadisticas.html"))
+        if concurrente:
+            with ThreadPoolExecutor(max_workers=len(tareas)) as pool:
+                futuros = [pool.submit(*t) for t in tareas]
+                for fut in futuros:
+                    fut.result()  # propaga la primera excepción, si hubo
+        else:
+            for funcion, *args in tareas:
+                funcion(*args)
+        if m is not None:
+            m.sumar("exportacion", "exportaciones")
+            m.acumular_tiempo("exportacion", "total", time.perf_counter() - inicio_total)
 
-        # Vencidos
-        headers_v = ["ID Usuario", "Usuario", "ID Libro", "Libro", "Fecha Préstamo"]
-        filas_v: List[List[str]] = []
-        h = hoy()
-        for p in self.prestamos:
-            if p.esta_vencido(h):
-                usuario = self.usuarios.get(p.id_usuario)
-                libro = self.libros.get(p.id_libro)
-                filas_v.append([
-                    p.id_usuario,
-                    (usuario.nombre if usuario else (p.nombre_usuario or "")),
-                    p.id_libro,
-                    (libro.titulo if libro else (p.titulo_libro or "")),
-                    p.fecha_prestamo.isoformat(),
-                ])
-        exportar("Préstamos Vencidos", headers_v, filas_v, path.join(OUT_DIR, "vencidos.html"))
-
-        print(f"Reportes HTML generados en: {OUT_DIR}")
+        print(f"Reportes {formato.upper()} generados en: {carpeta}")
 
     # ---------- Utilidad ----------
     def mostrar_errores(self) -> None:
-        if not self.errores:
+        if not self.errores.total:
             print("Sin errores reportados.")
             return
         print("ERRORES DETECTADOS")
         print("-" * 60)
+        # Los mensajes se arman recién aquí, a partir de los registros estructurados
         for e in self.errores:
             print(e)
+        if self.errores.descartados:
+            print(f"... y {self.errores.descartados} errores más (se guardan como máximo {self.errores.limite}).")
+            print("Totales por tipo de error:")
+            for archivo, conteo in self.errores.resumen().items():
+                for codigo, n in conteo.items():
+                    print(f"  [{archivo}] {codigo}: {n}")
         print()
 
 # ---------------- Menú de consola ----------------
@@ -253,6 +756,27 @@ def asegurar_directorios() -> None:
     if not os.path.isdir(OUT_DIR):
         os.makedirs(OUT_DIR, exist_ok=True)
 
+def menu_ranking(store: Almacen) -> None:
+    """Pide tipo, N y rango de fechas opcional; muestra el ranking y ofrece exportarlo."""
+    tipos = {"l": "libros", "u": "usuarios", "p": "pares"}
+    tipo = tipos.get(input("Ranking de (L)ibros, (U)suarios o (P)ares usuario-libro [L]: ").strip().lower() or "l")
+    if tipo is None:
+        print("Opción no válida.\n")
+        return
+    try:
+        n = int(input("Cantidad (top N) [10]: ").strip() or "10")
+        desde = parse_fecha(input("Desde (YYYY-MM-DD, Enter = sin límite): ").strip())
+        hasta = parse_fecha(input("Hasta (YYYY-MM-DD, Enter = sin límite): ").strip())
+    except ValueError as ex:
+        print(f"Dato inválido: {ex}\n")
+        return
+    store.mostrar_ranking(tipo, n, desde, hasta)
+    if input("¿Exportar a HTML? (s/N): ").strip().lower() == "s":
+        try:
+            print(f"Ranking exportado en: {store.exportar_ranking_html(tipo, n, desde, hasta)}\n")
+        except Exception as ex:
+            print(f"Error exportando ranking: {ex}\n")
+
 def main():
     print("=== SISTEMA DE BIBLIOTECA DIGITAL (Consola) ===")
     print("Nota: Formatos por defecto separados por '|'")
@@ -274,6 +798,11 @@ def main():
         print("7) Mostrar estadísticas de préstamos")
         print("8) Mostrar préstamos vencidos")
         print("9) Exportar todos los reportes a HTML")
+        print("R) Rankings: top N de libros, usuarios o pares usuario-libro")
+        print("U) Préstamos de un usuario")
+        print("L) Préstamos de un libro")
+        print("P) Libros prestados a una fecha")
+        print("D) Libros disponibles hoy")
         print("E) Mostrar errores de carga/validación")
         print("0) Salir")
         op = input("Seleccione una opción: ").strip().lower()
@@ -315,6 +844,24 @@ def main():
                 store.exportar_reportes_html()
             except Exception as ex:
                 print(f"Error exportando reportes: {ex}\n")
+        elif op == "r":
+            menu_ranking(store)
+        elif op in ("u", "l"):
+            tipo = "usuario" if op == "u" else "libro"
+            id_ = input(f"ID del {tipo}: ").strip()
+            solo_abiertos = input("¿Solo préstamos sin devolver? (s/N): ").strip().lower() == "s"
+            print()
+            store.mostrar_prestamos_de(tipo, id_, solo_abiertos)
+        elif op == "p":
+            try:
+                d = parse_fecha(input("Fecha (YYYY-MM-DD, Enter = hoy): ").strip())
+            except ValueError as ex:
+                print(f"Dato inválido: {ex}\n")
+                continue
+            print()
+            store.mostrar_prestados_en(d)
+        elif op == "d":
+            store.mostrar_libros_disponibles()
         elif op == "e":
             store.mostrar_errores()
         elif op == "0":
@@ -0,0 +1,78 @@
+import time
+from typing import Callable, Dict, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+_FIN = object()
+
+class Metricas:
+    """Contadores y tiempos acumulados por fase ('usuarios', 'libros', 'prestamos', 'exportacion').
+    Solo existe si el almacén se creó con metricas=True; con las métricas apagadas el código de
+    carga no llama a nada de esta clase, así que no agrega costo por línea.
+    """
+
+    def __init__(self) -> None:
+        self.contadores: Dict[str, Dict[str, int]] = {}
+        self.tiempos: Dict[str, Dict[str, float]] = {}
+
+    def sumar(self, fase: str, nombre: str, n: int = 1) -> None:
+        c = self.contadores.setdefault(fase, {})
+        c[nombre] = c.get(nombre, 0) + n
+
+    def acumular_tiempo(self, fase: str, nombre: str, segundos: float) -> None:
+        t = self.tiempos.setdefault(fase, {})
+        t[nombre] = t.get(nombre, 0.0) + segundos
+
+    def envolver(self, fase: str, nombre: str, funcion: Callable[..., T], contador: Optional[str] = None) -> Callable[..., T]:
+        """Devuelve funcion envuelta: cada llamada suma su duración al tiempo 'nombre'
+        y, si se indica, 1 al contador 'contador'.
+        """
+        tiempos = self.tiempos.setdefault(fase, {})
+        tiempos.setdefault(nombre, 0.0)
+        contadores = self.contadores.setdefault(fase, {})
+        if contador is not None:
+            contadores.setdefault(contador, 0)
+        reloj = time.perf_counter
+
+        def medida(*args, **kwargs):
+            inicio = reloj()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                tiempos[nombre] += reloj() - inicio
+                if contador is not None:
+                    contadores[contador] += 1
+        return medida
+
+    def iterar(self, fase: str, iterable: Iterable[T], tiempo: str, contador: str) -> Iterator[T]:
+        """Recorre iterable acumulando en 'tiempo' lo que tarda en producir cada elemento
+        (sin contar lo que haga quien lo consume) y en 'contador' la cantidad de elementos.
+        """
+        it = iter(iterable)
+        reloj = time.perf_counter
+        total = 0.0
+        n = 0
+        try:
+            while True:
+                inicio = reloj()
+                elem = next(it, _FIN)
+                total += reloj() - inicio
+                if elem is _FIN:
+                    return
+                n += 1
+                yield elem
+        finally:
+            self.acumular_tiempo(fase, tiempo, total)
+            self.sumar(fase, contador, n)
+
+    def a_dict(self) -> Dict[str, Dict[str, Dict]]:
+        """{fase: {"contadores": {...}, "tiempos_s": {...}}}, apto para json.dumps."""
+        fases = list(self.contadores)
+        fases += [f for f in self.tiempos if f not in self.contadores]
+        return {
+            fase: {
+                "contadores": dict(sorted(self.contadores.get(fase, {}).items())),
+                "tiempos_s": {k: round(v, 6) for k, v in sorted(self.tiempos.get(fase, {}).items())},
+            }
+            for fase in fases
+        }
@@ -4,6 +4,8 @@ from typing import Optional
 class Prestamo:
     """Modelo de un préstamo: enlaza usuario y libro por sus IDs."""
 
+    __slots__ = ("id_usuario", "id_libro", "fecha_prestamo", "fecha_devolucion", "nombre_usuario", "titulo_libro")
+
     # Plazo por defecto (días) para considerar vencimiento si no se ha devuelto
     PLAZO_DIAS = 30
 
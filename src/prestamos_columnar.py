@@ -0,0 +1,112 @@
+from array import array
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from prestamo import Prestamo
+
+class PrestamosColumnar:
+    """Almacenamiento compacto (por columnas) de préstamos.
+
+    En lugar de un objeto Prestamo por registro se guardan seis columnas array('i'):
+      - id_usuario, id_libro, nombre_usuario, titulo_libro: códigos enteros de cadenas internadas
+      - fecha_prestamo, fecha_devolucion: ordinales de día (date.toordinal)
+    Los objetos Prestamo se materializan solo al recorrer o indexar (p. ej. para un reporte).
+    Se comporta como una lista de solo-agregar: len(), iteración, índice y append().
+    """
+
+    # Ordinal centinela para "no devuelto" (date.toordinal() siempre es >= 1)
+    SIN_DEVOLUCION = 0
+
+    def __init__(self) -> None:
+        # Tabla de cadenas internadas: código -> texto y texto -> código (0 = cadena vacía)
+        self._textos: List[str] = [""]
+        self._codigos: Dict[str, int] = {"": 0}
+        # Columnas
+        self.usuario = array("i")
+        self.libro = array("i")
+        self.fecha_prestamo = array("i")
+        self.fecha_devolucion = array("i")
+        self.nombre_usuario = array("i")
+        self.titulo_libro = array("i")
+
+    def _codigo(self, texto: str) -> int:
+        """Devuelve el código de una cadena, internándola si es nueva."""
+        cod = self._codigos.get(texto)
+        if cod is None:
+            cod = len(self._textos)
+            self._textos.append(texto)
+            self._codigos[texto] = cod
+        return cod
+
+    def __getstate__(self) -> Dict:
+        # El diccionario texto -> código se reconstruye al cargar (no se guarda dos veces)
+        estado = dict(self.__dict__)
+        del estado["_codigos"]
+        return estado
+
+    def __setstate__(self, estado: Dict) -> None:
+        self.__dict__.update(estado)
+        self._codigos = {t: i for i, t in enumerate(self._textos)}
+
+    def texto(self, codigo: int) -> str:
+        return self._textos[codigo]
+
+    # ---------- Escritura ----------
+    def agregar(
+        self,
+        id_usuario: str,
+        id_libro: str,
+        fecha_prestamo: date,
+        fecha_devolucion: Optional[date],
+        nombre_usuario: str = "",
+        titulo_libro: str = "",
+    ) -> None:
+        """Agrega un préstamo sin crear el objeto Prestamo."""
+        self.usuario.append(self._codigo(id_usuario))
+        self.libro.append(self._codigo(id_libro))
+        self.fecha_prestamo.append(fecha_prestamo.toordinal())
+        self.fecha_devolucion.append(fecha_devolucion.toordinal() if fecha_devolucion else self.SIN_DEVOLUCION)
+        self.nombre_usuario.append(self._codigo(nombre_usuario))
+        self.titulo_libro.append(self._codigo(titulo_libro))
+
+    def append(self, p: Prestamo) -> None:
+        self.agregar(p.id_usuario, p.id_libro, p.fecha_prestamo, p.fecha_devolucion, p.nombre_usuario, p.titulo_libro)
+
+    # ---------- Lectura ----------
+    def _materializar(self, i: int) -> Prestamo:
+        fd = self.fecha_devolucion[i]
+        return Prestamo(
+            id_usuario=self._textos[self.usuario[i]],
+            id_libro=self._textos[self.libro[i]],
+            fecha_prestamo=date.fromordinal(self.fecha_prestamo[i]),
+            fecha_devolucion=(date.fromordinal(fd) if fd != self.SIN_DEVOLUCION else None),
+            nombre_usuario=self._textos[self.nombre_usuario[i]],
+            titulo_libro=self._textos[self.titulo_libro[i]],
+        )
+
+    def __len__(self) -> int:
+        return len(self.usuario)
+
+    def __getitem__(self, i: Union[int, slice]):
+        if isinstance(i, slice):
+            return [self._materializar(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("índice de préstamo fuera de rango")
+        return self._materializar(i)
+
+    def __iter__(self) -> Iterator[Prestamo]:
+        for i in range(len(self)):
+            yield self._materializar(i)
+
+    def ids(self, posiciones: Optional[Iterable[int]] = None) -> Iterator[Tuple[str, str]]:
+        """(id_usuario, id_libro) de los préstamos en 'posiciones' (None = todos), leyendo solo
+        esas dos columnas (sin materializar préstamos)."""
+        textos, usuario, libro = self._textos, self.usuario, self.libro
+        if posiciones is None:
+            return ((textos[u], textos[l]) for u, l in zip(usuario, libro))
+        return ((textos[usuario[i]], textos[libro[i]]) for i in posiciones)
+
+    def __repr__(self) -> str:
+        return f"PrestamosColumnar(prestamos={len(self)}, cadenas={len(self._textos)})"
@@ -0,0 +1,317 @@
+"""Servidor HTTP local de reportes (asyncio, solo biblioteca estándar).
+
+Mantiene un Almacen cargado en memoria y entrega los reportes en HTML o JSON sin volver a leer
+los .lfa ni escribir archivos en output/:
+
+    GET  /                          índice con enlaces
+    GET  /<reporte>                 historial, usuarios, libros, estadisticas o vencidos (HTML)
+    GET  /<reporte>.json            lo mismo en JSON (también con ?formato=json)
+         ?pagina=N&por_pagina=M     paginación (por defecto la página 1, de POR_PAGINA filas)
+         ?hoy=YYYY-MM-DD            fecha de referencia para estadísticas y vencidos
+    POST /recargar                  carga incremental de lo agregado a los .lfa
+
+Cada respuesta queda en caché junto con la versión de los datos (Almacen.version): mientras
+no haya una recarga que traiga datos nuevos, las peticiones repetidas se contestan sin
+recalcular nada. La misma caché (LRU, acotada en bytes) guarda las filas completas de los
+reportes que se paginan en memoria. Un error inesperado al armar una respuesta se registra en
+stderr y se contesta con 500, sin cerrar el servidor. La recarga corre en el mismo hilo que atiende las peticiones, así que nunca se lee un almacén a medio
+actualizar (las conexiones que llegan mientras tanto esperan en la cola del socket).
+"""
+import asyncio
+import json
+import sys
+import time
+import traceback
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from html_exporter import pagina_html
+from main import ENCABEZADOS_REPORTES, Almacen
+from utils import hoy, parse_fecha
+
+# Filas por página si la petición no indica otra cosa, y máximo aceptado
+POR_PAGINA = 100
+MAX_POR_PAGINA = 10_000
+# Bytes de caché (respuestas y filas de reportes) como máximo; se descartan las usadas hace más tiempo
+MAX_BYTES_CACHE = 64 << 20  # 64 MiB
+# Costo estimado de cada fila y de cada celda guardadas, además del texto
+_BYTES_POR_FILA = 64
+_BYTES_POR_CELDA = 56
+# Límite para la línea de petición más los encabezados
+MAX_ENCABEZADOS = 16 * 1024
+
+_MOTIVOS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+# (estado HTTP, content-type, cuerpo)
+Respuesta = Tuple[int, str, bytes]
+
+class ErrorHttp(Exception):
+    """Error que se responde al cliente con el estado indicado."""
+
+    def __init__(self, estado: int, mensaje: str) -> None:
+        super().__init__(mensaje)
+        self.estado = estado
+
+def _json(estado: int, datos: Dict) -> Respuesta:
+    return estado, "application/json", json.dumps(datos, ensure_ascii=False).encode("utf-8")
+
+def _html(texto: str) -> Respuesta:
+    return 200, "text/html", texto.encode("utf-8")
+
+class ServidorReportes:
+    """Atiende las peticiones sobre 'store'; 'recargar' hace la carga incremental de los .lfa.
+    'h' fija la fecha de referencia (None = la fecha del día de cada petición).
+    """
+
+    def __init__(
+        self,
+        store: Almacen,
+        recargar: Callable[[], None],
+        h: Optional[date] = None,
+        por_pagina: int = POR_PAGINA,
+        max_bytes_cache: int = MAX_BYTES_CACHE,
+    ) -> None:
+        self.store = store
+        self._recargar = recargar
+        self.h = h
+        self.por_pagina = por_pagina
+        self.max_bytes_cache = max_bytes_cache
+        # LRU: (ruta, parámetros normalizados) -> (versión, respuesta, bytes), y
+        # ("filas", reporte, h) -> (versión, filas completas del reporte, bytes)
+        self._cache: "OrderedDict[Tuple, Tuple[int, object, int]]" = OrderedDict()
+        self.bytes_cache = 0
+        self.peticiones = 0
+        self.aciertos_cache = 0
+
+    # ---------- HTTP ----------
+    async def iniciar(self, host: str, puerto: int) -> asyncio.AbstractServer:
+        # Estadísticas y vencidos calculados antes de aceptar conexiones
+        self.store._preparar_reportes(self.h)
+        return await asyncio.start_server(self._atender, host, puerto, limit=MAX_ENCABEZADOS, backlog=1024)
+
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                cabecera = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return  # el cliente cerró o mandó basura: no hay a quién responder
+            metodo = "GET"
+            try:
+                metodo, destino, largo = self._leer_peticion(cabecera)
+                if largo:
+                    await reader.readexactly(largo)  # ningún endpoint usa el cuerpo
+                estado, tipo, cuerpo = self.responder(metodo, destino)
+            except ErrorHttp as ex:
+                estado, tipo, cuerpo = _json(ex.estado, {"error": str(ex)})
+            except Exception as ex:  # p. ej. sqlite3.Error: se registra y se sigue atendiendo
+                print(f"Error atendiendo {cabecera[:200]!r}:", file=sys.stderr)
+                traceback.print_exc()
+                estado, tipo, cuerpo = _json(500, {"error": f"{type(ex).__name__}: {ex}"})
+            encabezados = (
+                f"HTTP/1.1 {estado} {_MOTIVOS[estado]}\r\n"
+                f"Content-Type: {tipo}; charset=utf-8\r\n"
+                f"Content-Length: {len(cuerpo)}\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            writer.write(encabezados.encode("latin-1"))
+            if metodo != "HEAD":
+                writer.write(cuerpo)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _leer_peticion(cabecera: bytes) -> Tuple[str, str, int]:
+        """(método, destino, content-length) a partir de la línea de petición y los encabezados."""
+        lineas = cabecera.decode("latin-1").split("\r\n")
+        partes = lineas[0].split()
+        if len(partes) != 3:
+            raise ErrorHttp(400, "línea de petición inválida")
+        largo = 0
+        for linea in lineas[1:]:
+            nombre, _, valor = linea.partition(":")
+            if nombre.strip().lower() == "content-length":
+                try:
+                    largo = int(valor.strip() or 0)
+                except ValueError:
+                    raise ErrorHttp(400, "Content-Length inválido")
+        return partes[0].upper(), partes[1], largo
+
+    # ---------- Rutas ----------
+    def responder(self, metodo: str, destino: str) -> Respuesta:
+        """Respuesta a una petición ya leída (sin E/S de red, así se puede usar directamente)."""
+        self.peticiones += 1
+        url = urlsplit(destino)
+        ruta = url.path.rstrip("/") or "/"
+        if ruta == "/recargar":
+            if metodo != "POST":
+                raise ErrorHttp(405, "use POST /recargar")
+            return self._recarga()
+        if metodo not in ("GET", "HEAD"):
+            raise ErrorHttp(405, f"método no soportado: {metodo}")
+
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        formato = params.get("formato", "html")
+        nombre = ruta[1:]
+        if nombre.endswith(".json"):
+            nombre, formato = nombre[:-5], "json"
+        if formato not in ("html", "json"):
+            raise ErrorHttp(400, f"formato inválido: {formato!r} (use html o json)")
+        if ruta != "/" and nombre not in ENCABEZADOS_REPORTES:
+            raise ErrorHttp(404, f"no existe el reporte {nombre!r} (use {', '.join(ENCABEZADOS_REPORTES)})")
+        pagina = self._entero(params, "pagina", 1, 1, None)
+        por_pagina = self._entero(params, "por_pagina", self.por_pagina, 1, MAX_POR_PAGINA)
+        try:
+            h = parse_fecha(params.get("hoy", "")) or self.h or hoy()
+        except ValueError as ex:
+            raise ErrorHttp(400, str(ex))
+
+        llave = (nombre, formato, pagina, por_pagina, h)
+        respuesta = self._de_cache(llave)
+        if respuesta is not None:
+            self.aciertos_cache += 1
+            return respuesta
+        if ruta == "/":
+            respuesta = self._indice(formato)
+        else:
+            respuesta = self._reporte(nombre, formato, pagina, por_pagina, h)
+        self._a_cache(llave, respuesta)
+        return respuesta
+
+    def _de_cache(self, llave: Tuple):
+        """Valor guardado para llave si es de la versión actual de los datos (None si no)."""
+        guardada = self._cache.get(llave)
+        if guardada is None or guardada[0] != self.store.version:
+            return None
+        self._cache.move_to_end(llave)
+        return guardada[1]
+
+    @staticmethod
+    def _tamano(valor) -> int:
+        """Bytes aproximados de una respuesta (su cuerpo) o de una lista de filas."""
+        if isinstance(valor, tuple):
+            return len(valor[2])
+        return sum(_BYTES_POR_FILA + sum(_BYTES_POR_CELDA + len(c) for c in fila) for fila in valor)
+
+    def _a_cache(self, llave: Tuple, valor) -> None:
+        """Guarda valor y descarta las entradas usadas hace más tiempo hasta volver al límite
+        de bytes (un valor que solo ya lo supera no se guarda)."""
+        tam = self._tamano(valor)
+        anterior = self._cache.pop(llave, None)
+        if anterior is not None:
+            self.bytes_cache -= anterior[2]
+        if tam > self.max_bytes_cache:
+            return
+        self._cache[llave] = (self.store.version, valor, tam)
+        self.bytes_cache += tam
+        while self.bytes_cache > self.max_bytes_cache:
+            self.bytes_cache -= self._cache.popitem(last=False)[1][2]
+
+    @staticmethod
+    def _entero(params: Dict[str, str], nombre: str, defecto: int, minimo: int, maximo: Optional[int]) -> int:
+        if nombre not in params:
+            return defecto
+        try:
+            valor = int(params[nombre])
+        except ValueError:
+            raise ErrorHttp(400, f"{nombre} debe ser un entero")
+        if valor < minimo or (maximo is not None and valor > maximo):
+            rango = f"entre {minimo} y {maximo}" if maximo is not None else f">= {minimo}"
+            raise ErrorHttp(400, f"{nombre} debe estar {rango}")
+        return valor
+
+    def _indice(self, formato: str) -> Respuesta:
+        if formato == "json":
+            return _json(200, {"version": self.store.version, "reportes": list(ENCABEZADOS_REPORTES)})
+        filas = [
+            [titulo, f'<a href="/{nombre}">HTML</a>', f'<a href="/{nombre}.json">JSON</a>']
+            for nombre, (titulo, _) in ENCABEZADOS_REPORTES.items()
+        ]
+        nav = f'<p class="small">Versión de los datos: {self.store.version} | POST /recargar para leer lo nuevo</p>'
+        return _html(pagina_html("Biblioteca Digital - Reportes", ["Reporte", "Ver", "Datos"], filas, nav))
+
+    def _pagina(self, nombre: str, inicio: int, cantidad: int, h: date) -> Tuple[List[List[str]], int]:
+        """Filas [inicio, inicio + cantidad) del reporte y su total de filas."""
+        store = self.store
+        if nombre == "historial":
+            # Una fila por préstamo: se corta solo la página pedida, sin recorrer las anteriores
+            return store.pagina_historial(inicio, cantidad), len(store.prestamos)
+        # Usuarios y libros no dependen de la fecha de referencia: una sola entrada para todas
+        llave = ("filas", nombre, h if nombre in ("estadisticas", "vencidos") else None)
+        filas = self._de_cache(llave)
+        if filas is None:
+            filas = list(store.filas_reporte(nombre, h))
+            self._a_cache(llave, filas)
+        return filas[inicio:inicio + cantidad], len(filas)
+
+    def _reporte(self, nombre: str, formato: str, pagina: int, por_pagina: int, h: date) -> Respuesta:
+        titulo, headers = ENCABEZADOS_REPORTES[nombre]
+        filas, total = self._pagina(nombre, (pagina - 1) * por_pagina, por_pagina, h)
+        paginas = max(1, -(-total // por_pagina))
+        if formato == "json":
+            return _json(200, {
+                "reporte": nombre,
+                "titulo": titulo,
+                "version": self.store.version,
+                "hoy": h.isoformat(),
+                "pagina": pagina,
+                "por_pagina": por_pagina,
+                "paginas": paginas,
+                "total": total,
+                "columnas": headers,
+                "filas": filas,
+            })
+
+        def enlace(texto: str, **cambios) -> str:
+            params = {"pagina": pagina, "por_pagina": por_pagina, "hoy": h.isoformat()}
+            params.update(cambios)
+            return f'<a href="/{nombre}?{urlencode(params)}">{texto}</a>'
+        enlaces = []
+        if pagina > 1:
+            enlaces.append(enlace("&laquo; Anterior", pagina=pagina - 1))
+        enlaces.append('<a href="/">Índice</a>')
+        if pagina < paginas:
+            enlaces.append(enlace("Siguiente &raquo;", pagina=pagina + 1))
+        enlaces.append(enlace("JSON", formato="json"))
+        nav = '<p class="small">' + " | ".join(enlaces) + f" | {total} filas</p>"
+        return _html(pagina_html(f"{titulo} (página {pagina} de {paginas})", headers, filas, nav))
+
+    def _recarga(self) -> Respuesta:
+        inicio = time.perf_counter()
+        antes = self.store.version
+        self._recargar()
+        if self.store.version != antes:
+            self._cache.clear()
+            self.bytes_cache = 0
+            self.store._preparar_reportes(self.h)
+        return _json(200, {
+            "version": self.store.version,
+            "usuarios": len(self.store.usuarios),
+            "libros": len(self.store.libros),
+            "prestamos": len(self.store.prestamos),
+            "errores": self.store.errores.total,
+            "segundos": round(time.perf_counter() - inicio, 3),
+        })
+
+def servir(
+    store: Almacen,
+    recargar: Callable[[], None],
+    host: str = "127.0.0.1",
+    puerto: int = 8000,
+    h: Optional[date] = None,
+    por_pagina: int = POR_PAGINA,
+) -> None:
+    """Atiende peticiones hasta Ctrl+C."""
+    async def principal() -> None:
+        servidor = await ServidorReportes(store, recargar, h, por_pagina).iniciar(host, puerto)
+        print(f"Reportes en http://{host}:{puerto}/ (Ctrl+C para terminar)")
+        async with servidor:
+            await servidor.serve_forever()
+    try:
+        asyncio.run(principal())
+    except KeyboardInterrupt:
+        print("Servidor detenido.")
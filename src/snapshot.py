@@ -0,0 +1,113 @@
+"""Snapshot binario de un Almacen ya cargado, para reiniciar sin releer ni revalidar los .lfa.
+
+Formato del archivo:
+    MAGIA (8 bytes) | sha256 (32 bytes) | largo del encabezado (8 bytes, little-endian) | encabezado | estado
+El sha256 es el de todo lo que lo sigue (largo, encabezado y estado) y se verifica antes de
+deserializar nada: un snapshot dañado se descarta sin llegar a pickle.
+El encabezado (pickle) guarda la firma de cada archivo fuente (ruta, tamaño, mtime, sha256);
+el estado es el Almacen serializado con pickle (ver Almacen.__getstate__).
+Al cargar, el archivo se abre con mmap y se verifica y deserializa directo desde el mapeo,
+sin una copia intermedia en memoria.
+"""
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+from typing import Dict, List
+
+MAGIA = b"LFASNAP5"  # 5: incluye el índice de intervalos por libro
+_LARGO = struct.Struct("<Q")
+_TAM_HASH = hashlib.sha256().digest_size
+# Donde empieza lo cubierto por el sha256 (el largo del encabezado)
+_INICIO_DATOS = len(MAGIA) + _TAM_HASH
+TAM_BLOQUE_HASH = 1 << 20
+
+def _sha256(ruta: str) -> str:
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(TAM_BLOQUE_HASH), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+def firma_fuente(ruta: str) -> Dict:
+    """Firma de un archivo fuente: ruta absoluta, tamaño, mtime (ns) y sha256 del contenido."""
+    st = os.stat(ruta)
+    return {
+        "ruta": os.path.abspath(ruta),
+        "tam": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": _sha256(ruta),
+    }
+
+def _fuente_vigente(firma: Dict) -> bool:
+    """Compara una firma guardada con el archivo actual.
+    Tamaño distinto => cambió. Mismo tamaño y mtime => sin cambios (no se recalcula el hash).
+    Mismo tamaño pero otro mtime (p. ej. 'touch' o copia) => decide el sha256.
+    """
+    try:
+        st = os.stat(firma["ruta"])
+    except OSError:
+        return False
+    if st.st_size != firma["tam"]:
+        return False
+    if st.st_mtime_ns == firma["mtime_ns"]:
+        return True
+    return _sha256(firma["ruta"]) == firma["sha256"]
+
+class _EscrituraConHash:
+    """Archivo de solo escritura que va calculando el sha256 de lo escrito (pickle.dump escribe
+    el estado en partes, sin armarlo entero en memoria)."""
+
+    def __init__(self, f) -> None:
+        self._f = f
+        self.hash = hashlib.sha256()
+
+    def write(self, datos) -> int:
+        self.hash.update(datos)
+        return self._f.write(datos)
+
+def guardar_snapshot(almacen, ruta: str, fuentes: List[str]) -> None:
+    """Serializa 'almacen' en 'ruta', asociado a la firma actual de los archivos 'fuentes'."""
+    encabezado = pickle.dumps({"fuentes": [firma_fuente(r) for r in fuentes]}, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp = ruta + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIA)
+        f.write(b"\0" * _TAM_HASH)  # se completa al final
+        datos = _EscrituraConHash(f)
+        datos.write(_LARGO.pack(len(encabezado)))
+        datos.write(encabezado)
+        pickle.dump(almacen, datos, protocol=pickle.HIGHEST_PROTOCOL)
+        f.seek(len(MAGIA))
+        f.write(datos.hash.digest())
+    os.replace(tmp, ruta)  # nunca dejar un snapshot a medio escribir
+
+def cargar_snapshot(ruta: str, fuentes: List[str]):
+    """Devuelve el Almacen guardado en 'ruta' si existe, es válido y corresponde exactamente
+    a los archivos 'fuentes' sin cambios; en cualquier otro caso (también si el snapshot está
+    truncado o dañado) devuelve None.
+    """
+    if not os.path.isfile(ruta) or os.path.getsize(ruta) < _INICIO_DATOS + _LARGO.size:
+        return None
+    with open(ruta, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if mm[:len(MAGIA)] != MAGIA:
+            return None
+        vista = memoryview(mm)
+        try:
+            if hashlib.sha256(vista[_INICIO_DATOS:]).digest() != mm[len(MAGIA):_INICIO_DATOS]:
+                return None
+            inicio = _INICIO_DATOS + _LARGO.size
+            (largo,) = _LARGO.unpack(mm[_INICIO_DATOS:inicio])
+            encabezado = pickle.loads(vista[inicio:inicio + largo])
+            guardadas = encabezado["fuentes"]
+            if [g["ruta"] for g in guardadas] != [os.path.abspath(r) for r in fuentes]:
+                return None
+            if not all(_fuente_vigente(g) for g in guardadas):
+                return None
+            return pickle.loads(vista[inicio + largo:])
+        except Exception:
+            # Con el hash verificado solo queda un snapshot de otra versión del código
+            # (clases o atributos que ya no existen): se trata igual que uno dañado
+            return None
+        finally:
+            vista.release()  # liberar antes de cerrar el mmap
@@ -1,6 +1,9 @@
 class Usuario:
     """Modelo simple para un usuario de la biblioteca."""
 
+    # Sin __dict__ por instancia: menos memoria con catálogos grandes
+    __slots__ = ("id_usuario", "nombre")
+
     def __init__(self, id_usuario: str, nombre: str) -> None:
         # id_usuario: identificador único (mantenerlo como str para no perder ceros a la izquierda)
         self.id_usuario = id_usuario
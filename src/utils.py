@@ -1,23 +1,46 @@
-from datetime import datetime, date
-from typing import Iterable, Dict, Tuple, List
+import re
+from datetime import date
+from functools import lru_cache
+import heapq
+from typing import Iterable, Dict, Tuple, List, Optional
+
+# Mismo patrón que acepta datetime.strptime(s, "%Y-%m-%d"): año de 4 dígitos,
+# mes y día con o sin cero a la izquierda (y día con espacio inicial, como en %d).
+_RE_FECHA_ISO = re.compile(r"(\d{4})-(1[0-2]|0[1-9]|[1-9])-(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])")
+
+# Las fechas de préstamo se repiten mucho (pocos miles de días distintos en millones de líneas)
+TAM_CACHE_FECHAS = 16384
 
 def hoy() -> date:
     """Devuelve la fecha del sistema (hoy). Separado para facilitar pruebas."""
     return date.today()
 
-def es_fecha_valida(fecha_str: str) -> bool:
-    """Valida formato ISO simple YYYY-MM-DD usando datetime.strptime."""
+@lru_cache(maxsize=TAM_CACHE_FECHAS)
+def fecha_iso(fecha_str: str) -> Optional[date]:
+    """Valida y convierte YYYY-MM-DD -> date en un solo paso (con caché acotada).
+    Devuelve None si la cadena no es una fecha válida.
+    """
+    m = _RE_FECHA_ISO.fullmatch(fecha_str)
+    if m is None:
+        return None
     try:
-        datetime.strptime(fecha_str, "%Y-%m-%d")
-        return True
+        return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
     except ValueError:
-        return False
+        # p. ej. 2025-02-30: el patrón es correcto pero el día no existe
+        return None
+
+def es_fecha_valida(fecha_str: str) -> bool:
+    """Valida formato ISO simple YYYY-MM-DD (usa la caché de fecha_iso)."""
+    return fecha_iso(fecha_str) is not None
 
 def parse_fecha(fecha_str: str):
     """Convierte YYYY-MM-DD -> date. Devuelve None si cadena vacía."""
     if not fecha_str:
         return None
-    return datetime.strptime(fecha_str, "%Y-%m-%d").date()
+    f = fecha_iso(fecha_str)
+    if f is None:
+        raise ValueError(f"fecha inválida: {fecha_str!r}")
+    return f
 
 def contar_frecuencias(items: Iterable[str]) -> Dict[str, int]:
     """Cuenta ocurrencias de cada string en un iterable (sin usar collections.Counter)."""
@@ -34,6 +57,13 @@ def max_por_valor(d: Dict[str, int]) -> Tuple[str, int]:
             max_k, max_v = k, v
     return max_k, max_v
 
+def top_n_por_valor(d: Dict[str, int], n: int) -> List[Tuple[str, int]]:
+    """Devuelve los n pares (clave, valor) de mayor valor, de mayor a menor.
+    Los empates se resuelven por orden de inserción, igual que max_por_valor.
+    """
+    mejores = heapq.nsmallest(n, enumerate(d.items()), key=lambda t: (-t[1][1], t[0]))
+    return [kv for _, kv in mejores]
+
 def dedup_preservando_orden(seq: Iterable[str]) -> List[str]:
     """Elimina duplicados preservando el orden de primera aparición."""
     vistos = set()
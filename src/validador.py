@@ -1,8 +1,18 @@
+import re
 from typing import Dict, List, Tuple, Optional
+from errores import (CAMPO_VACIO, CANTIDAD_CAMPOS, CARACTER_INVALIDO, FECHA_DEVOLUCION_INVALIDA,
+                     FECHA_PRESTAMO_INVALIDA, ErrorValidacion)
 from utils import es_fecha_valida
 
 PERMITIDOS_EXTRAS = set("|-_'.,():;/")
 
+# Camino rápido: un único regex compilado que busca cualquier carácter fuera del alfabeto.
+# \w cubre letras, dígitos y '_' y \s los espacios, igual que isalpha/isdigit/isspace,
+# salvo los caracteres solo "numéricos" no ASCII (p. ej. '½'); por eso las líneas no ASCII
+# vuelven a comprobar sus caracteres no ASCII con la regla exacta.
+_RE_CANDIDATO_INVALIDO = re.compile(r"[^\w\s|\-'.,():;/]")
+_RE_NO_ASCII = re.compile(r"[^\x00-\x7f]")
+
 def _es_char_permitido(ch: str) -> bool:
     """Regla de alfabeto permitido a nivel de carácter."""
     if ch.isalpha():
@@ -15,8 +25,24 @@ def _es_char_permitido(ch: str) -> bool:
         return True
     return False
 
+def linea_es_valida(linea: str) -> bool:
+    """Indica si todos los caracteres de la línea pertenecen al alfabeto permitido (camino rápido)."""
+    if _RE_CANDIDATO_INVALIDO.search(linea) is not None:
+        return False
+    if linea.isascii():
+        return True
+    # Solo los caracteres no ASCII (acentos, ñ...) pasan por la regla carácter a carácter
+    for ch in _RE_NO_ASCII.findall(linea):
+        if not _es_char_permitido(ch):
+            return False
+    return True
+
 def escanear_caracteres(linea: str) -> List[Tuple[int, str]]:
     """Recorre la línea y devuelve lista de (posicion, caracter) inválidos (1-indexed)."""
+    # Caso común: línea limpia, se resuelve sin recorrer carácter a carácter en Python
+    if linea_es_valida(linea):
+        return []
+    # Camino lento: solo para líneas con errores, para ubicar cada posición inválida
     errores: List[Tuple[int, str]] = []
     # Recorremos con índice 1..n para reportar posiciones al usuario
     pos = 0
@@ -28,62 +54,60 @@ def escanear_caracteres(linea: str) -> List[Tuple[int, str]]:
 
 def _split_campos(linea: str) -> List[str]:
     """Divide por '|' y elimina espacios en extremos de cada campo."""
-    partes_crudas = linea.split("|")
-    partes_limpias: List[str] = []
-    for p in partes_crudas:
-        partes_limpias.append(p.strip())
-    return partes_limpias
+    return [p.strip() for p in linea.split("|")]
 
 # --------- Validadores de registros por tipo de archivo ---------
+# Devuelven (ok, datos, errores) con errores estructurados (codigo, posicion, valor);
+# el texto de cada error se arma solo al mostrarlo (ver errores.mensaje).
+
+def _errores_de_caracteres(errores_chars: List[Tuple[int, str]]) -> List[ErrorValidacion]:
+    return [(CARACTER_INVALIDO, p, c) for (p, c) in errores_chars]
 
-def validar_usuario(linea: str) -> Tuple[bool, Optional[Dict], List[str]]:
+def validar_usuario(linea: str) -> Tuple[bool, Optional[Dict], List[ErrorValidacion]]:
     """Valida formato: id_usuario|nombre_usuario"""
     errores_chars = escanear_caracteres(linea)
     if errores_chars:
-        # Construir mensajes por cada carácter inválido
-        mensajes = [f"pos {p}: '{c}' inválido" for (p, c) in errores_chars]
-        return False, None, mensajes
+        # Un error por cada carácter inválido
+        return False, None, _errores_de_caracteres(errores_chars)
 
     partes = _split_campos(linea)
     if len(partes) != 2:
-        return False, None, [f"Se esperaban 2 campos (id|nombre), recibidos: {len(partes)}"]
+        return False, None, [(CANTIDAD_CAMPOS, 0, str(len(partes)))]
 
     id_usuario, nombre = partes
     if not id_usuario or not nombre:
-        return False, None, ["id_usuario y nombre no pueden ser vacíos"]
+        return False, None, [(CAMPO_VACIO, 0, "")]
 
     return True, {"id_usuario": id_usuario, "nombre": nombre}, []
 
-def validar_libro(linea: str) -> Tuple[bool, Optional[Dict], List[str]]:
+def validar_libro(linea: str) -> Tuple[bool, Optional[Dict], List[ErrorValidacion]]:
     """Valida formato: id_libro|titulo_libro"""
     errores_chars = escanear_caracteres(linea)
     if errores_chars:
-        mensajes = [f"pos {p}: '{c}' inválido" for (p, c) in errores_chars]
-        return False, None, mensajes
+        return False, None, _errores_de_caracteres(errores_chars)
 
     partes = _split_campos(linea)
     if len(partes) != 2:
-        return False, None, [f"Se esperaban 2 campos (id|titulo), recibidos: {len(partes)}"]
+        return False, None, [(CANTIDAD_CAMPOS, 0, str(len(partes)))]
 
     id_libro, titulo = partes
     if not id_libro or not titulo:
-        return False, None, ["id_libro y titulo no pueden ser vacíos"]
+        return False, None, [(CAMPO_VACIO, 0, "")]
 
     return True, {"id_libro": id_libro, "titulo": titulo}, []
 
-def validar_prestamo(linea: str) -> Tuple[bool, Optional[Dict], List[str]]:
+def validar_prestamo(linea: str) -> Tuple[bool, Optional[Dict], List[ErrorValidacion]]:
     """Valida formatos admitidos (flexible):
        Opción A (recomendada): id_usuario|id_libro|fecha_prestamo|fecha_devolucion(yyyy-mm-dd o vacío)
        Opción B (extendida):   id_usuario|nombre_usuario|id_libro|titulo_libro|fecha_prestamo|fecha_devolucion
     """
     errores_chars = escanear_caracteres(linea)
     if errores_chars:
-        mensajes = [f"pos {p}: '{c}' inválido" for (p, c) in errores_chars]
-        return False, None, mensajes
+        return False, None, _errores_de_caracteres(errores_chars)
 
     partes = _split_campos(linea)
     if len(partes) not in (4, 6):
-        return False, None, [f"Formato no soportado. Use 4 o 6 campos. Recibidos: {len(partes)}"]
+        return False, None, [(CANTIDAD_CAMPOS, 0, str(len(partes)))]
 
     if len(partes) == 4:
         id_usuario, id_libro, f_p, f_d = partes
@@ -94,9 +118,9 @@ def validar_prestamo(linea: str) -> Tuple[bool, Optional[Dict], List[str]]:
 
     # Validar fechas
     if not es_fecha_valida(f_p):
-        return False, None, [f"fecha_prestamo inválida: {f_p!r}"]
+        return False, None, [(FECHA_PRESTAMO_INVALIDA, 0, f_p)]
     if f_d and (not es_fecha_valida(f_d)):
-        return False, None, [f"fecha_devolucion inválida: {f_d!r}"]
+        return False, None, [(FECHA_DEVOLUCION_INVALIDA, 0, f_d)]
 
     return True, {
         "id_usuario": id_usuario,
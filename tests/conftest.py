@@ -0,0 +1,48 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+USUARIOS = ["U001|Ana López", "U002|Carlos Ruiz", "U003|Sofía Hernández", "U004|Ñandú Díaz"]
+LIBROS = ["L001|Autómatas y Lenguajes", "L002|Compiladores", "L003|Redes", "L004|Teoría del Cómputo"]
+
+def _linea_prestamo(rnd: random.Random, i: int) -> str:
+    """Una línea de préstamo: válida (4 o 6 campos), con error, comentario o vacía."""
+    u = f"U00{rnd.randint(1, 5)}"  # U005 no existe en el catálogo
+    l = f"L00{rnd.randint(1, 5)}"
+    fp = f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}"
+    fd = rnd.choice(["", f"2025-{1 + i % 12:02d}-{1 + (i + 3) % 28:02d}"])
+    return rnd.choice([
+        f"{u}|{l}|{fp}|{fd}",
+        f"{u}|{l}|{fp}|{fd}",
+        f"{u}|María Núñez|{l}|Análisis de Datos|{fp}|{fd}",
+        f"{u}|{l}|{fp}|😊",
+        f"{u}|{l}|2025-13-01|",
+        f"{u}|{l}|Extra",
+        "# comentario",
+        "   # comentario con sangría",
+        "",
+        "   ",
+    ])
+
+def generar_prestamos(n: int, semilla: int = 1) -> bytes:
+    """Contenido de un prestamos.lfa con finales de línea mezclados (LF, CRLF y CR suelto)."""
+    rnd = random.Random(semilla)
+    partes = []
+    for i in range(n):
+        partes.append(_linea_prestamo(rnd, i))
+        partes.append(rnd.choice(["\n", "\n", "\n", "\r\n", "\r"]))
+    partes.append("\n")
+    return "".join(partes).encode("utf-8")
+
+@pytest.fixture
+def catalogos(tmp_path):
+    """Rutas (usuarios, libros) de catálogos pequeños."""
+    usuarios = tmp_path / "usuarios.lfa"
+    libros = tmp_path / "libros.lfa"
+    usuarios.write_text("\n".join(USUARIOS) + "\n", encoding="utf-8")
+    libros.write_text("\n".join(LIBROS) + "\n", encoding="utf-8")
+    return str(usuarios), str(libros)
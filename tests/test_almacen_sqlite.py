@@ -0,0 +1,91 @@
+from datetime import date
+
+import pytest
+
+from almacen_sqlite import AlmacenSQLite
+from conftest import generar_prestamos
+from main import Almacen
+
+def _ids_usuarios(store: AlmacenSQLite):
+    return [p.id_usuario for p in store.prestamos]
+
+def test_carga_fallida_no_pierde_lineas(tmp_path):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(b"U1|L1|2025-01-01|2025-01-02\n")
+    store = AlmacenSQLite(str(tmp_path / "b.db"))
+    store.cargar_prestamos(str(ruta), incremental=True)
+    with open(ruta, "ab") as f:
+        f.write(b"U2|L2|2025-01-03|2025-01-04\nU3|L3|2025-01-05|\xff\n")
+    with pytest.raises(UnicodeDecodeError):
+        store.cargar_prestamos(str(ruta), incremental=True)
+    assert _ids_usuarios(store) == ["U1"]
+
+    ruta.write_bytes(ruta.read_bytes().replace(b"\xff", b""))
+    store.cargar_prestamos(str(ruta), incremental=True)
+    assert _ids_usuarios(store) == ["U1", "U2", "U3"]
+    store.cerrar()
+
+    # Lo confirmado es lo mismo que ve una sesión nueva
+    store = AlmacenSQLite(str(tmp_path / "b.db"))
+    store.cargar_prestamos(str(ruta), incremental=True)
+    assert _ids_usuarios(store) == ["U1", "U2", "U3"]
+
+def test_solapamiento_con_prestamos_de_otra_sesion(tmp_path):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(b"U1|L1|2025-01-01|2025-01-10\nU2|L2|2025-01-01|\n")
+    store = AlmacenSQLite(str(tmp_path / "b.db"))
+    store.cargar_prestamos(str(ruta), incremental=True)
+    store.cerrar()
+
+    store = AlmacenSQLite(str(tmp_path / "b.db"))
+    with open(ruta, "ab") as f:
+        f.write(b"U3|L1|2025-01-10|2025-01-12\nU4|L2|2025-03-01|2025-03-02\n")
+    store.cargar_prestamos(str(ruta), incremental=True)
+    solapados = [e for e in store.errores if "ya estaba prestado" in e]
+    assert len(solapados) == 1 and "Línea 4" in solapados[0] and "#2" in solapados[0]
+    assert not store.esta_disponible("L2", date(2025, 6, 1))
+    assert [l.id_libro for l in store.libros_disponibles(date(2025, 1, 11))] == []
+
+def test_reportes_iguales_que_en_memoria(tmp_path, catalogos):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(600))
+    memoria, sqlite = Almacen(), AlmacenSQLite()
+    for store in (memoria, sqlite):
+        store.cargar_usuarios(catalogos[0])
+        store.cargar_libros(catalogos[1])
+        store.cargar_prestamos(str(ruta))
+    h = date(2025, 7, 1)
+    assert list(sqlite.filas_historial()) == list(memoria.filas_historial())
+    assert list(sqlite.filas_usuarios()) == list(memoria.filas_usuarios())
+    assert list(sqlite.filas_libros_prestados()) == list(memoria.filas_libros_prestados())
+    assert list(sqlite.filas_vencidos(h)) == list(memoria.filas_vencidos(h))
+    assert vars(sqlite.estadisticas(h)) == vars(memoria.estadisticas(h))
+    assert sqlite.pagina_historial(100, 50) == memoria.pagina_historial(100, 50)
+    for tipo in ("libros", "usuarios", "pares"):
+        assert sqlite.ranking(tipo, 5) == memoria.ranking(tipo, 5)
+        assert sqlite.ranking(tipo, 5, date(2025, 3, 1), date(2025, 6, 30)) == \
+            memoria.ranking(tipo, 5, date(2025, 3, 1), date(2025, 6, 30))
+    for tipo, id_ in (("usuario", "U002"), ("libro", "L003")):
+        for solo_abiertos in (False, True):
+            assert sqlite.filas_prestamos_de(tipo, id_, solo_abiertos) == memoria.filas_prestamos_de(tipo, id_, solo_abiertos)
+    assert [p.to_row() for p in sqlite.prestamos_vencidos(h)] == [p.to_row() for p in memoria.prestamos_vencidos(h)]
+    for d in (date(2025, 2, 1), h):
+        assert [p.to_row() for p in sqlite.prestamos_activos_en(d)] == [p.to_row() for p in memoria.prestamos_activos_en(d)]
+        assert [l.id_libro for l in sqlite.libros_disponibles(d)] == [l.id_libro for l in memoria.libros_disponibles(d)]
+    assert list(sqlite.errores) == list(memoria.errores)
+
+def test_base_sin_intervalos_se_completa_al_abrir(tmp_path, catalogos):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(600, semilla=4))
+    memoria = Almacen()
+    memoria.cargar_prestamos(str(ruta))
+    store = AlmacenSQLite(str(tmp_path / "b.db"))
+    store.cargar_libros(catalogos[1])
+    store.cargar_prestamos(str(ruta))
+    store._con.execute("DROP TABLE intervalos")  # base creada antes de la tabla de intervalos
+    store._con.commit()
+    store.cerrar()
+
+    store = AlmacenSQLite(str(tmp_path / "b.db"))
+    for d in (date(2025, 1, 15), date(2025, 5, 1), date(2025, 9, 30)):
+        assert [p.to_row() for p in store.prestamos_activos_en(d)] == [p.to_row() for p in memoria.prestamos_activos_en(d)]
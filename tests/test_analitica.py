@@ -0,0 +1,103 @@
+import random
+from bisect import bisect_left
+from datetime import date, timedelta
+
+import pytest
+
+import analitica
+from analitica import LIMITES_RETRASO, TRAMOS_RETRASO
+from conftest import generar_prestamos
+from main import Almacen
+from prestamo import Prestamo
+
+HOY = date(2025, 6, 15)
+
+def _columnas(n: int, semilla: int):
+    """Ordinales de préstamo y devolución (0 = sin devolver; algunas devoluciones anteriores al préstamo)."""
+    rnd = random.Random(semilla)
+    inicio = date(2024, 1, 1).toordinal()
+    fp, fd = [], []
+    for _ in range(n):
+        p = inicio + rnd.randint(0, 500)
+        fp.append(p)
+        fd.append(rnd.choice([0, p + rnd.randint(0, 60), p + rnd.randint(0, 500), p - rnd.randint(1, 5)]))
+    return fp, fd
+
+def _serie(claves):
+    conteo = {}
+    for k in claves:
+        conteo[k] = conteo.get(k, 0) + 1
+    return conteo
+
+def _esperado(fp, fd, hoy: date):
+    """Las mismas series contadas préstamo por préstamo, día por día."""
+    dias = [date.fromordinal(o) for o in range(min(fp), max(fp) + 1)]
+    por_dia = _serie(fp)
+    por_semana = _serie(d - timedelta(days=d.weekday()) for d in (date.fromordinal(p) for p in fp))
+    por_mes = _serie(date.fromordinal(p).strftime("%Y-%m") for p in fp)
+    semanas = sorted({d - timedelta(days=d.weekday()) for d in dias})
+    meses = sorted({d.strftime("%Y-%m") for d in dias})
+    duraciones = [d - p for p, d in zip(fp, fd) if d and d >= p]
+    tramos = _serie(bisect_left(LIMITES_RETRASO, x - Prestamo.PLAZO_DIAS) for x in duraciones)
+    vencidos = []
+    mes = date.fromordinal(min(fp)).replace(day=1)
+    while mes <= hoy:
+        siguiente = (mes + timedelta(days=32)).replace(day=1)
+        corte = min(siguiente - timedelta(days=1), hoy).toordinal()
+        vencidos.append((mes.strftime("%Y-%m"), sum(
+            p + Prestamo.PLAZO_DIAS < corte and (not d or corte < d) for p, d in zip(fp, fd))))
+        mes = siguiente
+    return {
+        "por_dia": [(d, por_dia.get(d.toordinal(), 0)) for d in dias],
+        "por_semana": [(s, por_semana.get(s, 0)) for s in semanas],
+        "por_mes": [(m, por_mes.get(m, 0)) for m in meses],
+        "devueltos": sum(1 for d in fd if d),
+        "duracion_promedio": sum(duraciones) / len(duraciones) if duraciones else None,
+        "retrasos": [(t, tramos.get(i, 0)) for i, t in enumerate(TRAMOS_RETRASO)],
+        "vencidos_por_mes": vencidos,
+    }
+
+def _series(a: analitica.Analitica):
+    return {
+        "por_dia": a.por_dia,
+        "por_semana": a.por_semana,
+        "por_mes": a.por_mes,
+        "devueltos": a.devueltos,
+        "duracion_promedio": a.duracion_promedio,
+        "retrasos": a.retrasos,
+        "vencidos_por_mes": a.vencidos_por_mes,
+    }
+
+@pytest.fixture
+def sin_numpy(monkeypatch):
+    monkeypatch.setattr(analitica, "np", None)
+
+@pytest.mark.parametrize("semilla", [1, 2])
+def test_python_igual_que_contar_cada_prestamo(sin_numpy, semilla):
+    fp, fd = _columnas(800, semilla)
+    a = analitica.calcular(fp, fd, HOY)
+    assert a.total == len(fp)
+    assert _series(a) == _esperado(fp, fd, HOY)
+
+@pytest.mark.parametrize("semilla", [1, 2, 3])
+def test_numpy_igual_que_python(monkeypatch, semilla):
+    np = pytest.importorskip("numpy")
+    fp, fd = _columnas(2000, semilla)
+    monkeypatch.setattr(analitica, "np", np)
+    vectorizada = _series(analitica.calcular(fp, fd, HOY))
+    monkeypatch.setattr(analitica, "np", None)
+    assert vectorizada == _series(analitica.calcular(fp, fd, HOY))
+
+def test_sin_prestamos(sin_numpy):
+    a = analitica.calcular([], [], HOY)
+    assert a.total == 0 and a.por_dia == [] and a.duracion_promedio is None
+
+def test_columnar_igual_que_lista(tmp_path):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(500))
+    resultados = []
+    for columnar in (False, True):
+        store = Almacen(columnar=columnar)
+        store.cargar_prestamos(str(ruta))
+        resultados.append(_series(store.analitica(HOY)))
+    assert resultados[0] == resultados[1]
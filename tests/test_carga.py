@@ -0,0 +1,125 @@
+import random
+from concurrent.futures import Future
+
+import pytest
+
+import carga
+from conftest import generar_prestamos
+from main import Almacen
+
+def _resultado(store: Almacen):
+    filas = [(p.id_usuario, p.id_libro, p.fecha_prestamo, p.fecha_devolucion, p.nombre_usuario, p.titulo_libro)
+             for p in store.prestamos]
+    return filas, list(store.errores)
+
+def _cargar(catalogos, ruta: str, **kwargs) -> Almacen:
+    store = Almacen()
+    store.cargar_usuarios(catalogos[0])
+    store.cargar_libros(catalogos[1])
+    store.cargar_prestamos(ruta, **kwargs)
+    return store
+
+@pytest.fixture
+def bloques_chicos(monkeypatch):
+    # Varios bloques aun con archivos de pocos KiB
+    monkeypatch.setattr(carga, "TAM_MIN_BLOQUE", 256)
+
+def test_paralelo_igual_que_serie(tmp_path, catalogos, bloques_chicos):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(2000))
+    assert len(carga.dividir_en_bloques(str(ruta), 8)) > 1
+    esperado = _resultado(_cargar(catalogos, str(ruta)))
+    assert _resultado(_cargar(catalogos, str(ruta), workers=3)) == esperado
+
+def test_bloques_acotados_por_tamano_maximo(tmp_path, monkeypatch):
+    monkeypatch.setattr(carga, "TAM_MIN_BLOQUE", 256)
+    monkeypatch.setattr(carga, "TAM_MAX_BLOQUE", 4096)
+    contenido = generar_prestamos(2000)
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(contenido)
+    bloques = carga.dividir_en_bloques(str(ruta), 2)
+    largo_linea = max(len(l) for l in contenido.split(b"\n")) + 1
+    assert len(bloques) >= len(contenido) // 4096
+    assert all(fin - inicio <= 4096 + largo_linea for inicio, fin in bloques)
+    assert bloques[0][0] == 0 and bloques[-1][1] == len(contenido)
+    assert all(a[1] == b[0] for a, b in zip(bloques, bloques[1:]))
+
+class _PoolContado:
+    """Ejecuta cada bloque al enviarlo y registra cuántos quedaron sin entregar."""
+
+    def __init__(self) -> None:
+        self.sin_entregar = 0
+        self.maximo = 0
+
+    def submit(self, funcion, *args):
+        self.sin_entregar += 1
+        self.maximo = max(self.maximo, self.sin_entregar)
+        futuro = Future()
+        futuro.set_result(args[1:])
+        return futuro
+
+def test_bloques_en_vuelo_acotados():
+    pool = _PoolContado()
+    bloques = [(i, i + 1) for i in range(20)]
+    entregados = []
+    for resultado in carga._procesar_en_orden(pool, "x", bloques, 3):
+        pool.sin_entregar -= 1
+        entregados.append(resultado)
+    assert entregados == bloques
+    assert pool.maximo == 3
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("semilla", [1, 2, 3])
+def test_incremental_por_pedazos_igual_que_carga_unica(tmp_path, catalogos, bloques_chicos, workers, semilla):
+    contenido = generar_prestamos(1500, semilla)
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(contenido)
+    esperado = _resultado(_cargar(catalogos, str(ruta)))
+
+    # El primer pedazo termina en un salto de línea; los demás cortan en cualquier byte
+    # (a mitad de línea, entre '\r' y '\n' o dentro de un carácter UTF-8)
+    rnd = random.Random(semilla)
+    cortes = sorted(rnd.sample(range(1, len(contenido)), 40))
+    cortes = [contenido.index(b"\n") + 1] + [c for c in cortes if c > contenido.index(b"\n") + 1] + [len(contenido)]
+    ruta.write_bytes(b"")
+    store = _cargar(catalogos, str(ruta), workers=workers, incremental=True)
+    previo = 0
+    for corte in cortes:
+        with open(ruta, "ab") as f:
+            f.write(contenido[previo:corte])
+        previo = corte
+        store.cargar_prestamos(str(ruta), workers=workers, incremental=True)
+    assert _resultado(store) == esperado
+
+    # Recargar sin cambios no duplica nada
+    store.cargar_prestamos(str(ruta), workers=workers, incremental=True)
+    assert _resultado(store) == esperado
+
+def test_incremental_archivo_truncado(tmp_path, catalogos):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(50))
+    store = _cargar(catalogos, str(ruta), incremental=True)
+    ruta.write_bytes(b"U001|L001|2025-01-01|\n")
+    with pytest.raises(ValueError):
+        store.cargar_prestamos(str(ruta), incremental=True)
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_primera_carga_incremental_incluye_ultima_linea_sin_salto(tmp_path, catalogos, bloques_chicos, workers):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(400) + b"U001|L002|2025-09-01|")
+    esperado = _resultado(_cargar(catalogos, str(ruta)))
+    store = _cargar(catalogos, str(ruta), workers=workers, incremental=True)
+    assert _resultado(store) == esperado
+    assert store.prestamos[-1].fecha_prestamo.isoformat() == "2025-09-01"
+
+    # En las recargas, una línea sin salto final sigue esperando a que se complete
+    with open(ruta, "ab") as f:
+        f.write(b"\nU002|L003|2025-09-02|")
+    store.cargar_prestamos(str(ruta), workers=workers, incremental=True)
+    assert len(store.prestamos) == len(esperado[0])
+    with open(ruta, "ab") as f:
+        f.write(b"\nU001|L001|Extra\n")
+    store.cargar_prestamos(str(ruta), workers=workers, incremental=True)
+    assert store.prestamos[-1].fecha_prestamo.isoformat() == "2025-09-02"
+    # Mismos números de línea que una carga única del archivo final
+    assert _resultado(store) == _resultado(_cargar(catalogos, str(ruta)))
@@ -0,0 +1,47 @@
+import pytest
+
+import cli
+from conftest import generar_prestamos
+
+def _args(catalogos, prestamos, *extra):
+    return ["--usuarios", catalogos[0], "--libros", catalogos[1], "--prestamos", str(prestamos), *extra]
+
+@pytest.fixture
+def prestamos_limpios(tmp_path):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_text("U001|L001|2025-01-01|2025-01-05\nU002|L002|2025-02-01|\n", encoding="utf-8")
+    return ruta
+
+@pytest.fixture
+def prestamos_con_errores(tmp_path):
+    ruta = tmp_path / "prestamos_errores.lfa"
+    ruta.write_bytes(generar_prestamos(200))
+    return ruta
+
+def test_load_correcto(catalogos, prestamos_limpios, capsys):
+    assert cli.main(["load", *_args(catalogos, prestamos_limpios, "--estricto")]) == cli.SALIDA_OK
+    salida = capsys.readouterr().out
+    assert "Usuarios: 4" in salida and "Préstamos: 2" in salida and "Errores: 0" in salida
+
+def test_estricto_con_errores_de_validacion(catalogos, prestamos_con_errores, capsys):
+    assert cli.main(["load", *_args(catalogos, prestamos_con_errores)]) == cli.SALIDA_OK
+    capsys.readouterr()
+    assert cli.main(["stats", *_args(catalogos, prestamos_con_errores, "--estricto")]) == cli.SALIDA_VALIDACION
+    assert "errores de validación" in capsys.readouterr().err
+
+def test_archivo_inexistente(tmp_path, catalogos, capsys):
+    assert cli.main(["load", *_args(catalogos, tmp_path / "no_existe.lfa")]) == cli.SALIDA_ERROR
+    assert capsys.readouterr().err.startswith("Error: ")
+
+@pytest.mark.parametrize("argv", [[], ["borrar"], ["report"], ["report", "nada"], ["stats", "--hoy", "2025-02-30"]])
+def test_uso_incorrecto(argv, capsys):
+    with pytest.raises(SystemExit) as ex:
+        cli.main(argv)
+    assert ex.value.code == 2
+
+def test_timings_en_stderr(catalogos, prestamos_limpios, capsys):
+    assert cli.main(["report", "vencidos", *_args(catalogos, prestamos_limpios, "--timings", "--hoy", "2025-06-01")]) == 0
+    salida = capsys.readouterr()
+    assert "TIEMPOS" not in salida.out
+    for fase in ("cargar_usuarios", "cargar_libros", "cargar_prestamos", "report vencidos", "total"):
+        assert fase in salida.err
@@ -0,0 +1,80 @@
+import csv
+import gzip
+import io
+import json
+import os
+from datetime import date
+
+import pytest
+
+from almacen_sqlite import AlmacenSQLite
+from conftest import generar_prestamos
+from datos_exporter import clave_columna, exportar_csv, exportar_jsonl
+from main import ENCABEZADOS_REPORTES, Almacen
+
+HEADERS = ["ID Usuario", "Fecha Préstamo", "Tasa % anual"]
+FILAS = [
+    ["U001", "2025-01-01", "3%"],
+    ["coma, y \"comillas\"", "línea\nnueva\r\ncon CRLF", "barra \\ y tab\t"],
+    ["Ñandú 😊", "", "control \x01 \x1f"],
+]
+
+def _abrir(ruta: str):
+    if ruta.endswith(".gz"):
+        return gzip.open(ruta, "rt", encoding="utf-8", newline="")
+    return open(ruta, encoding="utf-8", newline="")
+
+def _leer(ruta: str):
+    """(columnas, filas) de un .csv o .jsonl, comprimido o no."""
+    with _abrir(ruta) as f:
+        texto = f.read()
+    if ".csv" in ruta:
+        filas = list(csv.reader(io.StringIO(texto, newline="")))
+        return filas[0], filas[1:]
+    objetos = [json.loads(linea) for linea in texto.split("\n")[:-1]]
+    assert texto.endswith("\n") or not objetos
+    columnas = list(objetos[0]) if objetos else []
+    return columnas, [list(o.values()) for o in objetos]
+
+def test_clave_columna():
+    assert [clave_columna(h) for h in HEADERS] == ["id_usuario", "fecha_prestamo", "tasa_%_anual"]
+
+@pytest.mark.parametrize("comprimir", [False, True])
+@pytest.mark.parametrize("exportar, extension", [(exportar_csv, ".csv"), (exportar_jsonl, ".jsonl")])
+@pytest.mark.parametrize("n", [0, 3, 2500])
+def test_ida_y_vuelta(tmp_path, exportar, extension, comprimir, n):
+    filas = [FILAS[i % len(FILAS)] for i in range(n)]
+    destino = str(tmp_path / ("datos" + extension + (".gz" if comprimir else "")))
+    exportar(HEADERS, iter(filas), destino, comprimir)
+    columnas, leidas = _leer(destino)
+    if n:
+        assert columnas == [clave_columna(h) for h in HEADERS]
+    assert leidas == filas
+    if comprimir:
+        with open(destino, "rb") as f:
+            assert f.read(2) == b"\x1f\x8b"
+
+@pytest.mark.parametrize("motor", ["memoria", "sqlite"])
+@pytest.mark.parametrize("formato", ["csv", "jsonl"])
+@pytest.mark.parametrize("comprimir", [False, True])
+def test_reportes_iguales_que_sus_filas(tmp_path, catalogos, motor, formato, comprimir):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(400))
+    store = Almacen() if motor == "memoria" else AlmacenSQLite()
+    store.cargar_usuarios(catalogos[0])
+    store.cargar_libros(catalogos[1])
+    store.cargar_prestamos(str(ruta))
+    h = date(2025, 7, 1)
+    carpeta = tmp_path / "salida"
+    carpeta.mkdir()
+    store.exportar_reportes(formato, comprimir, h=h, carpeta=str(carpeta))
+    extension = "." + formato + (".gz" if comprimir else "")
+    for nombre, (_, headers) in ENCABEZADOS_REPORTES.items():
+        archivo = ("historial_prestamos" if nombre == "historial" else nombre) + extension
+        columnas, filas = _leer(str(carpeta / archivo))
+        esperado = list(store.filas_reporte(nombre, h))
+        assert filas == esperado, nombre
+        if esperado:
+            assert columnas == [clave_columna(c) for c in headers]
+    analitica = sorted(a for a in os.listdir(carpeta) if a.startswith("analitica_"))
+    assert analitica and all(a.endswith(extension) for a in analitica)
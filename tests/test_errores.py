@@ -0,0 +1,19 @@
+from errores import CAMPO_VACIO, CARACTER_INVALIDO, ColeccionErrores
+
+def test_limite_guarda_registros_y_cuenta_todos():
+    errores = ColeccionErrores(limite=3)
+    for linea in range(1, 6):
+        errores.agregar("usuarios", linea, CARACTER_INVALIDO, 4, "$")
+    errores.agregar("usuarios", 6, CAMPO_VACIO)
+    assert len(errores) == len(list(errores)) == 3
+    assert errores.total == 6
+    assert errores.descartados == 3
+    assert errores.resumen() == {"usuarios": {CARACTER_INVALIDO: 5, CAMPO_VACIO: 1}}
+    assert errores[-1] == "[usuarios] Línea 3: pos 4: '$' inválido"
+
+def test_sin_limite():
+    errores = ColeccionErrores(limite=None)
+    for linea in range(1, 101):
+        errores.agregar("libros", linea, CAMPO_VACIO)
+    assert len(errores) == errores.total == 100
+    assert errores.descartados == 0
@@ -0,0 +1,82 @@
+from datetime import date
+
+import pytest
+
+from conftest import generar_prestamos
+from main import Almacen
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_estadisticas_igual_que_recorrer_prestamos(tmp_path, catalogos, columnar):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(800))
+    store = Almacen(columnar=columnar)
+    store.cargar_usuarios(catalogos[0])
+    store.cargar_libros(catalogos[1])
+    store.cargar_prestamos(str(ruta))
+    h = date(2025, 6, 15)
+    est = store.estadisticas(h)
+    prestamos = list(store.prestamos)
+    frec_libros = {}
+    frec_usuarios = {}
+    for p in prestamos:
+        frec_libros[p.id_libro] = frec_libros.get(p.id_libro, 0) + 1
+        frec_usuarios[p.id_usuario] = frec_usuarios.get(p.id_usuario, 0) + 1
+    assert est.total == len(prestamos)
+    assert est.frec_libros == frec_libros and list(est.frec_libros) == list(frec_libros)
+    assert est.frec_usuarios == frec_usuarios
+    assert est.vencidos == sum(p.esta_vencido(h) for p in prestamos)
+    assert store.estadisticas(h) is est  # sin cambios en los datos se reutiliza
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_reportes_al_dia_despues_de_cada_carga(tmp_path, catalogos, columnar):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(600, semilla=3))
+    store = Almacen(columnar=columnar)
+    store.cargar_prestamos(str(ruta))  # préstamos antes que los catálogos
+    h = date(2025, 6, 15)
+    assert list(store.filas_vencidos(h))  # se calculan (y guardan) sin catálogos
+    store.cargar_usuarios(catalogos[0])
+    store.cargar_libros(catalogos[1])
+    prestamos = list(store.prestamos)
+    vencidos = [[p.id_usuario, store._nombre_usuario(p.id_usuario) or p.nombre_usuario,
+                 p.id_libro, store._titulo_libro(p.id_libro) or p.titulo_libro, p.fecha_prestamo.isoformat()]
+                for p in prestamos if p.esta_vencido(h)]
+    assert list(store.filas_vencidos(h)) == vencidos
+    libros = {}
+    for p in prestamos:
+        if not libros.get(p.id_libro):  # título del catálogo o del primer préstamo que lo trae
+            libros[p.id_libro] = store._titulo_libro(p.id_libro) or p.titulo_libro
+    assert list(store.filas_libros_prestados()) == [list(kv) for kv in libros.items()]
+    assert list(store.filas_historial()) == [p.to_row(store._nombre_usuario(p.id_usuario), store._titulo_libro(p.id_libro))
+                                             for p in prestamos]
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_ranking_por_rango_igual_que_contar(tmp_path, catalogos, columnar):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(800, semilla=5))
+    store = Almacen(columnar=columnar)
+    store.cargar_prestamos(str(ruta))
+    desde, hasta = date(2025, 3, 1), date(2025, 8, 31)
+    conteo = {}
+    for p in store.prestamos:
+        if desde <= p.fecha_prestamo <= hasta:
+            conteo[(p.id_usuario, p.id_libro)] = conteo.get((p.id_usuario, p.id_libro), 0) + 1
+    esperado = sorted(conteo.items(), key=lambda kv: -kv[1])[:5]  # sorted es estable: empates por aparición
+    assert store.ranking("pares", 5, desde, hasta) == esperado
+    assert store.ranking("libros", 3) == sorted(store.estadisticas().frec_libros.items(), key=lambda kv: -kv[1])[:3]
+
+def test_pares_sin_rango_se_cuentan_al_cargar(tmp_path):
+    ruta = tmp_path / "prestamos.lfa"
+    datos = generar_prestamos(600, semilla=9)
+    corte = datos.index(b"\n", len(datos) // 2) + 1
+    ruta.write_bytes(datos[:corte])
+    store = Almacen()
+    store.cargar_prestamos(str(ruta), incremental=True)
+    with open(ruta, "ab") as f:
+        f.write(datos[corte:])
+    store.cargar_prestamos(str(ruta), incremental=True)
+    conteo = {}
+    for p in store.prestamos:
+        conteo[(p.id_usuario, p.id_libro)] = conteo.get((p.id_usuario, p.id_libro), 0) + 1
+    assert store._contadores.frec_pares == conteo and list(store._contadores.frec_pares) == list(conteo)
+    assert store.ranking("pares", 5) == sorted(conteo.items(), key=lambda kv: -kv[1])[:5]
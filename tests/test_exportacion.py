@@ -0,0 +1,34 @@
+import inspect
+
+from conftest import generar_prestamos
+from main import Almacen
+
+def _almacen(tmp_path, catalogos, columnar: bool = False) -> Almacen:
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(300))
+    store = Almacen(columnar=columnar)
+    store.cargar_usuarios(catalogos[0])
+    store.cargar_libros(catalogos[1])
+    store.cargar_prestamos(str(ruta))
+    return store
+
+def test_historial_se_resuelve_al_recorrerlo(tmp_path, catalogos):
+    store = _almacen(tmp_path, catalogos, columnar=True)
+    filas = store.filas_historial()
+    assert inspect.isgenerator(filas)
+    assert list(filas) == [p.to_row(store._nombre_usuario(p.id_usuario), store._titulo_libro(p.id_libro))
+                           for p in store.prestamos]
+
+    # Un cambio de catálogo se ve en el siguiente recorrido (no hay filas guardadas)
+    nuevo = tmp_path / "usuarios2.lfa"
+    nuevo.write_text("U002|Carla Ruiz\n", encoding="utf-8")
+    store.cargar_usuarios(str(nuevo))
+    nombres = {fila[1] for fila in store.filas_historial() if fila[0] == "U002"}
+    assert "Carlos Ruiz" not in nombres
+
+def test_exportar_no_guarda_filas(tmp_path, catalogos):
+    store = _almacen(tmp_path, catalogos, columnar=True)
+    store.exportar_reportes_html(carpeta=str(tmp_path))
+    guardadas = [v for v in vars(store).values() if isinstance(v, list) and v and isinstance(v[0], list)]
+    assert guardadas == []
+    assert store.pagina_historial(10, 5) == list(store.filas_historial())[10:15]
@@ -0,0 +1,82 @@
+import os
+import re
+
+import pytest
+
+import html_exporter
+import main
+from conftest import generar_prestamos
+from html_exporter import _plantilla_base, exportar_paginado, exportar_stream, ruta_pagina, tabla
+from main import Almacen
+
+HEADERS = ["ID", "Nombre", "Fecha"]
+
+def _filas(n: int):
+    return [[f"U{i:04d}", f"Nombre {i} ñ", None if i % 7 == 0 else f"2025-01-{1 + i % 28:02d}"] for i in range(n)]
+
+def _filas_de_tabla(texto: str):
+    return re.findall(r"<tr><td>(.*?)</td><td>(.*?)</td><td>(.*?)</td></tr>", texto)
+
+@pytest.mark.parametrize("n", [0, 1, 999, 1000, 2501])
+@pytest.mark.parametrize("filas_por_bloque", [1, 7, 1000])
+def test_stream_igual_que_plantilla(tmp_path, n, filas_por_bloque):
+    destino = tmp_path / "tabla.html"
+    exportar_stream("Título", HEADERS, (f for f in _filas(n)), str(destino), filas_por_bloque)
+    assert destino.read_text(encoding="utf-8") == _plantilla_base("Título", tabla(HEADERS, _filas(n)))
+
+@pytest.mark.parametrize("n, por_pagina", [(0, 10), (1, 10), (100, 10), (101, 10), (57, 1)])
+def test_paginas_con_todas_las_filas(tmp_path, n, por_pagina):
+    destino = str(tmp_path / "historial.html")
+    paginas = exportar_paginado("Historial", HEADERS, iter(_filas(n)), destino, por_pagina)
+    assert paginas == max(1, -(-n // por_pagina))
+    leidas = []
+    for numero in range(1, paginas + 1):
+        texto = open(ruta_pagina(destino, numero), encoding="utf-8").read()
+        filas = _filas_de_tabla(texto)
+        assert len(filas) <= por_pagina
+        leidas.extend(filas)
+        assert ("Anterior" in texto) == (numero > 1)
+        assert ("Siguiente" in texto) == (numero < paginas)
+    esperado = [(a, b, c or "") for a, b, c in _filas(n)]
+    assert leidas == esperado
+    indice = open(destino, encoding="utf-8").read()
+    assert indice.count('<a href="historial_') == paginas
+
+def test_paginas_sobrantes_se_borran(tmp_path):
+    destino = str(tmp_path / "historial.html")
+    assert exportar_paginado("Historial", HEADERS, _filas(50), destino, 5) == 10
+    assert exportar_paginado("Historial", HEADERS, _filas(12), destino, 5) == 3
+    assert sorted(os.listdir(tmp_path)) == ["historial.html"] + [f"historial_{i:04d}.html" for i in (1, 2, 3)]
+    with pytest.raises(ValueError):
+        exportar_paginado("Historial", HEADERS, _filas(1), destino, 0)
+
+def test_escritura_interrumpida_no_toca_el_destino(tmp_path):
+    destino = tmp_path / "tabla.html"
+    exportar_stream("Antes", HEADERS, _filas(3), str(destino))
+    antes = destino.read_bytes()
+
+    def filas_con_error():
+        yield from _filas(html_exporter.FILAS_POR_BLOQUE * 2)
+        raise RuntimeError("falla a mitad de la exportación")
+    with pytest.raises(RuntimeError):
+        exportar_stream("Después", HEADERS, filas_con_error(), str(destino))
+    assert destino.read_bytes() == antes
+    assert os.listdir(tmp_path) == ["tabla.html"]  # sin temporales
+
+@pytest.mark.parametrize("filas_por_pagina", [None, 40])
+def test_concurrente_igual_que_en_serie(tmp_path, monkeypatch, catalogos, filas_por_pagina):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(300))
+    store = Almacen()
+    store.cargar_usuarios(catalogos[0])
+    store.cargar_libros(catalogos[1])
+    store.cargar_prestamos(str(ruta))
+    salidas = {}
+    for concurrente in (False, True):
+        carpeta = tmp_path / f"salida_{concurrente}"
+        carpeta.mkdir()
+        monkeypatch.setattr(main, "OUT_DIR", str(carpeta))
+        store.exportar_reportes_html(filas_por_pagina, concurrente)
+        salidas[concurrente] = {nombre: (carpeta / nombre).read_bytes() for nombre in os.listdir(carpeta)}
+    assert salidas[True] == salidas[False]
+    assert "historial_prestamos.html" in salidas[True]
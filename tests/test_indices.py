@@ -0,0 +1,50 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from conftest import generar_prestamos
+from indices import IndiceVencimientos
+from main import Almacen
+
+def test_vencidos_igual_que_recorrer_limites():
+    rnd = random.Random(4)
+    limites = [rnd.randint(100, 200) for _ in range(500)]  # fuera de orden
+    indice = IndiceVencimientos()
+    for pos, limite in enumerate(limites):
+        indice.agregar(pos, limite)
+    for h in range(95, 206):
+        esperado = [pos for pos, limite in enumerate(limites) if h > limite]
+        assert indice.vencidos(date.fromordinal(h)) == esperado
+        assert indice.cantidad_vencidos(date.fromordinal(h)) == len(esperado)
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_prestamos_vencidos_a_cualquier_fecha(tmp_path, catalogos, columnar):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(600, semilla=2))
+    store = Almacen(columnar=columnar)
+    store.cargar_prestamos(str(ruta))
+    prestamos = list(store.prestamos)
+    for h in (date(2025, 1, 1) + timedelta(days=d) for d in range(0, 420, 7)):
+        vencidos = [p.to_row() for p in prestamos if p.esta_vencido(h)]
+        assert [p.to_row() for p in store.prestamos_vencidos(h)] == vencidos
+        assert store.estadisticas(h).vencidos == len(vencidos)
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_prestamos_de_usuario_y_libro(tmp_path, catalogos, columnar):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(500, semilla=3))
+    store = Almacen(columnar=columnar)
+    store.cargar_usuarios(catalogos[0])
+    store.cargar_libros(catalogos[1])
+    store.cargar_prestamos(str(ruta))
+    prestamos = list(store.prestamos)
+    for tipo, campo, id_ in (("usuario", "id_usuario", "U002"), ("libro", "id_libro", "L005")):
+        for solo_abiertos in (False, True):
+            esperado = sorted(
+                (i for i, p in enumerate(prestamos)
+                 if getattr(p, campo) == id_ and not (solo_abiertos and p.fecha_devolucion)),
+                key=lambda i: prestamos[i].fecha_prestamo)
+            filas = store.filas_prestamos_de(tipo, id_, solo_abiertos)
+            assert filas == [store._fila_historial(prestamos[i]) for i in esperado]
+    assert store.prestamos_de_usuario("U999") == []
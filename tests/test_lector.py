@@ -0,0 +1,28 @@
+import pytest
+
+import lector
+from carga import _es_ignorable
+from conftest import generar_prestamos
+
+def _no_ignorables(lineas):
+    return [(num, linea) for num, linea in lineas if not _es_ignorable(linea)]
+
+@pytest.mark.parametrize("bloque", [1, 3, 7, 64, 1 << 20])
+def test_mmap_igual_que_texto(tmp_path, monkeypatch, bloque):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(500) + "sin salto final\r".encode("utf-8"))
+    monkeypatch.setattr(lector, "TAM_BLOQUE_MMAP", bloque)
+    esperado = _no_ignorables(lector.iter_lineas(str(ruta)))
+    assert _no_ignorables(lector.iter_lineas_mmap(str(ruta))) == esperado
+
+def test_mmap_archivo_vacio(tmp_path):
+    ruta = tmp_path / "vacio.lfa"
+    ruta.write_bytes(b"")
+    assert list(lector.iter_lineas_mmap(str(ruta))) == []
+
+def test_lineas_nuevas_igual_que_texto(tmp_path):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(300))
+    progreso = lector.Progreso()
+    assert list(lector.iter_lineas_nuevas(str(ruta), progreso)) == list(lector.iter_lineas(str(ruta)))
+    assert progreso.offset == ruta.stat().st_size
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+import carga
+import cli
+import main
+from conftest import generar_prestamos
+from main import Almacen
+
+def _verificar_fase(fase, cantidad_registros: int) -> None:
+    c = fase["contadores"]
+    assert c["lineas_leidas"] == c.get("lineas_ignoradas", 0) + c["lineas_validadas"]
+    assert c["lineas_validadas"] == c.get("lineas_rechazadas", 0) + c["registros_creados"]
+    assert c.get("lineas_rechazadas", 0) == sum(v for k, v in c.items() if k.startswith("rechazo."))
+    assert c["registros_creados"] == cantidad_registros
+    assert all(t >= 0 for t in fase["tiempos_s"].values())
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_contadores_cuadran_con_lo_cargado(tmp_path, monkeypatch, catalogos, workers):
+    monkeypatch.setattr(carga, "TAM_MIN_BLOQUE", 256)
+    monkeypatch.setattr(main, "OUT_DIR", str(tmp_path))
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(600))
+    store = Almacen(metricas=True)
+    store.cargar_usuarios(catalogos[0])
+    store.cargar_libros(catalogos[1])
+    store.cargar_prestamos(str(ruta), workers=workers)
+    store.exportar_reportes_html()
+    datos = json.loads(json.dumps(store.metricas()))  # apto para JSON tal cual
+    _verificar_fase(datos["usuarios"], len(store.usuarios))
+    _verificar_fase(datos["libros"], len(store.libros))
+    _verificar_fase(datos["prestamos"], len(store.prestamos))
+    exportacion = datos["exportacion"]
+    assert exportacion["contadores"]["exportaciones"] == 1
+    assert exportacion["contadores"]["filas.historial_prestamos.html"] == len(store.prestamos)
+    assert "historial_prestamos.html" in exportacion["tiempos_s"]
+
+def test_sin_metricas(catalogos):
+    store = Almacen()
+    store.cargar_usuarios(catalogos[0])
+    assert store.metricas() == {}
+
+def test_cli_guarda_metricas_en_json(tmp_path, catalogos):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(100))
+    destino = tmp_path / "metricas.json"
+    argv = ["load", "--usuarios", catalogos[0], "--libros", catalogos[1], "--prestamos", str(ruta),
+            "--metricas", str(destino)]
+    assert cli.main(argv) == cli.SALIDA_OK
+    datos = json.loads(destino.read_text(encoding="utf-8"))
+    assert set(datos) == {"usuarios", "libros", "prestamos"}
+    assert datos["prestamos"]["contadores"]["cargas"] == 1
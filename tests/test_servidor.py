@@ -0,0 +1,83 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+from almacen_sqlite import AlmacenSQLite
+from conftest import generar_prestamos
+from main import Almacen
+from servidor import ServidorReportes
+
+def _servidor(tmp_path, catalogos, store: Almacen, max_bytes_cache: int = 1 << 20) -> ServidorReportes:
+    ruta = tmp_path / "prestamos.lfa"
+    if not ruta.exists():
+        ruta.write_bytes(generar_prestamos(600))
+
+    def recargar() -> None:
+        store.cargar_usuarios(catalogos[0], incremental=True)
+        store.cargar_libros(catalogos[1], incremental=True)
+        store.cargar_prestamos(str(ruta), incremental=True)
+    recargar()
+    return ServidorReportes(store, recargar, max_bytes_cache=max_bytes_cache)
+
+def _json(servidor: ServidorReportes, destino: str, metodo: str = "GET"):
+    estado, _, cuerpo = servidor.responder(metodo, destino)
+    assert estado == 200
+    return json.loads(cuerpo)
+
+@pytest.mark.parametrize("motor", ["memoria", "sqlite"])
+def test_paginas_del_historial(tmp_path, catalogos, motor):
+    store = Almacen() if motor == "memoria" else AlmacenSQLite(str(tmp_path / "b.db"))
+    servidor = _servidor(tmp_path, catalogos, store)
+    historial = list(store.filas_historial())
+    paginas = []
+    for pagina in range(1, 8):
+        datos = _json(servidor, f"/historial.json?pagina={pagina}&por_pagina=100")
+        assert datos["total"] == len(historial)
+        paginas.extend(datos["filas"])
+    assert paginas == historial
+
+def test_cache_acotada_en_bytes(tmp_path, catalogos):
+    servidor = _servidor(tmp_path, catalogos, Almacen(), max_bytes_cache=64 * 1024)
+    for dia in range(1, 29):
+        for reporte in ("vencidos", "usuarios", "libros"):
+            _json(servidor, f"/{reporte}.json?hoy=2025-02-{dia:02d}")
+            assert servidor.bytes_cache <= 64 * 1024
+    assert servidor.bytes_cache == sum(tam for _, _, tam in servidor._cache.values())
+    assert servidor._cache  # lo usado hace poco sigue guardado
+
+def test_error_inesperado_responde_500(tmp_path, catalogos, capsys):
+    servidor = _servidor(tmp_path, catalogos, Almacen())
+
+    def falla(*args):
+        raise sqlite3.OperationalError("database is locked")
+    servidor.responder = falla
+
+    async def pedir():
+        srv = await servidor.iniciar("127.0.0.1", 0)
+        puerto = srv.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", puerto)
+        writer.write(b"GET /historial HTTP/1.1\r\nHost: x\r\n\r\n")
+        respuesta = await reader.read()
+        writer.close()
+        srv.close()
+        await srv.wait_closed()
+        return respuesta
+    respuesta = asyncio.run(pedir())
+    assert respuesta.startswith(b"HTTP/1.1 500 ")
+    assert b"database is locked" in respuesta
+    assert "OperationalError" in capsys.readouterr().err
+
+def test_recarga_sin_novedades_conserva_la_cache(tmp_path, catalogos):
+    servidor = _servidor(tmp_path, catalogos, Almacen())
+    version = _json(servidor, "/vencidos.json")["version"]
+    assert _json(servidor, "/recargar", "POST")["version"] == version
+    aciertos = servidor.aciertos_cache
+    _json(servidor, "/vencidos.json")
+    assert servidor.aciertos_cache == aciertos + 1
+
+    with open(tmp_path / "prestamos.lfa", "a", encoding="utf-8") as f:
+        f.write("U001|L001|2030-01-01|\n")
+    assert _json(servidor, "/recargar", "POST")["version"] > version
+    assert _json(servidor, "/historial.json?pagina=1&por_pagina=1")["total"] == len(servidor.store.prestamos)
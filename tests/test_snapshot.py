@@ -0,0 +1,53 @@
+import random
+
+from conftest import generar_prestamos
+from main import Almacen
+from snapshot import cargar_snapshot, guardar_snapshot
+
+def _fuentes(tmp_path, catalogos):
+    ruta = tmp_path / "prestamos.lfa"
+    ruta.write_bytes(generar_prestamos(200))
+    return [catalogos[0], catalogos[1], str(ruta)]
+
+def _cargado(fuentes) -> Almacen:
+    store = Almacen()
+    store.cargar_usuarios(fuentes[0])
+    store.cargar_libros(fuentes[1])
+    store.cargar_prestamos(fuentes[2])
+    return store
+
+def test_snapshot_ida_y_vuelta(tmp_path, catalogos):
+    fuentes = _fuentes(tmp_path, catalogos)
+    store = _cargado(fuentes)
+    snap = str(tmp_path / "b.snap")
+    guardar_snapshot(store, snap, fuentes)
+    restaurado = cargar_snapshot(snap, fuentes)
+    assert [p.to_row() for p in restaurado.prestamos] == [p.to_row() for p in store.prestamos]
+    assert list(restaurado.errores) == list(store.errores)
+    h = store.estadisticas().hoy
+    assert vars(restaurado.estadisticas(h)) == vars(store.estadisticas(h))
+    assert list(restaurado.filas_vencidos(h)) == list(store.filas_vencidos(h))
+
+def test_snapshot_truncado_o_danado_es_none(tmp_path, catalogos):
+    fuentes = _fuentes(tmp_path, catalogos)
+    snap = tmp_path / "b.snap"
+    guardar_snapshot(_cargado(fuentes), str(snap), fuentes)
+    contenido = snap.read_bytes()
+    for largo in range(20, len(contenido), max(1, len(contenido) // 50)):
+        snap.write_bytes(contenido[:largo])
+        assert cargar_snapshot(str(snap), fuentes) is None
+    snap.write_bytes(contenido[:16] + b"\x00" * (len(contenido) - 16))
+    assert cargar_snapshot(str(snap), fuentes) is None
+
+def test_snapshot_con_bits_cambiados_es_none(tmp_path, catalogos):
+    fuentes = _fuentes(tmp_path, catalogos)
+    snap = tmp_path / "b.snap"
+    guardar_snapshot(_cargado(fuentes), str(snap), fuentes)
+    contenido = snap.read_bytes()
+    rnd = random.Random(7)
+    for _ in range(200):
+        danado = bytearray(contenido)
+        for pos in rnd.sample(range(len(danado)), 3):
+            danado[pos] ^= 1 << rnd.randrange(8)
+        snap.write_bytes(bytes(danado))
+        assert cargar_snapshot(str(snap), fuentes) is None
@@ -0,0 +1,38 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from utils import TAM_CACHE_FECHAS, fecha_iso, parse_fecha
+
+def _strptime(texto: str):
+    try:
+        return datetime.strptime(texto, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+def test_fecha_iso_igual_que_strptime():
+    textos = ["", "2025-01-01", "2025-1-5", "2025-01- 5", "2025-02-29", "2024-02-29", "2025-02-30",
+              "2025-13-01", "2025-00-10", "2025-01-00", "0000-01-01", "9999-12-31", " 2025-01-01",
+              "2025-01-01 ", "2025-001-01", "+025-01-01", "2025/01/01", "25-01-01", "٢٠٢٥-٠١-٠٢"]
+    dia = date(2023, 1, 1)
+    while dia < date(2025, 1, 1):
+        textos += [dia.isoformat(), f"{dia.year}-{dia.month}-{dia.day}", f"{dia.year}-{dia.month:02d}-{dia.day:2d}"]
+        dia += timedelta(days=1)
+    rnd = random.Random(3)
+    textos += ["".join(rnd.choice("0123456789- ") for _ in range(rnd.randint(6, 11))) for _ in range(20000)]
+    for texto in textos:
+        assert fecha_iso(texto) == _strptime(texto), repr(texto)
+
+def test_parse_fecha():
+    assert parse_fecha("") is None
+    assert parse_fecha("2025-03-04") == date(2025, 3, 4)
+    with pytest.raises(ValueError):
+        parse_fecha("2025-02-30")
+
+def test_cache_de_fechas_acotada():
+    assert fecha_iso.cache_info().maxsize == TAM_CACHE_FECHAS
+    fecha_iso.cache_clear()
+    for _ in range(3):
+        fecha_iso("2025-05-06")
+    assert fecha_iso.cache_info().hits == 2
@@ -0,0 +1,34 @@
+import random
+import sys
+
+from main import Almacen
+from validador import _es_char_permitido, escanear_caracteres, linea_es_valida
+
+def _escanear_lento(linea: str):
+    return [(pos, ch) for pos, ch in enumerate(linea, 1) if not _es_char_permitido(ch)]
+
+def test_cada_caracter_igual_que_la_regla_exacta():
+    for codigo in range(sys.maxunicode + 1):
+        ch = chr(codigo)
+        assert linea_es_valida(ch) == _es_char_permitido(ch), repr(ch)
+
+def test_lineas_mezcladas_igual_que_recorrer_caracteres():
+    rnd = random.Random(7)
+    alfabeto = "abcXYZ019 \t|-_'.,():;/áÉñÑüç½²٣ⅣA$%&@#😊​ "
+    for _ in range(2000):
+        linea = "".join(rnd.choice(alfabeto) for _ in range(rnd.randint(0, 40)))
+        esperado = _escanear_lento(linea)
+        assert escanear_caracteres(linea) == esperado, repr(linea)
+        assert linea_es_valida(linea) == (not esperado)
+
+def test_mensajes_de_caracteres_invalidos(tmp_path):
+    ruta = tmp_path / "usuarios.lfa"
+    ruta.write_text("U001|Ana López\nU002|Ca$los ½ Ruiz\nU003|Sofía 😊\n", encoding="utf-8")
+    store = Almacen()
+    store.cargar_usuarios(str(ruta))
+    assert list(store.usuarios) == ["U001"]
+    assert list(store.errores) == [
+        "[usuarios] Línea 2: pos 8: '$' inválido",
+        "[usuarios] Línea 2: pos 13: '½' inválido",
+        "[usuarios] Línea 3: pos 12: '😊' inválido",
+    ]